@@ -0,0 +1,463 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+"""Headless performance benchmarks for LightPad's hot paths.
+
+Run from the repository root::
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/run_benchmarks.py --output bench.json
+
+Results are written as JSON and compared against ``benchmarks/baseline.json``
+when it exists. Use ``--save-baseline`` to store the current results as the new
+baseline.
+"""
+
+import argparse
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import ujson  # noqa: E402
+from PySide6 import __version__ as pyside_version  # noqa: E402
+from PySide6.QtCore import QEvent, QObject  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from lightpad.widgets.screens.code_area.code_tabs.code_tabs_widget import CodeTabsWidget  # noqa: E402
+from lightpad.widgets.screens.code_area.code_tabs.editor._long_line_index import LONG_LINE_LENGTH  # noqa: E402
+from lightpad.widgets.screens.code_area.code_tabs.editor.code_editor import CodeEditor  # noqa: E402
+from lightpad.widgets.screens.side_bar.explorer_tree.explorer_tree_widget import ExplorerTreeWidget  # noqa: E402
+
+MB: int = 1024 * 1024
+
+DEFAULT_BASELINE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Metrics ending with these suffixes are "higher is better", everything else is a duration.
+HIGHER_IS_BETTER_SUFFIXES = ('_per_s',)
+
+_SAMPLE_LINES: List[str] = [
+    'def function_%d(argument, *args, **kwargs):\n',
+    '    """Docstring of a synthetic function used for benchmarking."""\n',
+    '    value = {"key": [1, 2, 3], "other": (argument, args, kwargs)}\n',
+    '    for index in range(len(value["key"])):\n',
+    '        value["key"][index] += index * 2  # comment with some text\n',
+    '    return value\n',
+    '\n',
+]
+
+
+class _PaintWatcher(QObject):
+    """Event filter recording the time of the first paint event of a widget."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.first_paint_time: Optional[float] = None
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Type.Paint and self.first_paint_time is None:
+            self.first_paint_time = time.perf_counter()
+        return False
+
+
+def _make_text_file(file_path: str, size: int) -> None:
+    """Write a synthetic source-like text file of approximately ``size`` bytes."""
+    lines: List[str] = []
+    block_size: int = 0
+    index: int = 0
+    while block_size < min(size, MB):
+        line: str = _SAMPLE_LINES[index % len(_SAMPLE_LINES)]
+        if '%d' in line:
+            line = line % index
+        lines.append(line)
+        block_size += len(line)
+        index += 1
+    block: bytes = ''.join(lines).encode('utf-8')
+
+    with open(file_path, 'wb') as f:
+        written: int = 0
+        while written + len(block) <= size:
+            f.write(block)
+            written += len(block)
+        if written < size:
+            f.write(block[: size - written])
+
+
+def _make_directory(dir_path: str, entries: int) -> None:
+    """Create a directory containing ``entries`` empty files and sub directories."""
+    os.makedirs(dir_path, exist_ok=True)
+    for index in range(entries):
+        entry_path: str = os.path.join(dir_path, 'entry_%06d' % index)
+        if index % 10 == 0:
+            os.mkdir(entry_path)
+        else:
+            open(entry_path + '.py', 'wb').close()
+
+
+def _process_events_until(app: QApplication, condition: Callable[[], bool], timeout: float) -> bool:
+    """Spin the event loop until ``condition`` holds. Returns False on timeout."""
+    deadline: float = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered: List[float] = sorted(values)
+    index: int = min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bench_open_file(app: QApplication, corpus_dir: str, size: int, timeout: float) -> Dict:
+    """Measure time to first paint and time to fully loaded for ``CodeEditor.open_file``."""
+    file_path: str = os.path.join(corpus_dir, 'open_%d.py' % size)
+    _make_text_file(file_path, size)
+
+    editor: CodeEditor = CodeEditor()
+    editor.resize(1000, 800)
+    editor.show()
+    _process_events_until(app, lambda: False, 0.05)
+
+    watcher: _PaintWatcher = _PaintWatcher()
+    editor.viewport().installEventFilter(watcher)
+
+    start: float = time.perf_counter()
+    status: bool = editor.open_file(file_path)
+    open_returned: float = time.perf_counter()
+
+    painted: bool = _process_events_until(app, lambda: watcher.first_paint_time is not None, timeout)
+    loaded: bool = _process_events_until(app, lambda: not editor.content_update_timer.isActive(), timeout)
+    end: float = time.perf_counter()
+
+    result: Dict = {
+        'size_bytes': size,
+        'status': status,
+        'open_call_s': open_returned - start,
+        'first_paint_s': (watcher.first_paint_time - start) if painted else None,  # type: ignore
+        'fully_loaded_s': (end - start) if loaded else None,
+        'timed_out': not (painted and loaded),
+        'loaded_fraction': min(1.0, editor.content_index / max(1, len(editor.content_view))),
+    }
+
+    editor.content_update_timer.stop()
+    editor.viewport().removeEventFilter(watcher)
+    editor.close()
+    editor.deleteLater()
+    app.processEvents()
+    os.remove(file_path)
+    return result
+
+
+def bench_load_items(app: QApplication, corpus_dir: str, entries: int) -> Dict:
+    """Measure ``ExplorerTreeWidget.load_items`` on a directory with ``entries`` entries."""
+    dir_path: str = os.path.join(corpus_dir, 'explorer_%d' % entries)
+    _make_directory(dir_path, entries)
+
+    explorer: ExplorerTreeWidget = ExplorerTreeWidget()
+    explorer.resize(300, 800)
+    explorer.show()
+    app.processEvents()
+
+    start: float = time.perf_counter()
+    explorer.load_items(dir_path)
+    loaded: float = time.perf_counter()
+    app.processEvents()
+    end: float = time.perf_counter()
+
+    explorer.close()
+    explorer.deleteLater()
+    app.processEvents()
+    shutil.rmtree(dir_path)
+    return {
+        'entries': entries,
+        'load_items_s': loaded - start,
+        'load_items_and_layout_s': end - start,
+    }
+
+
+def bench_save(app: QApplication, corpus_dir: str, size: int) -> Dict:
+    """Measure save throughput of the current tab through ``CodeEditor.save_file``."""
+    file_path: str = os.path.join(corpus_dir, 'save_%d.py' % size)
+    _make_text_file(file_path, size)
+    with open(file_path, 'r') as f:
+        text: str = f.read()
+
+    code_tabs_widget: CodeTabsWidget = CodeTabsWidget()
+    editor: CodeEditor = CodeEditor()
+    editor.setPlainText(text)
+    editor.file_path = file_path
+    code_tabs_widget.addTab(editor, 'save')
+    del text
+
+    start: float = time.perf_counter()
+    code_tabs_widget.get_text()
+    got_text: float = time.perf_counter()
+    code_editor: CodeEditor = code_tabs_widget.currentWidget()  # type: ignore
+    code_editor.save_file(code_editor.file_path)
+    end: float = time.perf_counter()
+
+    code_tabs_widget.deleteLater()
+    app.processEvents()
+    os.remove(file_path)
+    return {
+        'size_bytes': size,
+        'get_text_s': got_text - start,
+        'save_s': end - got_text,
+        'save_mb_per_s': (size / MB) / max(end - got_text, 1e-9),
+    }
+
+
+def _make_newline_file(file_path: str, newline: bytes) -> bytes:
+    """Write a text file with newlines cut by the chunks ``CodeEditor`` loads, returning its content."""
+    # The first line is longer than the samples its format is detected from, and is ended by a newline
+    # starting at the last byte of the first chunk
+    lines: List[bytes] = [b'p' * (CodeEditor.CHUNK_SIZE - 1)] + [
+        _SAMPLE_LINES[index % len(_SAMPLE_LINES)].rstrip('\n').encode('utf-8') for index in range(2000)
+    ]
+    # Long lines are split into blocks, which must not split newlines
+    lines.insert(1000, b'l' * (LONG_LINE_LENGTH + 1))
+    content: bytes = newline.join(lines) + newline
+    with open(file_path, 'wb') as f:
+        f.write(content)
+    return content
+
+
+def check_round_trip(app: QApplication, corpus_dir: str, timeout: float) -> Dict:
+    """Check that opening and saving files with each newline style writes them back byte for byte."""
+    result: Dict = {}
+    for name, newline in (('lf', b'\n'), ('crlf', b'\r\n'), ('cr', b'\r')):
+        file_path: str = os.path.join(corpus_dir, 'round_trip_%s.txt' % name)
+        content: bytes = _make_newline_file(file_path, newline)
+
+        editor: CodeEditor = CodeEditor()
+        status: bool = editor.open_file(file_path)
+        loaded: bool = _process_events_until(app, lambda: not editor.is_loading(), timeout)
+        saved_path: str = file_path + '.saved'
+        if status and loaded and editor.save_file(saved_path):
+            with open(saved_path, 'rb') as f:
+                result['%s_identical' % name] = f.read() == content
+            os.remove(saved_path)
+        else:
+            result['%s_identical' % name] = False
+
+        editor.stop_loading()
+        editor.close_journal()
+        editor.deleteLater()
+        app.processEvents()
+        os.remove(file_path)
+    return result
+
+
+def bench_scroll(app: QApplication, corpus_dir: str, size: int, steps: int) -> Dict:
+    """Measure gutter painting and current line highlighting cost while scrolling."""
+    file_path: str = os.path.join(corpus_dir, 'scroll_%d.py' % size)
+    _make_text_file(file_path, size)
+    with open(file_path, 'r') as f:
+        text: str = f.read()
+    os.remove(file_path)
+
+    editor: CodeEditor = CodeEditor()
+    editor.setPlainText(text)
+    del text
+    editor.resize(1000, 800)
+    editor.show()
+    app.processEvents()
+
+    gutter_times: List[float] = []
+    highlight_times: List[float] = []
+    frame_times: List[float] = []
+    scroll_bar = editor.verticalScrollBar()
+    step: int = max(1, scroll_bar.maximum() // steps)
+
+    for value in range(0, scroll_bar.maximum() + 1, step):
+        frame_start: float = time.perf_counter()
+        scroll_bar.setValue(value)
+        editor.setTextCursor(editor.cursorForPosition(editor.viewport().rect().center()))
+
+        start: float = time.perf_counter()
+        editor.highlight_current_line()
+        highlight_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        editor.line_number_area.repaint()
+        gutter_times.append(time.perf_counter() - start)
+
+        editor.viewport().repaint()
+        frame_times.append(time.perf_counter() - frame_start)
+
+    editor.close()
+    editor.deleteLater()
+    app.processEvents()
+    return {
+        'size_bytes': size,
+        'frames': len(frame_times),
+        'gutter_paint_mean_s': statistics.mean(gutter_times),
+        'gutter_paint_p95_s': _percentile(gutter_times, 95),
+        'highlight_mean_s': statistics.mean(highlight_times),
+        'highlight_p95_s': _percentile(highlight_times, 95),
+        'frame_mean_s': statistics.mean(frame_times),
+        'frame_p95_s': _percentile(frame_times, 95),
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Compare results against baseline, returning a list of regressions.
+
+    Parameters
+    ----------
+    results: Dict
+        Benchmark results of the current run.
+    baseline: Dict
+        Stored benchmark results to compare against.
+    threshold: float
+        Allowed relative slowdown, e.g. 0.25 allows durations to grow by 25%.
+
+    Returns
+    -------
+    regressions: List[Dict]
+        Metrics that regressed beyond the threshold.
+    """
+    regressions: List[Dict] = []
+    for case_name, metrics in results['results'].items():
+        baseline_metrics: Optional[Dict] = baseline.get('results', {}).get(case_name)
+        if not baseline_metrics:
+            continue
+        for metric, value in metrics.items():
+            baseline_value = baseline_metrics.get(metric)
+            if not metric.endswith('_s') or not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            if not isinstance(baseline_value, (int, float)) or baseline_value <= 0:
+                continue
+            ratio: float = value / baseline_value
+            higher_is_better: bool = metric.endswith(HIGHER_IS_BETTER_SUFFIXES)
+            regressed: bool = ratio < 1 / (1 + threshold) if higher_is_better else ratio > 1 + threshold
+            metrics.setdefault('_vs_baseline', {})[metric] = round(ratio, 3)
+            if regressed:
+                regressions.append({'case': case_name, 'metric': metric, 'baseline': baseline_value, 'value': value})
+    return regressions
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default=None, help='write JSON results to this file (default: stdout)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='store results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed relative regression (default 0.25)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with status 1 on regressions')
+    parser.add_argument('--quick', action='store_true', help='only run the smallest corpus of every benchmark')
+    parser.add_argument('--open-sizes-mb', type=int, nargs='+', default=[1, 100, 1024])
+    parser.add_argument('--explorer-entries', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--save-sizes-mb', type=int, nargs='+', default=[1, 100])
+    parser.add_argument('--scroll-size-mb', type=int, default=10)
+    parser.add_argument('--scroll-steps', type=int, default=200)
+    parser.add_argument('--timeout', type=float, default=120.0, help='per benchmark timeout in seconds')
+    parser.add_argument('--corpus-dir', default=None, help='directory for synthetic corpora (default: temp dir)')
+    args = parser.parse_args()
+
+    if args.quick:
+        args.open_sizes_mb = args.open_sizes_mb[:1]
+        args.explorer_entries = args.explorer_entries[:1]
+        args.save_sizes_mb = args.save_sizes_mb[:1]
+        args.scroll_size_mb = 1
+        args.scroll_steps = 50
+
+    app: QApplication = QApplication.instance() or QApplication(sys.argv)  # type: ignore
+    corpus_dir: str = args.corpus_dir or tempfile.mkdtemp(prefix='lightpad-bench-')
+    os.makedirs(corpus_dir, exist_ok=True)
+
+    results: Dict = {
+        'meta': {
+            'timestamp': time.time(),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'pyside': pyside_version,
+            'platform': platform.platform(),
+            'qpa_platform': os.environ.get('QT_QPA_PLATFORM'),
+        },
+        'results': {},
+    }
+
+    try:
+        for size_mb in args.open_sizes_mb:
+            results['results']['open_file_%dmb' % size_mb] = bench_open_file(
+                app, corpus_dir, size_mb * MB, args.timeout
+            )
+        for entries in args.explorer_entries:
+            results['results']['load_items_%d' % entries] = bench_load_items(app, corpus_dir, entries)
+        for size_mb in args.save_sizes_mb:
+            results['results']['save_%dmb' % size_mb] = bench_save(app, corpus_dir, size_mb * MB)
+        results['results']['scroll_%dmb' % args.scroll_size_mb] = bench_scroll(
+            app, corpus_dir, args.scroll_size_mb * MB, args.scroll_steps
+        )
+        results['results']['round_trip'] = check_round_trip(app, corpus_dir, args.timeout)
+    finally:
+        if args.corpus_dir is None:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    regressions: List[Dict] = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, ujson.load(f), args.threshold)
+        results['regressions'] = regressions
+
+    output: str = ujson.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            f.write(output)
+
+    for regression in regressions:
+        print(
+            'REGRESSION %(case)s.%(metric)s: %(baseline).4f -> %(value).4f' % regression,
+            file=sys.stderr,
+        )
+    mismatches: List[str] = [check for check, identical in results['results']['round_trip'].items() if not identical]
+    for check in mismatches:
+        print('ROUND TRIP MISMATCH %s' % check, file=sys.stderr)
+    return 1 if mismatches or (regressions and args.fail_on_regression) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
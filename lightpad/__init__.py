@@ -35,6 +35,9 @@ base_dir: str = os.path.dirname(os.path.relpath(__file__))
 with open(os.path.join(base_dir, os.path.pardir, 'meta.json'), 'r') as meta_file:
     meta: Dict = ujson.load(meta_file)
 
+# Directory for state kept between sessions
+data_dir: str = os.path.join(os.path.expanduser('~'), '.lightpad')
+
 
 # Handle uncaught exceptions
 
@@ -21,7 +21,15 @@
 #  SOFTWARE.
 #
 
-from lightpad.app import main
+import sys
+from typing import List
+
+from lightpad.utils.single_instance import Location, parse_locations, send_to_running_instance
 
 if __name__ == '__main__':
-    main()
+    locations: List[Location] = parse_locations(sys.argv[1:])
+    if not send_to_running_instance(locations):
+        # Qt is only imported when no instance is running
+        from lightpad.app import main
+
+        main(locations)
@@ -23,14 +23,28 @@
 
 import os
 import sys
+from typing import Dict, List, Optional, Tuple
 
-from PySide6.QtCore import QPoint, QRect, Qt, Slot
+from PySide6.QtCore import QPoint, QRect, Qt, QTimer, Slot
 from PySide6.QtGui import QScreen
-from PySide6.QtWidgets import QApplication, QFileDialog
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+from PySide6.QtWidgets import QApplication, QFileDialog, QLabel, QMessageBox
 
 from lightpad import meta
-from lightpad.utils.commons import debug
+from lightpad.utils.commons import DebugType, debug
+from lightpad.utils.journal import Record, is_journal_applicable, pending_journals, read_journal
+from lightpad.utils.memory import format_size, format_usage
+from lightpad.utils.python_symbols import shutdown_symbol_pool
+from lightpad.utils.single_instance import SOCKET_PATH, Location, decode_locations
+from lightpad.utils.stall_watchdog import STALL_LOG_PATH, StallWatchdog
+from lightpad.utils.symbol_index import SymbolIndex
+from lightpad.utils.text_file import shutdown_read_pool
+from lightpad.utils.word_index import shutdown_word_pool
 from lightpad.widgets.main_window import MainWindow
+from lightpad.widgets.screens.code_area.code_tabs.editor.code_editor import CodeEditor
+from lightpad.widgets.screens.code_area.terminal.terminal_widget import TerminalWidget
+from lightpad.widgets.screens.side_bar.explorer_tree.explorer_tree_widget import ExplorerTreeWidget
+from lightpad.widgets.workspace_symbols_dialog import WorkspaceSymbolsDialog
 
 
 class Application(QApplication):
@@ -45,6 +59,8 @@ class Application(QApplication):
         self.setApplicationDisplayName(meta['name'])
 
         self.main_window: MainWindow = MainWindow()
+        # Symbols of the Python files of the working directory
+        self.symbol_index: Optional[SymbolIndex] = None
         self.main_window.show()
 
         # Move main window to center of screen
@@ -53,7 +69,26 @@ class Application(QApplication):
         q_rect.moveCenter(center_point)
         self.main_window.move(q_rect.topLeft())
 
+        # Logs where the main thread is when the event loop stops responding
+        self.stall_watchdog: StallWatchdog = StallWatchdog(self)
+
         self.init_connections()
+        self.stall_watchdog.start()
+
+        # Later launches hand their command line paths to this instance, see lightpad.utils.single_instance
+        self._instance_server: QLocalServer = QLocalServer(self)
+        self._instance_server.newConnection.connect(self.handle_instance_connection)  # type: ignore
+        os.makedirs(os.path.dirname(SOCKET_PATH), exist_ok=True)
+        # Left behind if the last instance crashed, no instance answered on it
+        QLocalServer.removeServer(SOCKET_PATH)
+        if not self._instance_server.listen(SOCKET_PATH):
+            debug(
+                'Could not listen on %s: %s' % (SOCKET_PATH, self._instance_server.errorString()),
+                debug_type=DebugType.WARNING,
+            )
+
+        # Offer recovery once the main window is shown
+        QTimer.singleShot(0, self.recover_unsaved_changes)
 
     def init_connections(self) -> None:
         """Initializes widget connections"""
@@ -63,9 +98,47 @@ class Application(QApplication):
         self.main_window.menu_bar.save_file_action.triggered.connect(self.on_save_file)  # type: ignore
         self.main_window.menu_bar.save_file_as_action.triggered.connect(self.on_save_file_as)  # type: ignore
         self.main_window.menu_bar.exit_action.triggered.connect(self.closeAllWindows)  # type: ignore
+        self.main_window.menu_bar.follow_file_action.toggled.connect(self.on_follow_file)  # type: ignore
+        self.main_window.menu_bar.split_right_action.triggered.connect(self.on_split_right)  # type: ignore
+        self.main_window.menu_bar.split_down_action.triggered.connect(self.on_split_down)  # type: ignore
+        self.main_window.menu_bar.close_split_action.triggered.connect(self.on_close_split)  # type: ignore
+        self.main_window.menu_bar.compare_with_saved_action.triggered.connect(  # type: ignore
+            self.on_compare_with_saved
+        )
+        self.main_window.menu_bar.terminal_action.toggled.connect(self.on_toggle_terminal)  # type: ignore
+        self.main_window.menu_bar.go_to_workspace_symbol_action.triggered.connect(  # type: ignore
+            self.on_go_to_workspace_symbol
+        )
+        self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.currentChanged.connect(
+            self.handle_current_tab_changed
+        )
         self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.all_tabs_closed_signal.connect(
             self.handle_all_tabs_closed
         )
+        self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.loading_progress_signal.connect(
+            self.handle_loading_progress
+        )
+        self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.memory_usage_signal.connect(
+            self.handle_memory_usage
+        )
+        self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.follow_mode_signal.connect(
+            self.handle_follow_mode
+        )
+        self.aboutToQuit.connect(  # type: ignore
+            self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.close_journals
+        )
+        self.aboutToQuit.connect(  # type: ignore
+            self.main_window.container_widget.editor_screen.code_area_frame.terminal_widget.stop
+        )
+        self.aboutToQuit.connect(shutdown_symbol_pool)  # type: ignore
+        self.aboutToQuit.connect(shutdown_read_pool)  # type: ignore
+        self.aboutToQuit.connect(shutdown_word_pool)  # type: ignore
+        self.main_window.paths_dropped_signal.connect(self.open_paths)  # type: ignore
+        self.main_window.container_widget.editor_screen.stacked_widget.explorer_tree.open_files_signal.connect(
+            self._open_files
+        )
+        self.stall_watchdog.latency_signal.connect(self.handle_latency)  # type: ignore
+        self.aboutToQuit.connect(self.stall_watchdog.stop)  # type: ignore
 
     def _open_file(self, file_path: str) -> None:
         """Open given file in code editor"""
@@ -73,13 +146,62 @@ class Application(QApplication):
             self.main_window.setCursor(Qt.CursorShape.WaitCursor)
 
             if self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.open_file(file_path):
-                self.main_window.container_widget.stacked_container.setCurrentWidget(
-                    self.main_window.container_widget.editor_screen
-                )
-                self.main_window.menu_bar.save_file_action.setEnabled(True)
-                self.main_window.menu_bar.save_file_as_action.setEnabled(True)
+                self._show_editor()
             self.main_window.setCursor(Qt.CursorShape.ArrowCursor)
 
+    def _open_files(self, file_paths: List[str]) -> None:
+        """Open given files in code editors, their tabs are shown at once while the files are read concurrently"""
+        if file_paths:
+            self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.open_files(file_paths)
+            self._show_editor()
+
+    def _show_editor(self) -> None:
+        """Show the editor screen and enable the actions on tabs"""
+        self.main_window.container_widget.stacked_container.setCurrentWidget(
+            self.main_window.container_widget.editor_screen
+        )
+        self.main_window.menu_bar.save_file_action.setEnabled(True)
+        self.main_window.menu_bar.save_file_as_action.setEnabled(True)
+        self.main_window.menu_bar.follow_file_action.setEnabled(True)
+        self.main_window.menu_bar.split_right_action.setEnabled(True)
+        self.main_window.menu_bar.split_down_action.setEnabled(True)
+        self.main_window.menu_bar.compare_with_saved_action.setEnabled(True)
+
+    def recover_unsaved_changes(self) -> None:
+        """Offer to replay journals of unsaved edits left behind by a crash."""
+        for journal_path in pending_journals():
+            journal: Optional[Tuple[Dict, List[Record]]] = read_journal(journal_path)
+            if journal is None or not journal[1]:
+                os.remove(journal_path)
+                continue
+
+            header, records = journal
+            file_path: str = header['file_path']
+            if not is_journal_applicable(header):
+                debug(
+                    '%s changed since its journal was written, discarding it' % (file_path),
+                    debug_type=DebugType.WARNING,
+                )
+                os.remove(journal_path)
+                continue
+
+            answer = QMessageBox.question(
+                self.main_window,
+                'Recover Unsaved Changes',
+                '%s did not exit cleanly. Recover unsaved changes to %s?' % (meta['name'], file_path),
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                os.remove(journal_path)
+                continue
+
+            debug('Recovering %d edits of %s' % (len(records), file_path))
+            self._open_file(file_path)
+            code_editor: Optional[CodeEditor] = (
+                self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.get_editor(file_path)
+            )
+            if code_editor is not None:
+                code_editor.replay_journal(records)
+
     def on_new_file(self) -> None:
         """Actions to be performed when new file action is triggered"""
         file_path: str = QFileDialog.getSaveFileName(self.main_window, 'Create New File', self.pwd)[0]
@@ -88,56 +210,289 @@ class Application(QApplication):
 
     def on_open_file(self) -> None:
         """Actions to be performed when open file action is triggered"""
-        file_path: str = QFileDialog.getOpenFileName(self.main_window, 'Open File', self.pwd)[0]
-        debug('Opening file: %s' % (file_path))
-        self._open_file(file_path)
+        file_paths: List[str] = QFileDialog.getOpenFileNames(self.main_window, 'Open Files', self.pwd)[0]
+        debug('Opening files: %s' % (', '.join(file_paths)))
+        self._open_files(file_paths)
 
     def on_open_dir(self) -> None:
         """Actions to be performed when open dir action is triggered"""
         dir_path: str = QFileDialog.getExistingDirectory(self.main_window, 'Open Directory', self.pwd)
         debug('Opening dir: %s' % (dir_path))
+        self._open_dir(dir_path)
+
+    def _open_dir(self, dir_path: str) -> None:
+        """Open given directory as working directory"""
         if dir_path:
             self.pwd = dir_path
+            self.main_window.container_widget.editor_screen.stacked_widget.explorer_tree.load_items(dir_path)
+
+            if self.symbol_index is not None:
+                self.symbol_index.close()
+            self.symbol_index = SymbolIndex(dir_path)
+            self.symbol_index.update()
+            self.main_window.menu_bar.go_to_workspace_symbol_action.setEnabled(True)
 
             self.main_window.container_widget.stacked_container.setCurrentWidget(
                 self.main_window.container_widget.editor_screen
             )
             self.main_window.menu_bar.save_file_as_action.setEnabled(True)
 
+    def open_locations(self, locations: List[Location]) -> None:
+        """Open files and directories given on the command line.
+
+        Parameters
+        ----------
+        locations: List[Location]
+            Paths, with the line to go to for files.
+
+        Returns
+        -------
+        None
+        """
+        file_paths: List[str] = []
+        for path, line in locations:
+            if os.path.isdir(path):
+                debug('Opening dir: %s' % (path))
+                self._open_dir(path)
+            else:
+                debug('Opening file: %s' % (path))
+                file_paths.append(path)
+        self._open_files(file_paths)
+
+        for path, line in locations:
+            code_editor: Optional[CodeEditor] = (
+                self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.get_editor(path)
+            )
+            if code_editor is not None and line is not None:
+                code_editor.go_to_line(line)
+
+    def open_paths(self, paths: List[str]) -> None:
+        """Open dropped files, and the last dropped directory as working directory.
+
+        Parameters
+        ----------
+        paths: List[str]
+            Paths of files and directories.
+
+        Returns
+        -------
+        None
+        """
+        self.open_locations([(path, None) for path in paths])
+
+    @Slot()
+    def handle_instance_connection(self) -> None:
+        """Read the locations sent by another launch, and open them once it disconnects."""
+        socket: QLocalSocket = self._instance_server.nextPendingConnection()
+        socket.disconnected.connect(lambda: self.handle_instance_message(socket))  # type: ignore
+        if socket.state() != QLocalSocket.LocalSocketState.ConnectedState:
+            self.handle_instance_message(socket)
+
+    def handle_instance_message(self, socket: QLocalSocket) -> None:
+        """Open the locations sent over socket, and bring the main window to front."""
+        data: bytes = socket.readAll().data()
+        socket.deleteLater()
+        try:
+            locations: List[Location] = decode_locations(data)
+        except (ValueError, TypeError):
+            debug('Ignoring invalid message from another instance', debug_type=DebugType.WARNING)
+            return
+
+        self.open_locations(locations)
+        self.main_window.showNormal()
+        self.main_window.raise_()
+        self.main_window.activateWindow()
+
     def on_save_file(self) -> None:
         """Actions to be performed when save file action is triggered"""
-        self.main_window.setCursor(Qt.CursorShape.WaitCursor)
-        file_contents: str = self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.get_text()
-        current_file: str = (
-            self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.currentWidget().file_path  # type: ignore
+        code_editor: Optional[CodeEditor] = (
+            self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.current_code_editor()
         )
-        debug('Saving file: %s' % (current_file))
-        with open(current_file, 'w') as f:
-            f.write(file_contents)
+        if code_editor is None:
+            return
+
+        self.main_window.setCursor(Qt.CursorShape.WaitCursor)
+        debug('Saving file: %s' % (code_editor.file_path))
+        if code_editor.save_file(code_editor.file_path):
+            self._refresh_after_save()
         self.main_window.setCursor(Qt.CursorShape.ArrowCursor)
 
     def on_save_file_as(self) -> None:
         """Actions to be performed when save file as action is triggered"""
         file_path: str = QFileDialog.getSaveFileName(self.main_window, 'Save File As', self.pwd)[0]
+        if not file_path:
+            return
 
-        self.main_window.setCursor(Qt.CursorShape.WaitCursor)
-        file_contents: str = self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.get_text()
-        self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.currentWidget().file_path = (  # type: ignore
-            file_path
+        code_editor: Optional[CodeEditor] = (
+            self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.current_code_editor()
         )
+        if code_editor is None:
+            return
+
+        self.main_window.setCursor(Qt.CursorShape.WaitCursor)
         debug('Saving file: %s' % (file_path))
-        with open(file_path, 'w') as f:
-            f.write(file_contents)
+        if code_editor.save_file(file_path):
+            self._refresh_after_save()
         self.main_window.setCursor(Qt.CursorShape.ArrowCursor)
 
+    def _refresh_after_save(self) -> None:
+        """Read the git status and index symbols again after saving, files changed in place are not watched."""
+        explorer_tree: ExplorerTreeWidget = self.main_window.container_widget.editor_screen.stacked_widget.explorer_tree
+        explorer_tree.git_status_watcher.schedule_refresh()
+        if self.symbol_index is not None:
+            self.symbol_index.update()
+
+    def on_go_to_workspace_symbol(self) -> None:
+        """Actions to be performed when go to symbol in workspace action is triggered"""
+        if self.symbol_index is None:
+            return
+
+        dialog: WorkspaceSymbolsDialog = WorkspaceSymbolsDialog(self.symbol_index, self.main_window)
+        if dialog.exec() == WorkspaceSymbolsDialog.DialogCode.Accepted and dialog.location is not None:
+            self.open_locations([dialog.location])
+
+    def on_follow_file(self, checked: bool) -> None:
+        """Actions to be performed when follow file action is toggled"""
+        code_editor: Optional[CodeEditor] = (
+            self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.current_code_editor()
+        )
+        if code_editor is not None and code_editor.is_following() != checked:
+            debug('%s following file: %s' % ('Start' if checked else 'Stop', code_editor.file_path))
+            code_editor.set_follow_mode(checked)
+
+    def on_split_right(self) -> None:
+        """Actions to be performed when split right action is triggered"""
+        if self.main_window.container_widget.editor_screen.code_area_frame.split_current_editor(
+            Qt.Orientation.Horizontal
+        ):
+            self.main_window.menu_bar.close_split_action.setEnabled(True)
+
+    def on_split_down(self) -> None:
+        """Actions to be performed when split down action is triggered"""
+        if self.main_window.container_widget.editor_screen.code_area_frame.split_current_editor(
+            Qt.Orientation.Vertical
+        ):
+            self.main_window.menu_bar.close_split_action.setEnabled(True)
+
+    def on_close_split(self) -> None:
+        """Actions to be performed when close split action is triggered"""
+        self.main_window.container_widget.editor_screen.code_area_frame.close_split()
+        self.main_window.menu_bar.close_split_action.setEnabled(
+            self.main_window.container_widget.editor_screen.code_area_frame.has_split()
+        )
+
+    def on_compare_with_saved(self) -> None:
+        """Actions to be performed when compare with saved action is triggered"""
+        if self.main_window.container_widget.editor_screen.code_area_frame.compare_with_saved():
+            self.main_window.menu_bar.close_split_action.setEnabled(True)
+
+    def on_toggle_terminal(self, checked: bool) -> None:
+        """Actions to be performed when terminal action is toggled"""
+        terminal_widget: TerminalWidget = (
+            self.main_window.container_widget.editor_screen.code_area_frame.terminal_widget
+        )
+        # The shell starts in the working directory
+        terminal_widget.cwd = self.pwd
+        terminal_widget.setVisible(checked)
+        if checked:
+            self.main_window.container_widget.stacked_container.setCurrentWidget(
+                self.main_window.container_widget.editor_screen
+            )
+            terminal_widget.setFocus()
+
+    @Slot(int)
+    def handle_current_tab_changed(self, index: int) -> None:
+        """Actions to be performed when another code editor tab is shown."""
+        code_editor: Optional[CodeEditor] = (
+            self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.current_code_editor()
+        )
+        if code_editor is not None:
+            self.main_window.menu_bar.follow_file_action.setChecked(code_editor.is_following())
+
+    @Slot(bool)
+    def handle_follow_mode(self, is_following: bool) -> None:
+        """Keep the follow file action in line with the current tab, which may have refused to follow its file."""
+        code_editor: Optional[CodeEditor] = (
+            self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.current_code_editor()
+        )
+        if code_editor is not None:
+            self.main_window.menu_bar.follow_file_action.setChecked(code_editor.is_following())
+
+    @Slot(str, int)
+    def handle_loading_progress(self, file_path: str, percent: int) -> None:
+        """Show how much of a file being opened has been read."""
+        if percent >= 100:
+            self.main_window.status_bar.clearMessage()
+        else:
+            self.main_window.status_bar.showMessage('Loading %s: %d%%' % (os.path.basename(file_path), percent))
+
+    @Slot(object, bool)
+    def handle_memory_usage(self, usage: Dict[str, Dict[str, int]], is_over_budget: bool) -> None:
+        """Show the memory used by the current tab and all tabs, and what each tab uses in the tool tip."""
+        code_editor: Optional[CodeEditor] = (
+            self.main_window.container_widget.editor_screen.code_area_frame.code_tabs_widget.current_code_editor()
+        )
+        text: str = 'Memory: %s' % (format_size(sum(sum(parts.values()) for parts in usage.values())))
+        if code_editor is not None and code_editor.file_path in usage:
+            text = 'Tab: %s, %s' % (format_size(sum(usage[code_editor.file_path].values())), text)
+        if is_over_budget:
+            text += ' (over budget)'
+
+        memory_label: QLabel = self.main_window.memory_label
+        memory_label.setText(text)
+        memory_label.setToolTip(
+            '\n'.join(
+                '%s: %s' % (os.path.basename(file_path), format_usage(parts))
+                for file_path, parts in sorted(usage.items(), key=lambda item: -sum(item[1].values()))
+            )
+        )
+        memory_label.setStyleSheet('color: red;' if is_over_budget else '')
+
+    def handle_latency(self, percentiles: Dict[int, float]) -> None:
+        """Show the latency percentiles of the event loop, in red when the slowest exceed the stall threshold."""
+        if not percentiles:
+            return
+        latency_label: QLabel = self.main_window.latency_label
+        latency_label.setText(
+            'Latency %s: %s ms'
+            % (
+                '/'.join('p%d' % (percentile) for percentile in percentiles),
+                '/'.join('%d' % (latency) for latency in percentiles.values()),
+            )
+        )
+        latency_label.setToolTip(
+            'Event loop latency %s\n%d stalls over %d ms logged to %s'
+            % (
+                ', '.join('p%d %.1f ms' % (percentile, latency) for percentile, latency in percentiles.items()),
+                self.stall_watchdog.stall_count,
+                self.stall_watchdog.threshold,
+                STALL_LOG_PATH,
+            )
+        )
+        latency_label.setStyleSheet('color: red;' if max(percentiles.values()) > self.stall_watchdog.threshold else '')
+
     @Slot()
     def handle_all_tabs_closed(self) -> None:
         """Actions to be performed when all code editor tabs have been closed."""
         self.main_window.menu_bar.save_file_action.setEnabled(False)
         self.main_window.menu_bar.save_file_as_action.setEnabled(False)
+        self.main_window.menu_bar.follow_file_action.setChecked(False)
+        self.main_window.menu_bar.follow_file_action.setEnabled(False)
+        self.main_window.menu_bar.split_right_action.setEnabled(False)
+        self.main_window.menu_bar.split_down_action.setEnabled(False)
+        self.main_window.menu_bar.close_split_action.setEnabled(False)
+        self.main_window.menu_bar.compare_with_saved_action.setEnabled(False)
+
 
+def main(locations: Optional[List[Location]] = None) -> None:
+    """Main function of the application
 
-def main() -> None:
-    """Main function of the application"""
+    Parameters
+    ----------
+    locations: Optional[List[Location]]
+        Files and directories to be opened. (default is None)
+    """
     app: Application = Application(sys.argv)
+    if locations:
+        app.open_locations(locations)
     sys.exit(app.exec())
@@ -0,0 +1,192 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import bz2
+import gzip
+import lzma
+import os
+import queue
+import threading
+from typing import BinaryIO, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for zstd files
+    zstandard = None
+
+# Longest magic number
+_MAGIC_SIZE: int = 6
+
+_MAGIC_NUMBERS: Tuple[Tuple[bytes, str], ...] = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+
+_EXTENSIONS: Tuple[Tuple[str, str], ...] = (
+    ('.gz', 'gzip'),
+    ('.bz2', 'bz2'),
+    ('.xz', 'xz'),
+    ('.zst', 'zstd'),
+)
+
+# Decompressed chunks buffered ahead of the reader
+MAX_PENDING_CHUNKS: int = 64
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """Detect the compression of a file from its magic number.
+
+    Parameters
+    ----------
+    file_path: str
+        Path of the file to be inspected.
+
+    Returns
+    -------
+    compression: Optional[str]
+        One of gzip, bz2, xz and zstd, or None if the file is not compressed.
+    """
+    with open(file_path, 'rb') as f:
+        head: bytes = f.read(_MAGIC_SIZE)
+    for magic, compression in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def compression_for_path(file_path: str) -> Optional[str]:
+    """Compression implied by the extension of a path, used for files which do not exist yet."""
+    for extension, compression in _EXTENSIONS:
+        if file_path.endswith(extension):
+            return compression
+    return None
+
+
+def is_compression_available(compression: str) -> bool:
+    """Check if the module needed for a compression is installed."""
+    return compression != 'zstd' or zstandard is not None
+
+
+def open_compressed(file: BinaryIO, compression: str, mode: str = 'rb') -> BinaryIO:
+    """Wrap a binary file in a stream which decompresses what is read or compresses what is written.
+
+    Parameters
+    ----------
+    file: BinaryIO
+        Compressed file, opened in binary mode.
+    compression: str
+        One of gzip, bz2, xz and zstd.
+    mode: str
+        rb or wb. (default is rb)
+
+    Returns
+    -------
+    stream: BinaryIO
+        Decompressing or compressing stream, closing it leaves file open.
+    """
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=file, mode=mode)  # type: ignore
+    if compression == 'bz2':
+        return bz2.BZ2File(file, mode)  # type: ignore
+    if compression == 'xz':
+        return lzma.LZMAFile(file, mode)  # type: ignore
+    if compression == 'zstd' and zstandard is not None:
+        if mode == 'rb':
+            return zstandard.ZstdDecompressor().stream_reader(file, read_across_frames=True, closefd=False)
+        return zstandard.ZstdCompressor().stream_writer(file, closefd=False)
+    raise ValueError('Unsupported compression: %s' % (compression))
+
+
+def read_decompressed_head(file_path: str, compression: str, size: int) -> bytes:
+    """Decompress the first size bytes of a compressed file."""
+    with open(file_path, 'rb') as f, open_compressed(f, compression) as stream:
+        return stream.read(size)
+
+
+class DecompressingReader:
+    """Decompresses a file on a worker thread, handing out its decompressed data in chunks.
+
+    At most MAX_PENDING_CHUNKS chunks are buffered, so the decompressed data is never held as a whole.
+    """
+
+    def __init__(self, file_path: str, compression: str, chunk_size: int, skip: int = 0) -> None:
+        self.compressed_size: int = os.path.getsize(file_path)
+        # Position in the compressed file up to which the chunks read so far were decompressed
+        self.compressed_position: int = 0
+        self.error: Optional[Exception] = None
+        self.finished: bool = False
+
+        self._queue: queue.Queue = queue.Queue(MAX_PENDING_CHUNKS)
+        self._stopped: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run, args=(file_path, compression, chunk_size, skip), daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item: Optional[Tuple[bytes, int]]) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _run(self, file_path: str, compression: str, chunk_size: int, skip: int) -> None:
+        try:
+            with open(file_path, 'rb') as f, open_compressed(f, compression) as stream:
+                stream.read(skip)
+                while not self._stopped.is_set():
+                    chunk: bytes = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    self._put((chunk, f.tell()))
+        except Exception as error:  # corrupt or truncated data, whatever was read is kept
+            self.error = error
+        finally:
+            # End marker
+            self._put(None)
+
+    def read(self) -> bytes:
+        """Next decompressed chunk, empty if none is ready yet or all were read."""
+        if self.finished:
+            return b''
+        try:
+            item: Optional[Tuple[bytes, int]] = self._queue.get_nowait()
+        except queue.Empty:
+            return b''
+        if item is None:
+            self.finished = True
+            self.compressed_position = self.compressed_size
+            return b''
+        chunk, self.compressed_position = item
+        return chunk
+
+    def progress(self) -> float:
+        """Fraction of the compressed file consumed by the chunks read so far."""
+        return self.compressed_position / self.compressed_size if self.compressed_size else 1.0
+
+    def stop(self) -> None:
+        """Stop decompressing, the worker thread exits soon after."""
+        self._stopped.set()
@@ -0,0 +1,207 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import codecs
+import io
+import os
+from typing import NamedTuple, Optional, Tuple
+
+SAMPLE_SIZE: int = 4096
+
+# Ordered so that the UTF-32 BOMs are tested before the UTF-16 BOMs they start with.
+_BOMS: Tuple[Tuple[bytes, str], ...] = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+# Control characters other than these are unusual in text files.
+_TEXT_CONTROL_BYTES: bytes = b'\t\n\r\f\b\x1b'
+
+_MAX_CONTROL_RATIO: float = 0.1
+
+
+class TextFormat(NamedTuple):
+    """On disk format of a text file."""
+
+    encoding: str
+    bom: bytes
+    newline: str
+
+
+def _read_samples(file_path: str) -> Tuple[bytes, bytes, bool]:
+    """Read the first and last SAMPLE_SIZE bytes of a file.
+
+    Returns
+    -------
+    samples: Tuple[bytes, bytes, bool]
+        Head sample, tail sample (empty if the head covers the whole file) and whether the head is the whole file.
+    """
+    file_size: int = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        head: bytes = f.read(SAMPLE_SIZE)
+        tail: bytes = b''
+        if file_size > 2 * SAMPLE_SIZE:
+            f.seek(-SAMPLE_SIZE, os.SEEK_END)
+            tail = f.read(SAMPLE_SIZE)
+        elif file_size > SAMPLE_SIZE:
+            tail = f.read()
+    return head, tail, file_size <= SAMPLE_SIZE
+
+
+def _guess_bomless_utf16(sample: bytes) -> Optional[str]:
+    """Detect UTF-16 text without BOM from the distribution of NUL bytes."""
+    if len(sample) < 2:
+        return None
+    even_nuls: int = sample[0::2].count(0)
+    odd_nuls: int = sample[1::2].count(0)
+    half: float = len(sample) / 2
+    if odd_nuls > 0.3 * half and even_nuls < 0.05 * half:
+        return 'utf-16-le'
+    if even_nuls > 0.3 * half and odd_nuls < 0.05 * half:
+        return 'utf-16-be'
+    return None
+
+
+def _is_binary(sample: bytes) -> bool:
+    """Check NUL and control character density of a sample."""
+    if not sample:
+        return False
+    if b'\x00' in sample:
+        return True
+    control_count: int = sum(1 for byte in sample if byte < 0x20 and byte not in _TEXT_CONTROL_BYTES)
+    return control_count / len(sample) > _MAX_CONTROL_RATIO
+
+
+def _is_utf8(head: bytes, tail: bytes, head_is_whole_file: bool) -> bool:
+    """Check UTF-8 validity of samples, tolerating sequences cut at the sample edges."""
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=head_is_whole_file)
+        if tail:
+            # Skip continuation bytes of a character cut at the start of the tail sample
+            start: int = 0
+            while start < min(3, len(tail)) and 0x80 <= tail[start] <= 0xBF:
+                start += 1
+            tail[start:].decode('utf-8')
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _detect_newline(text: str) -> Optional[str]:
+    if '\r\n' in text:
+        return '\r\n'
+    if '\n' in text:
+        return '\n'
+    if '\r' in text:
+        return '\r'
+    return None
+
+
+def newline_decoder(encoding: str, errors: str = 'strict') -> io.IncrementalNewlineDecoder:
+    """Incremental decoder translating CRLF and CR newlines to LF, as the document stores them.
+
+    A CR ending the data decoded so far is held back until the next data tells if an LF follows it, so that a
+    CRLF cut between two chunks is still one newline.
+
+    Parameters
+    ----------
+    encoding: str
+        Encoding of the data.
+    errors: str
+        Error handling of the encoding. (default is 'strict')
+
+    Returns
+    -------
+    decoder: io.IncrementalNewlineDecoder
+        The decoder.
+    """
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(errors=errors), translate=True)
+
+
+def pending_size(decoder: io.IncrementalNewlineDecoder, encoding: str) -> int:
+    """Number of bytes given to a newline decoder which it has not decoded yet, a held back CR included."""
+    buffer, flags = decoder.getstate()
+    return len(buffer) + (len('\r'.encode(encoding)) if flags & 1 else 0)
+
+
+def detect_text_format(file_path: str) -> Optional[TextFormat]:
+    """Detect encoding, byte order mark and newline style of a file from samples of it.
+
+    Only the first and last SAMPLE_SIZE bytes are read, so this is cheap regardless of the file size.
+
+    Parameters
+    ----------
+    file_path: str
+        Path of the file to be inspected.
+
+    Returns
+    -------
+    text_format: Optional[TextFormat]
+        Detected format, or None if the file looks binary.
+    """
+    return detect_text_format_of_samples(*_read_samples(file_path))
+
+
+def detect_text_format_of_samples(
+    head: bytes, tail: bytes = b'', head_is_whole_file: bool = False
+) -> Optional[TextFormat]:
+    """Detect encoding, byte order mark and newline style of data from samples of it.
+
+    Parameters
+    ----------
+    head: bytes
+        Start of the data.
+    tail: bytes
+        End of the data, empty if unknown or covered by head. (default is empty)
+    head_is_whole_file: bool
+        Head is all of the data. (default is False)
+
+    Returns
+    -------
+    text_format: Optional[TextFormat]
+        Detected format, or None if the data looks binary.
+    """
+    encoding: Optional[str] = None
+    bom: bytes = b''
+    for bom_bytes, bom_encoding in _BOMS:
+        if head.startswith(bom_bytes):
+            encoding, bom = bom_encoding, bom_bytes
+            break
+
+    if encoding is None:
+        encoding = _guess_bomless_utf16(head)
+
+    if encoding is None:
+        if _is_binary(head) or _is_binary(tail):
+            return None
+        # Latin-1 maps every byte, so anything that is not UTF-8 still round trips
+        encoding = 'utf-8' if _is_utf8(head, tail, head_is_whole_file) else 'latin-1'
+
+    # A first line longer than the head sample has its line ending in the tail sample only
+    newline: Optional[str] = _detect_newline(head[len(bom) :].decode(encoding, errors='replace'))
+    if newline is None:
+        newline = _detect_newline(tail.decode(encoding, errors='replace'))
+    return TextFormat(encoding, bom, newline or '\n')
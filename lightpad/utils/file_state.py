@@ -0,0 +1,92 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import os
+from typing import Optional, Tuple
+
+# mtime in nanoseconds, size and inode of a file
+FileStat = Tuple[int, int, int]
+
+# Number of bytes at the end of a file remembered to recognise appends
+TAIL_SIZE: int = 4096
+
+
+def stat_file(file_path: str) -> Optional[FileStat]:
+    """Get the FileStat of a file, or None if it does not exist."""
+    try:
+        stat_result: os.stat_result = os.stat(file_path)
+    except OSError:
+        return None
+    return stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino
+
+
+def read_file_state(file_path: str, size: Optional[int] = None) -> Tuple[Optional[FileStat], bytes]:
+    """Get the FileStat and the last TAIL_SIZE bytes of a file, as if it ended at size if given.
+
+    Parameters
+    ----------
+    file_path: str
+        Path of the file.
+    size: Optional[int]
+        Size the file had when it was read, if it may have grown since. (default is None)
+
+    Returns
+    -------
+    state: Tuple[Optional[FileStat], bytes]
+        Stat of the file, None if it does not exist, and its last bytes.
+    """
+    file_stat: Optional[FileStat] = stat_file(file_path)
+    if file_stat is None:
+        return None, b''
+    if size is not None:
+        file_stat = (file_stat[0], size, file_stat[2])
+    end: int = file_stat[1]
+    with open(file_path, 'rb') as f:
+        f.seek(max(0, end - TAIL_SIZE))
+        return file_stat, f.read(min(end, TAIL_SIZE))
+
+
+def is_appended(file_path: str, old_stat: Optional[FileStat], old_tail: bytes) -> bool:
+    """Check if a file only grew at its end since it had old_stat and ended with old_tail.
+
+    Parameters
+    ----------
+    file_path: str
+        Path of the file.
+    old_stat: Optional[FileStat]
+        Previous stat of the file.
+    old_tail: bytes
+        Last bytes of the file when it had old_stat.
+
+    Returns
+    -------
+    appended: bool
+        True if the file is the same inode, grew, and still has old_tail at the old end.
+    """
+    new_stat: Optional[FileStat] = stat_file(file_path)
+    if old_stat is None or new_stat is None or new_stat[2] != old_stat[2] or new_stat[1] <= old_stat[1]:
+        return False
+    old_size: int = old_stat[1]
+    with open(file_path, 'rb') as f:
+        f.seek(old_size - len(old_tail))
+        return f.read(len(old_tail)) == old_tail
@@ -0,0 +1,175 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import os
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+# Status of a path in a git work tree
+MODIFIED: str = 'modified'
+UNTRACKED: str = 'untracked'
+IGNORED: str = 'ignored'
+CONFLICTED: str = 'conflicted'
+
+# Directories take the status of the most important of their entries
+_DIRECTORY_PRIORITY: Dict[str, int] = {UNTRACKED: 1, MODIFIED: 2, CONFLICTED: 3}
+
+
+def find_repository(path: str) -> Optional[Tuple[str, str]]:
+    """Find the git work tree containing a path, looking for .git in it and its parents.
+
+    Parameters
+    ----------
+    path: str
+        File or directory.
+
+    Returns
+    -------
+    repository: Optional[Tuple[str, str]]
+        Root of the work tree and its git directory, None if the path is not in one.
+    """
+    directory: str = os.path.abspath(path)
+    while True:
+        dot_git: str = os.path.join(directory, '.git')
+        if os.path.isdir(dot_git):
+            return directory, dot_git
+        if os.path.isfile(dot_git):
+            # Linked work trees and submodules point to their git directory
+            with open(dot_git, 'r') as f:
+                line: str = f.readline().strip()
+            if line.startswith('gitdir:'):
+                return directory, os.path.normpath(os.path.join(directory, line[len('gitdir:') :].strip()))
+        parent: str = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def parse_status(output: bytes) -> Dict[str, str]:
+    """Parse the output of git status --porcelain=v2 -z.
+
+    Parameters
+    ----------
+    output: bytes
+        NUL separated entries.
+
+    Returns
+    -------
+    statuses: Dict[str, str]
+        Status by path relative to the work tree root, with / as separator. Untracked and
+        ignored directories are listed as a whole, without their entries.
+    """
+    statuses: Dict[str, str] = {}
+    entries: List[bytes] = output.split(b'\0')
+    index: int = 0
+    while index < len(entries):
+        entry: bytes = entries[index]
+        index += 1
+        kind: bytes = entry[:1]
+        if kind == b'1':
+            statuses[os.fsdecode(entry.split(b' ', 8)[8])] = MODIFIED
+        elif kind == b'2':
+            statuses[os.fsdecode(entry.split(b' ', 9)[9])] = MODIFIED
+            index += 1  # the path it was renamed or copied from
+        elif kind == b'u':
+            statuses[os.fsdecode(entry.split(b' ', 10)[10])] = CONFLICTED
+        elif kind == b'?':
+            statuses[os.fsdecode(entry[2:]).rstrip('/')] = UNTRACKED
+        elif kind == b'!':
+            statuses[os.fsdecode(entry[2:]).rstrip('/')] = IGNORED
+    return statuses
+
+
+class RepositoryStatus:
+    """Status of the paths of a git work tree, from a single git status run.
+
+    Looking up a path costs a dictionary lookup, and one per parent directory if it has no status of its own.
+    """
+
+    def __init__(self, root: str, statuses: Dict[str, str]) -> None:
+        self.root: str = root
+        self._statuses: Dict[str, str] = statuses
+
+        # Directories containing changed paths
+        self._directories: Dict[str, str] = {}
+        for path, status in statuses.items():
+            priority: int = _DIRECTORY_PRIORITY.get(status, 0)
+            if not priority:
+                continue
+            parent: str = path.rpartition('/')[0]
+            while parent and _DIRECTORY_PRIORITY.get(self._directories.get(parent, ''), 0) < priority:
+                self._directories[parent] = status
+                parent = parent.rpartition('/')[0]
+
+    def status(self, path: str) -> Optional[str]:
+        """Status of a path in the work tree.
+
+        Parameters
+        ----------
+        path: str
+            Absolute path.
+
+        Returns
+        -------
+        status: Optional[str]
+            One of MODIFIED, UNTRACKED, IGNORED and CONFLICTED, None if unchanged or not in the work tree.
+        """
+        relative_path: str = os.path.relpath(path, self.root).replace(os.sep, '/')
+        if relative_path.startswith('..'):
+            return None
+        status: Optional[str] = self._statuses.get(relative_path) or self._directories.get(relative_path)
+        if status is not None:
+            return status
+
+        # Paths in untracked or ignored directories are not listed on their own
+        parent: str = relative_path.rpartition('/')[0]
+        while parent:
+            status = self._statuses.get(parent)
+            if status is not None:
+                return status
+            parent = parent.rpartition('/')[0]
+        return None
+
+
+def read_status(root: str) -> RepositoryStatus:
+    """Run git status once for a whole work tree.
+
+    Parameters
+    ----------
+    root: str
+        Root of the work tree.
+
+    Returns
+    -------
+    status: RepositoryStatus
+        Status of its paths.
+    """
+    output: bytes = subprocess.run(
+        # Without optional locks git status does not write the index, which would trigger another refresh
+        ['git', '--no-optional-locks', '-C', root, 'status', '--porcelain=v2', '-z', '--ignored'],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        check=True,
+    ).stdout
+    return RepositoryStatus(root, parse_status(output))
@@ -0,0 +1,200 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import hashlib
+import os
+import queue
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import ujson
+
+from lightpad import data_dir
+from lightpad.utils.commons import DebugType, debug
+
+JOURNAL_DIR: str = os.path.join(data_dir, 'journal')
+
+# Rewrite the journal with merged records after this many appended records
+COMPACT_INTERVAL: int = 1_000
+
+# position, removed length, inserted text
+Record = List
+
+_RESET = object()
+_CLOSE = object()
+
+
+def _merge(previous: Record, record: Record) -> bool:
+    """Merge record into previous if it only touches text previous inserted, or extends its deletion.
+
+    Returns
+    -------
+    merged: bool
+        True if previous was updated to also cover record.
+    """
+    position, removed, text = previous
+    new_position, new_removed, new_text = record
+
+    if position <= new_position and new_position + new_removed <= position + len(text):
+        offset: int = new_position - position
+        previous[2] = text[:offset] + new_text + text[offset + new_removed :]
+        return True
+    if not text and not new_text:
+        if new_position + new_removed == position:  # backspace
+            previous[0], previous[1] = new_position, removed + new_removed
+            return True
+        if new_position == position:  # delete
+            previous[1] = removed + new_removed
+            return True
+    return False
+
+
+def _stat_header(file_path: str) -> Dict:
+    """Header identifying the on disk file a journal applies to."""
+    header: Dict = {'file_path': file_path, 'size': -1, 'mtime_ns': -1}
+    if os.path.isfile(file_path):
+        stat_result: os.stat_result = os.stat(file_path)
+        header['size'] = stat_result.st_size
+        header['mtime_ns'] = stat_result.st_mtime_ns
+    return header
+
+
+class EditJournal:
+    """Append only journal of the unsaved edits of one file.
+
+    Edits are queued by the GUI thread and written by a background thread, so
+    recording costs a queue put and the journal grows with what was typed, not
+    with the size of the file.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path: str = file_path
+        self.journal_path: str = os.path.join(
+            JOURNAL_DIR, hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest() + '.journal'
+        )
+        self._header: Dict = _stat_header(file_path)
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread = threading.Thread(target=self._writer, name='journal-writer', daemon=True)
+        self._thread.start()
+
+    def record(self, position: int, removed: int, text: str) -> None:
+        """Queue an edit which replaced removed characters at position by text."""
+        self._queue.put([position, removed, text])
+
+    def reset(self) -> None:
+        """Drop the journal, the file on disk now contains every edit. Call after saving."""
+        self._queue.put(_RESET)
+
+    def close(self) -> None:
+        """Stop the writer and delete the journal."""
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def _write_all(self, records: List[Record]) -> None:
+        """Rewrite the journal with the given records."""
+        temp_path: str = self.journal_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(ujson.dumps(self._header) + '\n')
+            for record in records:
+                f.write(ujson.dumps(record) + '\n')
+        os.replace(temp_path, self.journal_path)
+
+    def _remove(self) -> None:
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def _writer(self) -> None:
+        records: List[Record] = []
+        appended: int = 0
+        while True:
+            batch: List = [self._queue.get()]
+            # Write everything queued in the mean time in one go
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            lines: List[str] = []
+            for item in batch:
+                if item is _CLOSE:
+                    self._remove()
+                    return
+                if item is _RESET:
+                    self._remove()
+                    self._header = _stat_header(self.file_path)
+                    records, appended, lines = [], 0, []
+                    continue
+                if not records or not _merge(records[-1], item):
+                    records.append(item)
+                lines.append(ujson.dumps(item) + '\n')
+
+            if not lines:
+                continue
+            try:
+                if appended == 0:
+                    os.makedirs(JOURNAL_DIR, exist_ok=True)
+                    self._write_all(records)
+                elif appended + len(lines) >= COMPACT_INTERVAL and len(records) < appended:
+                    self._write_all(records)
+                    appended = len(records)
+                    continue
+                else:
+                    with open(self.journal_path, 'a', encoding='utf-8') as f:
+                        f.writelines(lines)
+                appended += len(lines)
+            except OSError as e:
+                debug('Could not write journal %s: %s' % (self.journal_path, e), debug_type=DebugType.WARNING)
+
+
+def read_journal(journal_path: str) -> Optional[Tuple[Dict, List[Record]]]:
+    """Read header and records of a journal, ignoring a record torn by a crash.
+
+    Returns
+    -------
+    journal: Optional[Tuple[Dict, List[Record]]]
+        Header and records, or None if the journal could not be read.
+    """
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            header: Dict = ujson.loads(f.readline())
+            records: List[Record] = []
+            for line in f:
+                try:
+                    records.append(ujson.loads(line))
+                except ValueError:
+                    break
+    except (OSError, ValueError):
+        return None
+    return header, records
+
+
+def pending_journals() -> List[str]:
+    """Paths of journals left behind by a session which did not exit cleanly."""
+    if not os.path.isdir(JOURNAL_DIR):
+        return []
+    return [
+        os.path.join(JOURNAL_DIR, file_name) for file_name in os.listdir(JOURNAL_DIR) if file_name.endswith('.journal')
+    ]
+
+
+def is_journal_applicable(header: Dict) -> bool:
+    """Check that the file a journal was recorded against did not change since."""
+    return _stat_header(header['file_path']) == header
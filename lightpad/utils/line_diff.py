@@ -0,0 +1,77 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+from typing import Dict, List, Sequence
+
+from lightpad.utils.myers_diff import LineRange, diff_ids
+
+
+def _intern_lines(lines: Sequence[str], ids: Dict[str, int]) -> List[int]:
+    """Map lines to integers, so that comparing lines is comparing integers."""
+    return [ids.setdefault(line, len(ids)) for line in lines]
+
+
+def diff_lines(old_lines: Sequence[str], new_lines: Sequence[str]) -> List[LineRange]:
+    """Find the line ranges which differ between two versions of a text.
+
+    Parameters
+    ----------
+    old_lines: Sequence[str]
+        Lines of the old version.
+    new_lines: Sequence[str]
+        Lines of the new version.
+
+    Returns
+    -------
+    line_ranges: List[LineRange]
+        Ascending (old start, old end, new start, new end) ranges, where old_lines[old start:old end]
+        has to be replaced by new_lines[new start:new end].
+    """
+    old_count: int = len(old_lines)
+    new_count: int = len(new_lines)
+
+    prefix: int = 0
+    while prefix < old_count and prefix < new_count and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix: int = 0
+    while (
+        suffix < old_count - prefix
+        and suffix < new_count - prefix
+        and old_lines[old_count - suffix - 1] == new_lines[new_count - suffix - 1]
+    ):
+        suffix += 1
+
+    old_end: int = old_count - suffix
+    new_end: int = new_count - suffix
+    if prefix == old_end and prefix == new_end:
+        return []
+    if prefix == old_end or prefix == new_end:
+        return [(prefix, old_end, prefix, new_end)]
+
+    ids: Dict[str, int] = {}
+    old_ids: List[int] = _intern_lines(old_lines[prefix:old_end], ids)
+    new_ids: List[int] = _intern_lines(new_lines[prefix:new_end], ids)
+    return [
+        (prefix + old_start, prefix + old_stop, prefix + new_start, prefix + new_stop)
+        for old_start, old_stop, new_start, new_stop in diff_ids(old_ids, new_ids)
+    ]
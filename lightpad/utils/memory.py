@@ -0,0 +1,96 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import os
+import re
+from typing import Dict, Optional
+
+from lightpad.utils.commons import DebugType, debug
+
+# Environment variable setting the memory all tabs together should stay under, like 2G or 512M
+MEMORY_BUDGET_VARIABLE: str = 'LIGHTPAD_MEMORY_BUDGET'
+
+# Environment variable setting the memory the undo history of a tab should stay under
+UNDO_BUDGET_VARIABLE: str = 'LIGHTPAD_UNDO_BUDGET'
+DEFAULT_UNDO_BUDGET: int = 256 * 1024**2
+
+_UNITS: Dict[str, int] = {'': 1, 'K': 1024, 'M': 1024**2, 'G': 1024**3, 'T': 1024**4}
+_SIZE_PATTERN: re.Pattern = re.compile(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*', re.IGNORECASE)
+
+
+def parse_size(text: str) -> Optional[int]:
+    """Number of bytes of a size like 1.5G, 512M, 64KiB or 1000.
+
+    Parameters
+    ----------
+    text: str
+        Size, with an optional binary unit.
+
+    Returns
+    -------
+    size: Optional[int]
+        Bytes, None if text is not a size.
+    """
+    match: Optional[re.Match] = _SIZE_PATTERN.fullmatch(text)
+    if match is None:
+        return None
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+
+def format_size(size: int) -> str:
+    """Size in bytes with a binary unit, like 1.5 GB."""
+    value: float = size
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024:
+            return '%d %s' % (value, unit) if unit == 'B' else '%.1f %s' % (value, unit)
+        value /= 1024
+    return '%.1f TB' % (value)
+
+
+def format_usage(usage: Dict[str, int]) -> str:
+    """Total of the bytes used by the parts of something, followed by the size of each part."""
+    return '%s (%s)' % (
+        format_size(sum(usage.values())),
+        ', '.join('%s %s' % (part, format_size(size)) for part, size in usage.items() if size),
+    )
+
+
+def _budget(variable: str) -> Optional[int]:
+    text: str = os.environ.get(variable, '')
+    if not text:
+        return None
+    budget: Optional[int] = parse_size(text)
+    if budget is None:
+        debug('Ignoring invalid %s: %s' % (variable, text), debug_type=DebugType.WARNING)
+    return budget
+
+
+def memory_budget() -> Optional[int]:
+    """Bytes all tabs together should stay under, from MEMORY_BUDGET_VARIABLE, None if it is not set."""
+    return _budget(MEMORY_BUDGET_VARIABLE)
+
+
+def undo_budget() -> int:
+    """Bytes the undo history of a tab should stay under, from UNDO_BUDGET_VARIABLE or DEFAULT_UNDO_BUDGET."""
+    budget: Optional[int] = _budget(UNDO_BUDGET_VARIABLE)
+    return budget if budget is not None else DEFAULT_UNDO_BUDGET
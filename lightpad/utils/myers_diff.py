@@ -0,0 +1,278 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+from bisect import bisect_left
+from collections import Counter
+from itertools import compress, count, islice
+from operator import lt
+from typing import Dict, List, Sequence, Set, Tuple
+
+# old start, old end, new start, new end
+LineRange = Tuple[int, int, int, int]
+
+# Edit distance up to which a region is diffed directly, before matching unique lines to split it up
+DIRECT_EDIT_DISTANCE: int = 256
+
+# Above this edit distance a region is reported as replaced as a whole, the search costs its square
+MAX_EDIT_DISTANCE: int = 1_000
+
+
+def _common_run(a: Sequence[int], i: int, b: Sequence[int], j: int, limit: int) -> int:
+    """Length of the equal run starting at a[i] and b[j], at most limit.
+
+    Slices are compared with exponentially growing steps, so long runs are scanned at C speed.
+    """
+    length: int = 0
+    step: int = 1
+    while length + step <= limit and a[i + length : i + length + step] == b[j + length : j + length + step]:
+        length += step
+        step *= 2
+    while step > 1:
+        step //= 2
+        if length + step <= limit and a[i + length : i + length + step] == b[j + length : j + length + step]:
+            length += step
+    return length
+
+
+def _common_run_backward(a: Sequence[int], i: int, b: Sequence[int], j: int, limit: int) -> int:
+    """Length of the equal run ending before a[i] and b[j], at most limit."""
+    length: int = 0
+    step: int = 1
+    while length + step <= limit and a[i - length - step : i - length] == b[j - length - step : j - length]:
+        length += step
+        step *= 2
+    while step > 1:
+        step //= 2
+        if length + step <= limit and a[i - length - step : i - length] == b[j - length - step : j - length]:
+            length += step
+    return length
+
+
+def _middle_snake(
+    a: Sequence[int], a_low: int, a_high: int, b: Sequence[int], b_low: int, b_high: int, max_distance: int
+) -> Tuple[int, int, int, int, int]:
+    """Find the middle snake of the shortest edit script between a[a_low:a_high] and b[b_low:b_high].
+
+    Returns
+    -------
+    snake: Tuple[int, int, int, int, int]
+        Edit distance, and start and end of the snake as offsets into the two ranges.
+        The edit distance is -1 if it exceeds max_distance.
+    """
+    n: int = a_high - a_low
+    m: int = b_high - b_low
+    delta: int = n - m
+    odd: bool = bool(delta & 1)
+    max_d: int = min((n + m + 1) // 2, (max_distance + 1) // 2)
+    offset: int = max_d + 1
+    forward: List[int] = [0] * (2 * max_d + 3)
+    backward: List[int] = [0] * (2 * max_d + 3)
+
+    for d in range(max_d + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x: int = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y: int = x - k
+            x_start, y_start = x, y
+            if x < n and y < m and a[a_low + x] == b[b_low + y]:
+                run: int = _common_run(a, a_low + x, b, b_low + y, min(n - x, m - y))
+                x += run
+                y += run
+            forward[offset + k] = x
+            c: int = delta - k
+            if odd and -(d - 1) <= c <= d - 1 and x + backward[offset + c] >= n:
+                return 2 * d - 1, x_start, y_start, x, y
+
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            x_start, y_start = x, y
+            if x < n and y < m and a[a_high - 1 - x] == b[b_high - 1 - y]:
+                run = _common_run_backward(a, a_high - x, b, b_high - y, min(n - x, m - y))
+                x += run
+                y += run
+            backward[offset + k] = x
+            c = delta - k
+            if not odd and -d <= c <= d and x + forward[offset + c] >= n:
+                return 2 * d, n - x, m - y, n - x_start, m - y_start
+    return -1, 0, 0, 0, 0
+
+
+def _myers(
+    a: Sequence[int],
+    a_low: int,
+    a_high: int,
+    b: Sequence[int],
+    b_low: int,
+    b_high: int,
+    ranges: List[LineRange],
+    anchored: bool,
+) -> None:
+    """Append the differing ranges of a[a_low:a_high] and b[b_low:b_high] to ranges, in linear space.
+
+    Regions whose edit distance is too large are split at unique lines first, unless they already were.
+    """
+    run: int = _common_run(a, a_low, b, b_low, min(a_high - a_low, b_high - b_low))
+    a_low += run
+    b_low += run
+    run = _common_run_backward(a, a_high, b, b_high, min(a_high - a_low, b_high - b_low))
+    a_high -= run
+    b_high -= run
+    if a_low == a_high or b_low == b_high:
+        if a_low != a_high or b_low != b_high:
+            ranges.append((a_low, a_high, b_low, b_high))
+        return
+
+    max_distance: int = MAX_EDIT_DISTANCE if anchored else DIRECT_EDIT_DISTANCE
+    distance, x, y, u, v = _middle_snake(a, a_low, a_high, b, b_low, b_high, max_distance)
+    if distance < 0:
+        if anchored:
+            ranges.append((a_low, a_high, b_low, b_high))
+        else:
+            _anchored(a, a_low, a_high, b, b_low, b_high, ranges)
+        return
+    # Both halves have a smaller edit distance, the snake between them is equal
+    _myers(a, a_low, a_low + x, b, b_low, b_low + y, ranges, anchored)
+    _myers(a, a_low + u, a_high, b, b_low + v, b_high, ranges, anchored)
+
+
+def _unique_anchors(
+    a: Sequence[int], a_low: int, a_high: int, b: Sequence[int], b_low: int, b_high: int
+) -> Tuple[List[int], List[int]]:
+    """Longest increasing sequence of pairs of lines which occur exactly once in both ranges, as in patience diff.
+
+    Returns
+    -------
+    anchors: Tuple[List[int], List[int]]
+        Positions of the paired lines in a, and in b.
+    """
+    a_lines: Sequence[int] = a[a_low:a_high]
+    b_lines: Sequence[int] = b[b_low:b_high]
+    unique: Set[int] = {line for line, n in Counter(a_lines).items() if n == 1}
+    unique.intersection_update(line for line, n in Counter(b_lines).items() if n == 1)
+    b_positions: Dict[int, int] = dict(zip(b_lines, count(b_low)))
+    is_unique: List[bool] = list(map(unique.__contains__, a_lines))
+    a_indexes: List[int] = list(compress(count(a_low), is_unique))
+    b_indexes: List[int] = list(map(b_positions.__getitem__, compress(a_lines, is_unique)))
+    if all(map(lt, b_indexes, islice(b_indexes, 1, None))):
+        # Nothing was moved, which is the common case
+        return a_indexes, b_indexes
+
+    # Patience sorting of the b positions, with back links to rebuild the sequence
+    tails: List[int] = []
+    tail_indexes: List[int] = []
+    previous: List[int] = [-1] * len(b_indexes)
+    for index, j in enumerate(b_indexes):
+        pile: int = bisect_left(tails, j)
+        if pile == len(tails):
+            tails.append(j)
+            tail_indexes.append(index)
+        else:
+            tails[pile] = j
+            tail_indexes[pile] = index
+        previous[index] = tail_indexes[pile - 1] if pile > 0 else -1
+
+    sequence: List[int] = []
+    index: int = tail_indexes[-1] if tail_indexes else -1
+    while index >= 0:
+        sequence.append(index)
+        index = previous[index]
+    sequence.reverse()
+    return [a_indexes[index] for index in sequence], [b_indexes[index] for index in sequence]
+
+
+def _diff_between_anchors(
+    a: Sequence[int],
+    b: Sequence[int],
+    a_anchors: List[int],
+    b_anchors: List[int],
+    p: int,
+    q: int,
+    ranges: List[LineRange],
+) -> None:
+    """Append the differing ranges between anchors p and q, skipping equal stretches with a single comparison."""
+    a_low: int = a_anchors[p] + 1
+    b_low: int = b_anchors[p] + 1
+    a_high: int = a_anchors[q]
+    b_high: int = b_anchors[q]
+    if a_high - a_low == b_high - b_low and a[a_low:a_high] == b[b_low:b_high]:
+        return
+    if q - p == 1:
+        _myers(a, a_low, a_high, b, b_low, b_high, ranges, True)
+        return
+    middle: int = (p + q) // 2
+    _diff_between_anchors(a, b, a_anchors, b_anchors, p, middle, ranges)
+    _diff_between_anchors(a, b, a_anchors, b_anchors, middle, q, ranges)
+
+
+def _anchored(
+    a: Sequence[int], a_low: int, a_high: int, b: Sequence[int], b_low: int, b_high: int, ranges: List[LineRange]
+) -> None:
+    """Append the differing ranges between the unique lines of both ranges, each gap diffed on its own."""
+    a_anchors, b_anchors = _unique_anchors(a, a_low, a_high, b, b_low, b_high)
+    a_anchors = [a_low - 1] + a_anchors + [a_high]
+    b_anchors = [b_low - 1] + b_anchors + [b_high]
+    _diff_between_anchors(a, b, a_anchors, b_anchors, 0, len(a_anchors) - 1, ranges)
+
+
+def _merge_adjacent(ranges: List[LineRange]) -> List[LineRange]:
+    """Join ranges which touch, like a deletion directly followed by an insertion."""
+    merged: List[LineRange] = []
+    for line_range in ranges:
+        if merged and merged[-1][1] == line_range[0] and merged[-1][3] == line_range[2]:
+            merged[-1] = (merged[-1][0], line_range[1], merged[-1][2], line_range[3])
+        else:
+            merged.append(line_range)
+    return merged
+
+
+def diff_ids(a: Sequence[int], b: Sequence[int]) -> List[LineRange]:
+    """Find the ranges which differ between two sequences of line ids or hashes.
+
+    Small differences are found with the linear space Myers algorithm directly. Larger ones are first split
+    at lines occurring once in both sequences, as in patience diff, and the gaps between them compared on their own.
+
+    Parameters
+    ----------
+    a: Sequence[int]
+        Ids of the old lines, a list or an array.
+    b: Sequence[int]
+        Ids of the new lines, a list or an array.
+
+    Returns
+    -------
+    line_ranges: List[LineRange]
+        Ascending (old start, old end, new start, new end) ranges, where a[old start:old end]
+        has to be replaced by b[new start:new end].
+    """
+    if type(a) is not type(b):
+        # Runs of lines are compared as slices, and slices of different types are never equal
+        a, b = list(a), list(b)
+    ranges: List[LineRange] = []
+    _myers(a, 0, len(a), b, 0, len(b), ranges, False)
+    return _merge_adjacent(ranges)
@@ -0,0 +1,102 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import mmap
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Optional, Union
+
+Buffer = Union[bytes, mmap.mmap]
+
+# Bytes whose newlines are counted together
+STRIDE: int = 1024 * 1024
+
+
+def _count_newlines(buffer: Buffer, start: int, end: int) -> int:
+    if isinstance(buffer, bytes):
+        return buffer.count(b'\n', start, end)
+    # mmap has no count, a slice of it is a copy of at most STRIDE bytes
+    return buffer[start:end].count(b'\n')
+
+
+def is_newline_indexable(encoding: str) -> bool:
+    """Check if newlines of text in an encoding are single \\n bytes which never occur inside other characters."""
+    return '\n'.encode(encoding) == b'\n' and not encoding.lower().replace('_', '-').startswith(('utf-16', 'utf-32'))
+
+
+class NewlineIndex:
+    """Byte offsets of the lines of a raw buffer, found without decoding it.
+
+    Only the number of newlines of each STRIDE bytes is kept, which is counted at C speed, so the index
+    of a gigabyte takes a fraction of a second and a few kilobytes. Offsets within a stride are found
+    by scanning it when asked for.
+    """
+
+    def __init__(self, buffer: Buffer, start: int = 0) -> None:
+        """
+        Parameters
+        ----------
+        buffer: Buffer
+            Raw file, in an encoding for which is_newline_indexable holds.
+        start: int
+            Offset of the first line, after any byte order mark. (default is 0)
+        """
+        self.buffer: Buffer = buffer
+        self.start: int = start
+        self.size: int = len(buffer)
+        # Newlines before the start of each stride
+        self._newlines: List[int] = [0] + list(
+            accumulate(
+                _count_newlines(buffer, offset, min(offset + STRIDE, self.size))
+                for offset in range(start, self.size, STRIDE)
+            )
+        )
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines, a last line without a newline included."""
+        return self._newlines[-1] + 1
+
+    def line_start(self, line: int) -> Optional[int]:
+        """Offset of the start of a line, starting at 0, or None if there are fewer lines."""
+        if line <= 0:
+            return self.start
+        if line >= self.line_count:
+            return None
+        stride: int = bisect_right(self._newlines, line - 1) - 1
+        offset: int = self.start + stride * STRIDE
+        for _ in range(line - self._newlines[stride]):
+            offset = self.buffer.find(b'\n', offset) + 1
+        return offset
+
+    def line_of(self, offset: int) -> int:
+        """Line, starting at 0, of the byte at an offset."""
+        offset = min(max(offset, self.start), self.size)
+        stride: int = (offset - self.start) // STRIDE
+        return self._newlines[stride] + _count_newlines(self.buffer, self.start + stride * STRIDE, offset)
+
+    def line_end(self, offset: int, end: Optional[int] = None) -> int:
+        """Offset after the newline ending the line of the byte at an offset, or end if it is not ended before it."""
+        end = self.size if end is None else end
+        newline: int = self.buffer.find(b'\n', offset, end)
+        return end if newline == -1 else newline + 1
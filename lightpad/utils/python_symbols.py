@@ -0,0 +1,183 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import ast
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+
+PYTHON_EXTENSIONS: Tuple[str, ...] = ('.py', '.pyw', '.pyi')
+
+# Name, kind (class or function), line starting at 0 and nesting depth of a definition
+Symbol = Tuple[str, str, int, int]
+
+CLASS: str = 'class'
+FUNCTION: str = 'function'
+
+# Lines at column 0 which continue the statement before them
+_CONTINUATIONS: Tuple[str, ...] = ('else', 'elif', 'except', 'finally', ')', ']', '}', '#')
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock: threading.Lock = threading.Lock()
+# Work submitted by submit_symbol_job, cancelled by shutdown_symbol_pool if it has not started
+_jobs: weakref.WeakSet = weakref.WeakSet()
+
+
+def _collect(nodes: Sequence[ast.AST], depth: int, symbols: List[Symbol]) -> None:
+    for node in nodes:
+        if isinstance(node, ast.ClassDef):
+            symbols.append((node.name, CLASS, node.lineno - 1, depth))
+            _collect(node.body, depth + 1, symbols)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            symbols.append((node.name, FUNCTION, node.lineno - 1, depth))
+            _collect(node.body, depth + 1, symbols)
+        else:
+            # Definitions in if, try, with and loop blocks
+            _collect(
+                [child for child in ast.iter_child_nodes(node) if isinstance(child, (ast.stmt, ast.excepthandler))],
+                depth,
+                symbols,
+            )
+
+
+def parse_symbols(source: Union[str, bytes]) -> Optional[List[Symbol]]:
+    """Find the classes and functions defined in Python source.
+
+    Parameters
+    ----------
+    source: Union[str, bytes]
+        Python source, bytes are decoded as declared by their coding comment.
+
+    Returns
+    -------
+    symbols: Optional[List[Symbol]]
+        Definitions in the order they appear, None if the source does not parse.
+    """
+    try:
+        tree: ast.Module = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    symbols: List[Symbol] = []
+    _collect(tree.body, 0, symbols)
+    return symbols
+
+
+def parse_chunks(chunks: Sequence[str]) -> List[Optional[List[Symbol]]]:
+    """Find the symbols of each of several chunks of Python source, run in the symbol pool.
+
+    Parameters
+    ----------
+    chunks: Sequence[str]
+        Chunks of source, see split_top_level.
+
+    Returns
+    -------
+    symbols: List[Optional[List[Symbol]]]
+        Symbols of each chunk with lines relative to its start, None for chunks which do not parse.
+    """
+    return [parse_symbols(chunk) for chunk in chunks]
+
+
+def split_top_level(lines: Sequence[str]) -> List[int]:
+    """Split Python source into chunks of top level statements, which can be parsed on their own.
+
+    A chunk starts at each line at column 0, except for decorated definitions, continuations of
+    compound statements and closing brackets, and lines inside triple quoted strings. Chunks
+    which still do not parse on their own, like lines at column 0 inside brackets, fail to parse.
+
+    Parameters
+    ----------
+    lines: Sequence[str]
+        Lines of the source.
+
+    Returns
+    -------
+    starts: List[int]
+        First line of each chunk, starting with 0.
+    """
+    starts: List[int] = [0]
+    in_string: str = ''
+    after_decorator: bool = False
+    for number, line in enumerate(lines):
+        if in_string:
+            if line.count(in_string) % 2:
+                in_string = ''
+            continue
+        if line and not line[0].isspace() and not line.startswith(_CONTINUATIONS):
+            if number and not after_decorator:
+                starts.append(number)
+            after_decorator = line.startswith('@')
+        if '"""' in line or "'''" in line:
+            for quotes in ('"""', "'''"):
+                if line.count(quotes) % 2:
+                    in_string = quotes
+                    break
+    return starts
+
+
+def symbol_pool() -> ProcessPoolExecutor:
+    """Process pool parsing Python sources off the GUI thread, started when first needed."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Forking a process running Qt threads is not safe
+            _pool = ProcessPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1), mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def submit_symbol_job(function: Callable, *args: Any) -> Future:
+    """Run a function in the symbol pool.
+
+    Parameters
+    ----------
+    function: Callable
+        Module level function, so that it can be pickled.
+    args: Any
+        Arguments of the function.
+
+    Returns
+    -------
+    future: Future
+        Future of the result of the function.
+    """
+    future: Future = symbol_pool().submit(function, *args)
+    with _pool_lock:
+        _jobs.add(future)
+    return future
+
+
+def shutdown_symbol_pool() -> None:
+    """Stop the symbol pool, dropping pending parses."""
+    global _pool
+    with _pool_lock:
+        # Rather than shutdown(cancel_futures=True), which needs Python 3.9
+        for future in list(_jobs):
+            future.cancel()
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
@@ -0,0 +1,104 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import os
+import re
+import socket
+from typing import List, Optional, Pattern, Tuple
+
+import ujson
+
+from lightpad import data_dir
+
+# Imported by the command line entry point before Qt, so that handing paths to a running instance stays fast.
+# The running instance listens on the same path with QLocalServer.
+
+SOCKET_PATH: str = os.path.join(data_dir, 'instance.sock')
+
+CONNECT_TIMEOUT: float = 0.5  # seconds
+
+# Absolute path, and line number to go to if given as PATH:LINE
+Location = Tuple[str, Optional[int]]
+
+_LINE_SUFFIX_PATTERN: Pattern = re.compile(r'^(.+):(\d+)$')
+
+
+def parse_locations(arguments: List[str]) -> List[Location]:
+    """Parse command line arguments of the form PATH or PATH:LINE.
+
+    Parameters
+    ----------
+    arguments: List[str]
+        Paths of files or directories, relative to the working directory, files optionally followed by :LINE.
+
+    Returns
+    -------
+    locations: List[Location]
+        Absolute paths with their line numbers.
+    """
+    locations: List[Location] = []
+    for argument in arguments:
+        line: Optional[int] = None
+        match = _LINE_SUFFIX_PATTERN.match(argument)
+        # A file may be named like PATH:LINE itself
+        if match is not None and not os.path.exists(argument):
+            argument, line = match.group(1), int(match.group(2))
+        locations.append((os.path.abspath(argument), line))
+    return locations
+
+
+def encode_locations(locations: List[Location]) -> bytes:
+    """Message sent to a running instance."""
+    return ujson.dumps(locations).encode('utf-8')
+
+
+def decode_locations(data: bytes) -> List[Location]:
+    """Locations of a message received from another instance."""
+    return [(str(path), None if line is None else int(line)) for path, line in ujson.loads(data.decode('utf-8'))]
+
+
+def send_to_running_instance(locations: List[Location]) -> bool:
+    """Hand locations to an already running instance.
+
+    Parameters
+    ----------
+    locations: List[Location]
+        Locations to be opened.
+
+    Returns
+    -------
+    status: bool
+        True if an instance is running and received the locations, else False.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return False
+    client: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(CONNECT_TIMEOUT)
+    try:
+        client.connect(SOCKET_PATH)
+        client.sendall(encode_locations(locations))
+        return True
+    except OSError:
+        return False
+    finally:
+        client.close()
@@ -0,0 +1,174 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from logging.handlers import RotatingFileHandler
+from types import FrameType
+from typing import Deque, Dict, List, Optional
+
+from PySide6.QtCore import QObject, QTimer, Signal, Slot
+
+from lightpad import data_dir
+from lightpad.utils.commons import DebugType, debug
+
+# Stalls of the event loop with the stacks of the main thread during them, rotated through STALL_LOG_BACKUPS files
+STALL_LOG_PATH: str = os.path.join(data_dir, 'stalls.log')
+STALL_LOG_SIZE: int = 1024**2
+STALL_LOG_BACKUPS: int = 3
+
+# Environment variable setting the milliseconds after which an unanswered ping is a stall
+STALL_THRESHOLD_VARIABLE: str = 'LIGHTPAD_STALL_THRESHOLD'
+DEFAULT_STALL_THRESHOLD: int = 200
+
+# Seconds between pings, and the number of latest latencies percentiles are taken over
+PING_INTERVAL: float = 0.05
+LATENCY_SAMPLES: int = 600
+PERCENTILES: List[int] = [50, 95, 99]
+
+
+def stall_threshold() -> int:
+    """Milliseconds after which the event loop counts as stalled, from STALL_THRESHOLD_VARIABLE."""
+    text: str = os.environ.get(STALL_THRESHOLD_VARIABLE, '')
+    if text:
+        if text.isdigit() and int(text) > 0:
+            return int(text)
+        debug('Ignoring invalid %s: %s' % (STALL_THRESHOLD_VARIABLE, text), debug_type=DebugType.WARNING)
+    return DEFAULT_STALL_THRESHOLD
+
+
+def _stall_logger() -> logging.Logger:
+    logger: logging.Logger = logging.getLogger('lightpad.stalls')
+    if not logger.handlers:
+        os.makedirs(data_dir, exist_ok=True)
+        handler: RotatingFileHandler = RotatingFileHandler(
+            STALL_LOG_PATH, maxBytes=STALL_LOG_SIZE, backupCount=STALL_LOG_BACKUPS, encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+class StallWatchdog(QObject):
+    """Watch the event loop from a thread, and log where the main thread is while the loop does not respond.
+
+    The thread posts a ping to the event loop every PING_INTERVAL and waits for it to be answered.
+    The time until the answer is the latency of the loop. While a ping stays unanswered past the threshold,
+    the stack of the main thread is sampled every threshold, and once the loop answers, the stall is logged
+    to STALL_LOG_PATH with its duration and the distinct stacks sampled.
+    """
+
+    # Latencies in milliseconds, by percentile, over the latest pings
+    latency_signal: Signal = Signal(object)
+    _ping_signal: Signal = Signal(float)
+
+    LATENCY_INTERVAL: int = 1_000
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+
+        self.threshold: int = stall_threshold()
+        self.stall_count: int = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._answered: threading.Event = threading.Event()
+        self._stopped: threading.Event = threading.Event()
+        self._main_thread_id: Optional[int] = threading.main_thread().ident
+        self._thread: Optional[threading.Thread] = None
+
+        # Emitted from the watchdog thread, so queued to this object in the main thread
+        self._ping_signal.connect(self._answer_ping)  # type: ignore
+
+        self._latency_timer: QTimer = QTimer(self)
+        self._latency_timer.timeout.connect(self.emit_latency)  # type: ignore
+
+    def start(self) -> None:
+        """Start watching the event loop."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._watch, name='stall-watchdog', daemon=True)
+        self._thread.start()
+        self._latency_timer.start(self.LATENCY_INTERVAL)
+
+    @Slot()
+    def stop(self) -> None:
+        """Stop watching the event loop."""
+        self._latency_timer.stop()
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def latency_percentiles(self) -> Dict[int, float]:
+        """Latencies of the event loop in milliseconds over the latest pings, by percentile, empty before any."""
+        latencies: List[float] = sorted(self._latencies)
+        if not latencies:
+            return {}
+        return {
+            percentile: latencies[min(len(latencies) - 1, len(latencies) * percentile // 100)] * 1000
+            for percentile in PERCENTILES
+        }
+
+    @Slot()
+    def emit_latency(self) -> None:
+        self.latency_signal.emit(self.latency_percentiles())
+
+    @Slot(float)
+    def _answer_ping(self, sent: float) -> None:
+        self._latencies.append(time.monotonic() - sent)
+        self._answered.set()
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(PING_INTERVAL):
+            self._answered.clear()
+            sent: float = time.monotonic()
+            self._ping_signal.emit(sent)
+            if self._answered.wait(self.threshold / 1000):
+                continue
+
+            stacks: List[str] = []
+            while not self._answered.is_set() and not self._stopped.is_set():
+                frame: Optional[FrameType] = sys._current_frames().get(self._main_thread_id)  # type: ignore
+                if frame is not None:
+                    stacks.append(''.join(traceback.format_stack(frame)))
+                del frame
+                self._answered.wait(self.threshold / 1000)
+            self._log_stall(time.monotonic() - sent, stacks)
+
+    def _log_stall(self, duration: float, stacks: List[str]) -> None:
+        self.stall_count += 1
+        debug('Event loop stalled for %d ms' % (duration * 1000), debug_type=DebugType.WARNING)
+        message: str = 'Event loop stalled for %d ms, %d stack samples\n' % (duration * 1000, len(stacks))
+        for stack, count in Counter(stacks).most_common():
+            message += 'Sampled %d times:\n%s' % (count, stack)
+        try:
+            _stall_logger().info(message)
+        except OSError as e:
+            debug('Could not log stall to %s: %s' % (STALL_LOG_PATH, e), debug_type=DebugType.WARNING)
@@ -0,0 +1,288 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from lightpad import data_dir
+from lightpad.utils.commons import DebugType, debug
+from lightpad.utils.python_symbols import PYTHON_EXTENSIONS, Symbol, parse_symbols, submit_symbol_job
+
+# Name, kind, file path, line starting at 0 and names of the enclosing classes and functions of a definition
+WorkspaceSymbol = Tuple[str, str, str, int, str]
+
+# Directories which are not part of the sources of a workspace
+EXCLUDED_DIRS: Set[str] = {'__pycache__', 'node_modules', 'site-packages'}
+
+_WORD_PATTERN: re.Pattern = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+
+_SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, mtime_ns INTEGER, size INTEGER, hash TEXT
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    id INTEGER PRIMARY KEY, file_id INTEGER NOT NULL, name TEXT, kind TEXT, line INTEGER, container TEXT
+);
+CREATE TABLE IF NOT EXISTS words (word TEXT NOT NULL, symbol_id INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS symbols_file_id ON symbols (file_id);
+CREATE INDEX IF NOT EXISTS words_word ON words (word);
+CREATE INDEX IF NOT EXISTS words_symbol_id ON words (symbol_id);
+'''
+
+
+def name_words(name: str) -> Set[str]:
+    """Lower case name, without underscores too, and its parts split at underscores and case changes."""
+    words: Set[str] = {name.lower(), name.lower().replace('_', '')}
+    words.update(word.lower() for word in _WORD_PATTERN.findall(name))
+    return words
+
+
+def read_file_symbols(job: Tuple[str, str]) -> Tuple[str, str, Optional[List[Symbol]]]:
+    """Hash a file and find its symbols unless the hash is the known one, run in the symbol pool.
+
+    Parameters
+    ----------
+    job: Tuple[str, str]
+        Path of the file and hash of its indexed content, empty if not indexed.
+
+    Returns
+    -------
+    result: Tuple[str, str, Optional[List[Symbol]]]
+        Path, hash of the content and its symbols, None if the content did not change.
+    """
+    path, known_hash = job
+    try:
+        with open(path, 'rb') as f:
+            data: bytes = f.read()
+    except OSError:
+        return path, '', []
+    content_hash: str = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if content_hash == known_hash:
+        return path, content_hash, None
+    return path, content_hash, parse_symbols(data) or []
+
+
+def read_files_symbols(jobs: List[Tuple[str, str]]) -> List[Tuple[str, str, Optional[List[Symbol]]]]:
+    """read_file_symbols of each job, run in the symbol pool so that several files are sent to it at once."""
+    return [read_file_symbols(job) for job in jobs]
+
+
+def _walk_python_files(root: str) -> Iterator[Tuple[str, int, int]]:
+    """Path, modification time and size of the Python files under root, skipping hidden and excluded directories."""
+    directories: List[str] = [root]
+    while directories:
+        directory: str = directories.pop()
+        try:
+            entries: List[os.DirEntry] = list(os.scandir(directory))
+        except OSError:
+            continue
+        if any(entry.name == 'pyvenv.cfg' for entry in entries):
+            continue  # virtual environment
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith('.') and entry.name not in EXCLUDED_DIRS:
+                        directories.append(entry.path)
+                elif entry.name.endswith(PYTHON_EXTENSIONS) and entry.is_file():
+                    stat: os.stat_result = entry.stat()
+                    yield entry.path, stat.st_mtime_ns, stat.st_size
+            except OSError:
+                continue
+
+
+class SymbolIndex:
+    """Definitions in the Python files under a directory, kept in an SQLite database between sessions.
+
+    Updating walks the directory on a worker thread and parses, in the symbol pool, only files whose
+    modification time or size changed, and of those only files whose content hash changed. Names are
+    found by prefix of their parts, using an index, so searching does not scan the symbols.
+    """
+
+    BATCH_SIZE: int = 256  # files
+    CHUNK_SIZE: int = 16  # files sent to a process of the pool at once
+    COMMIT_INTERVAL: int = 512  # files
+
+    def __init__(self, root: str) -> None:
+        self.root: str = os.path.abspath(root)
+        self.db_path: str = os.path.join(
+            data_dir, 'symbols', '%s.sqlite3' % (hashlib.sha1(self.root.encode()).hexdigest()[:16])
+        )
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        self._connection: sqlite3.Connection = self._connect()
+        self._thread: Optional[threading.Thread] = None
+        self._is_update_pending: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection = sqlite3.connect(self.db_path, timeout=30)
+        # Searching reads while the worker thread writes
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def is_updating(self) -> bool:
+        """Check if files are being indexed."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def update(self) -> None:
+        """Index the files which changed since the last update, on a worker thread."""
+        with self._lock:
+            if self.is_updating():
+                self._is_update_pending = True
+                return
+            self._thread = threading.Thread(target=self._update, daemon=True)
+            self._thread.start()
+
+    def _update(self) -> None:
+        while True:
+            try:
+                self._index_changed_files()
+            except (sqlite3.Error, RuntimeError) as e:
+                # RuntimeError if the symbol pool was shut down while quitting
+                debug('Could not index %s: %s' % (self.root, e), debug_type=DebugType.WARNING)
+            with self._lock:
+                if not self._is_update_pending:
+                    return
+                self._is_update_pending = False
+
+    def _index_changed_files(self) -> None:
+        connection: sqlite3.Connection = self._connect()
+        try:
+            known: Dict[str, Tuple[int, int, int, str]] = {
+                path: (file_id, mtime_ns, size, content_hash)
+                for file_id, path, mtime_ns, size, content_hash in connection.execute(
+                    'SELECT id, path, mtime_ns, size, hash FROM files'
+                )
+            }
+            stats: Dict[str, Tuple[int, int]] = {}
+            jobs: List[Tuple[str, str]] = []
+            for path, mtime_ns, size in _walk_python_files(self.root):
+                stats[path] = (mtime_ns, size)
+                file = known.get(path)
+                if file is None or file[1:3] != (mtime_ns, size):
+                    jobs.append((path, file[3] if file is not None else ''))
+
+            removed: List[int] = [file[0] for path, file in known.items() if path not in stats]
+            for file_id in removed:
+                self._delete_symbols(connection, file_id)
+                connection.execute('DELETE FROM files WHERE id = ?', (file_id,))
+            connection.commit()
+            debug('Indexing %d of %d files in %s' % (len(jobs), len(stats), self.root))
+
+            for count, (path, content_hash, symbols) in enumerate(self._read_symbols(jobs), 1):
+                mtime_ns, size = stats[path]
+                file = known.get(path)
+                if file is None:
+                    file_id: int = connection.execute(  # type: ignore
+                        'INSERT INTO files (path, mtime_ns, size, hash) VALUES (?, ?, ?, ?)',
+                        (path, mtime_ns, size, content_hash),
+                    ).lastrowid
+                else:
+                    file_id = file[0]
+                    connection.execute(
+                        'UPDATE files SET mtime_ns = ?, size = ?, hash = ? WHERE id = ?',
+                        (mtime_ns, size, content_hash, file_id),
+                    )
+                if symbols is not None:
+                    if file is not None:
+                        self._delete_symbols(connection, file_id)
+                    self._insert_symbols(connection, file_id, symbols)
+                if count % self.COMMIT_INTERVAL == 0:
+                    connection.commit()
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _read_symbols(self, jobs: List[Tuple[str, str]]) -> Iterator[Tuple[str, str, Optional[List[Symbol]]]]:
+        # In batches, so that parses of the outline are not queued behind all the files
+        for start in range(0, len(jobs), self.BATCH_SIZE):
+            futures: List[Future] = [
+                submit_symbol_job(read_files_symbols, jobs[chunk_start : chunk_start + self.CHUNK_SIZE])
+                for chunk_start in range(start, min(start + self.BATCH_SIZE, len(jobs)), self.CHUNK_SIZE)
+            ]
+            for future in futures:
+                yield from future.result()
+
+    @staticmethod
+    def _delete_symbols(connection: sqlite3.Connection, file_id: int) -> None:
+        connection.execute(
+            'DELETE FROM words WHERE symbol_id IN (SELECT id FROM symbols WHERE file_id = ?)', (file_id,)
+        )
+        connection.execute('DELETE FROM symbols WHERE file_id = ?', (file_id,))
+
+    @staticmethod
+    def _insert_symbols(connection: sqlite3.Connection, file_id: int, symbols: List[Symbol]) -> None:
+        containers: List[str] = []
+        for name, kind, line, depth in symbols:
+            del containers[depth:]
+            symbol_id: int = connection.execute(  # type: ignore
+                'INSERT INTO symbols (file_id, name, kind, line, container) VALUES (?, ?, ?, ?, ?)',
+                (file_id, name, kind, line, '.'.join(containers)),
+            ).lastrowid
+            connection.executemany(
+                'INSERT INTO words (word, symbol_id) VALUES (?, ?)', ((word, symbol_id) for word in name_words(name))
+            )
+            containers.append(name)
+
+    def search(self, text: str, limit: int = 100) -> List[WorkspaceSymbol]:
+        """Find definitions whose name, or a part of it, starts with text, ignoring case.
+
+        Parameters
+        ----------
+        text: str
+            Start of the name or of a part of it.
+        limit: int
+            Maximum number of definitions returned. (default is 100)
+
+        Returns
+        -------
+        symbols: List[WorkspaceSymbol]
+            Definitions, names starting with text first.
+        """
+        word: str = text.strip().lower()
+        if not word:
+            return []
+        # Ordered before the limit, so that names starting with text are not cut off by other matches
+        return list(
+            self._connection.execute(
+                '''
+                SELECT DISTINCT symbols.name, symbols.kind, files.path, symbols.line, symbols.container
+                FROM words
+                JOIN symbols ON symbols.id = words.symbol_id
+                JOIN files ON files.id = symbols.file_id
+                WHERE words.word >= ? AND words.word < ?
+                ORDER BY substr(lower(symbols.name), 1, ?) <> ?, length(symbols.name)
+                LIMIT ?
+                ''',
+                (word, word + '\U0010ffff', len(word), word, limit),
+            )
+        )
+
+    def close(self) -> None:
+        self._connection.close()
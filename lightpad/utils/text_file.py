@@ -0,0 +1,131 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import os
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+from lightpad.utils.compressed_file import detect_compression, is_compression_available, read_decompressed_head
+from lightpad.utils.encoding import SAMPLE_SIZE, TextFormat, detect_text_format, detect_text_format_of_samples
+from lightpad.utils.file_state import FileStat, read_file_state
+
+# Files read at once, reads mostly wait on the disk
+MAX_READERS: int = 16
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock: threading.Lock = threading.Lock()
+# Reads submitted by submit_read, cancelled by shutdown_read_pool if they have not started
+_reads: weakref.WeakSet = weakref.WeakSet()
+
+
+class TextFile(NamedTuple):
+    """A file as read for a code editor, before it is decoded into the document."""
+
+    exists: bool
+    # gzip, bz2, xz, zstd or None, the file is not read if its compression is not available
+    compression: Optional[str]
+    # None if the file is not text
+    text_format: Optional[TextFormat]
+    # Whole file if it is not compressed, compressed files are decompressed as a stream while loading
+    content: bytes
+    stat: Optional[FileStat]
+    tail: bytes
+
+
+def read_text_file(file_path: str) -> TextFile:
+    """Read a file and detect its compression and text format, without touching any widget.
+
+    Parameters
+    ----------
+    file_path: str
+        Path of the file, which may not exist yet.
+
+    Returns
+    -------
+    text_file: TextFile
+        What the code editor needs to load the file.
+    """
+    if not os.path.isfile(file_path):
+        return TextFile(False, None, None, b'', None, b'')
+
+    compression: Optional[str] = detect_compression(file_path)
+    if compression is not None and not is_compression_available(compression):
+        return TextFile(True, compression, None, b'', None, b'')
+
+    text_format: Optional[TextFormat]
+    content: bytes = b''
+    if compression is None:
+        text_format = detect_text_format(file_path)
+        if text_format is not None:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+    else:
+        head: bytes = read_decompressed_head(file_path, compression, SAMPLE_SIZE + 1)
+        text_format = detect_text_format_of_samples(head[:SAMPLE_SIZE], head_is_whole_file=len(head) <= SAMPLE_SIZE)
+    if text_format is None:
+        return TextFile(True, compression, None, b'', None, b'')
+    # Stat as read, the file may grow while it is loaded
+    file_stat, tail = read_file_state(file_path, len(content) if compression is None else None)
+    return TextFile(True, compression, text_format, content, file_stat, tail)
+
+
+def read_pool() -> ThreadPoolExecutor:
+    """Thread pool reading files off the GUI thread, started when first needed."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=MAX_READERS, thread_name_prefix='file-reader')
+        return _pool
+
+
+def submit_read(file_path: str) -> Future:
+    """Read a file with read_text_file in the read pool.
+
+    Parameters
+    ----------
+    file_path: str
+        Path of the file, which may not exist yet.
+
+    Returns
+    -------
+    future: Future
+        Future of the TextFile read.
+    """
+    future: Future = read_pool().submit(read_text_file, file_path)
+    with _pool_lock:
+        _reads.add(future)
+    return future
+
+
+def shutdown_read_pool() -> None:
+    """Stop the read pool, dropping pending reads."""
+    global _pool
+    with _pool_lock:
+        # Rather than shutdown(cancel_futures=True), which needs Python 3.9
+        for future in list(_reads):
+            future.cancel()
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
@@ -0,0 +1,184 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from heapq import heapify, heappop, nlargest
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Distinct words are kept sorted in buckets of at most twice BUCKET_SIZE words
+BUCKET_SIZE: int = 512
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock: threading.Lock = threading.Lock()
+
+
+class WordIndex:
+    """Multiset of words with prefix lookup, kept as counts and buckets of sorted distinct words.
+
+    Adding or removing a distinct word costs the size of its bucket rather than the number of distinct words.
+    Each bucket has a bound of the counts of its words, so that completion only looks at the words of the
+    buckets which may hold the most frequent ones.
+    """
+
+    def __init__(self) -> None:
+        self._counts: Dict[str, int] = {}
+        self._buckets: List[List[str]] = []
+        # Last word of each bucket
+        self._maxes: List[str] = []
+        # At least the highest count of the words of each bucket, raised as counts grow and set when looked at
+        self._bounds: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def update(self, removed: Iterable[str], added: Iterable[str]) -> None:
+        """Remove and add occurrences of words.
+
+        Parameters
+        ----------
+        removed: Iterable[str]
+            Occurrences of words to be removed.
+        added: Iterable[str]
+            Occurrences of words to be added, or a mapping of words to their number of occurrences.
+
+        Returns
+        -------
+        None
+        """
+        changes: Counter = Counter(added)
+        changes.subtract(removed)
+        new_words: List[str] = []
+        for word, change in changes.items():
+            if not change:
+                continue
+            count: int = self._counts.get(word, 0) + change
+            if count > 0:
+                if word not in self._counts:
+                    new_words.append(word)
+                elif change > 0:
+                    index: int = bisect_left(self._maxes, word)
+                    self._bounds[index] = max(self._bounds[index], count)
+                self._counts[word] = count
+            elif word in self._counts:
+                del self._counts[word]
+                self._remove(word)
+
+        if len(new_words) > BUCKET_SIZE:
+            # Sorting all words again is cheaper, the existing ones are a sorted run already
+            self._fill_buckets(sorted(chain(chain.from_iterable(self._buckets), new_words)))
+        else:
+            for word in new_words:
+                self._insert(word)
+
+    def _fill_buckets(self, words: List[str]) -> None:
+        self._buckets = [words[start : start + BUCKET_SIZE] for start in range(0, len(words), BUCKET_SIZE)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._bounds = [max(map(self._counts.__getitem__, bucket)) for bucket in self._buckets]
+
+    def _insert(self, word: str) -> None:
+        index: int = min(bisect_left(self._maxes, word), len(self._maxes) - 1)
+        if index < 0:
+            self._buckets.append([word])
+            self._maxes.append(word)
+            self._bounds.append(self._counts[word])
+            return
+
+        bucket: List[str] = self._buckets[index]
+        insort(bucket, word)
+        self._maxes[index] = bucket[-1]
+        self._bounds[index] = max(self._bounds[index], self._counts[word])
+        if len(bucket) > 2 * BUCKET_SIZE:
+            self._buckets[index : index + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+            self._maxes[index : index + 1] = [bucket[BUCKET_SIZE - 1], bucket[-1]]
+            self._bounds[index : index + 1] = [self._bounds[index]] * 2
+
+    def _remove(self, word: str) -> None:
+        index: int = bisect_left(self._maxes, word)
+        bucket: List[str] = self._buckets[index]
+        del bucket[bisect_left(bucket, word)]
+        if not bucket:
+            del self._buckets[index]
+            del self._maxes[index]
+            del self._bounds[index]
+        else:
+            self._maxes[index] = bucket[-1]
+
+    def complete(self, prefix: str, limit: int = 20) -> List[str]:
+        """Most frequent words starting with prefix, excluding prefix itself.
+
+        Buckets holding words starting with prefix are looked at in the order of their bounds, until the
+        bound of the next one is not above the counts of the words found.
+
+        Parameters
+        ----------
+        prefix: str
+            Start of the words.
+        limit: int
+            Maximum number of words returned. (default is 20)
+
+        Returns
+        -------
+        words: List[str]
+            Completions, most frequent first.
+        """
+        end_prefix: str = prefix + '\U0010ffff'
+        first: int = bisect_left(self._maxes, prefix)
+        last: int = min(bisect_left(self._maxes, end_prefix), len(self._buckets) - 1)
+        pending: List[Tuple[int, int]] = [(-self._bounds[index], index) for index in range(first, last + 1)]
+        heapify(pending)
+
+        words: List[str] = []
+        while pending and (len(words) < limit or -pending[0][0] > self._counts[words[-1]]):
+            index: int = heappop(pending)[1]
+            bucket: List[str] = self._buckets[index]
+            self._bounds[index] = max(map(self._counts.__getitem__, bucket))
+            start: int = bisect_right(bucket, prefix) if index == first else 0
+            end: int = bisect_left(bucket, end_prefix) if index == last else len(bucket)
+            words = nlargest(limit, chain(words, bucket[start:end]), key=self._counts.__getitem__)
+        return words
+
+
+def word_pool() -> ThreadPoolExecutor:
+    """Thread finding the words of loaded documents off the GUI thread, started when first needed."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='word-index')
+        return _pool
+
+
+def shutdown_word_pool() -> None:
+    """Stop the word pool, documents still being indexed are not."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+# Words of all opened documents
+buffer_word_index: WordIndex = WordIndex()
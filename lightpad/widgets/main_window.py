@@ -21,7 +21,11 @@
 #  SOFTWARE.
 #
 
-from PySide6.QtWidgets import QMainWindow
+from typing import List
+
+from PySide6.QtCore import Signal
+from PySide6.QtGui import QDragEnterEvent, QDropEvent
+from PySide6.QtWidgets import QLabel, QMainWindow, QStatusBar
 
 from lightpad import meta
 from lightpad.widgets.container_widget import ContainerWidget
@@ -31,6 +35,8 @@ from lightpad.widgets.menu_bar import MenuBar
 class MainWindow(QMainWindow):
     """Main Window containing all sub widgets"""
 
+    paths_dropped_signal: Signal = Signal(object)  # local paths of the files and directories dropped
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -39,6 +45,23 @@ class MainWindow(QMainWindow):
 
         self.menu_bar: MenuBar = MenuBar()
         self.container_widget: ContainerWidget = ContainerWidget()
+        self.status_bar: QStatusBar = QStatusBar()
+        self.latency_label: QLabel = QLabel()
+        self.memory_label: QLabel = QLabel()
+        self.status_bar.addPermanentWidget(self.latency_label)
+        self.status_bar.addPermanentWidget(self.memory_label)
 
         self.setMenuBar(self.menu_bar)
         self.setCentralWidget(self.container_widget)
+        self.setStatusBar(self.status_bar)
+        self.setAcceptDrops(True)
+
+    def dragEnterEvent(self, event: QDragEnterEvent) -> None:
+        if any(url.isLocalFile() for url in event.mimeData().urls()):
+            event.acceptProposedAction()
+
+    def dropEvent(self, event: QDropEvent) -> None:
+        paths: List[str] = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        if paths:
+            event.acceptProposedAction()
+            self.paths_dropped_signal.emit(paths)
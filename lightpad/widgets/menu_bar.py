@@ -52,7 +52,40 @@ class MenuBar(QMenuBar):
         self.file_menu.addAction(self.exit_action)
 
         # self.edit_menu: QMenu = self.addMenu('Edit')
-        # self.view_menu: QMenu = self.addMenu('View')
+
+        self.view_menu: QMenu = self.addMenu('View')
+        self.follow_file_action: QAction = QAction('Follow File', self)
+        self.follow_file_action.setCheckable(True)
+        self.follow_file_action.setEnabled(False)
+        self.split_right_action: QAction = QAction('Split Right', self)
+        self.split_down_action: QAction = QAction('Split Down', self)
+        self.close_split_action: QAction = QAction('Close Split', self)
+        self.compare_with_saved_action: QAction = QAction('Compare with Saved', self)
+
+        self.split_right_action.setEnabled(False)
+        self.split_down_action.setEnabled(False)
+        self.close_split_action.setEnabled(False)
+        self.compare_with_saved_action.setEnabled(False)
+        self.terminal_action: QAction = QAction('Terminal', self)
+        self.terminal_action.setCheckable(True)
+        self.terminal_action.setShortcut('Ctrl+`')
+
+        self.view_menu.addAction(self.follow_file_action)
+        self.view_menu.addSeparator()
+        self.view_menu.addAction(self.split_right_action)
+        self.view_menu.addAction(self.split_down_action)
+        self.view_menu.addAction(self.close_split_action)
+        self.view_menu.addAction(self.compare_with_saved_action)
+        self.view_menu.addSeparator()
+        self.view_menu.addAction(self.terminal_action)
+
+        self.go_menu: QMenu = self.addMenu('Go')
+        self.go_to_workspace_symbol_action: QAction = QAction('Go to Symbol in Workspace', self)
+        self.go_to_workspace_symbol_action.setShortcut('Ctrl+T')
+        self.go_to_workspace_symbol_action.setEnabled(False)
+
+        self.go_menu.addAction(self.go_to_workspace_symbol_action)
+
         # self.tools_menu: QMenu = self.addMenu('Tools')
         # self.windows_menu: QMenu = self.addMenu('Windows')
         # self.help_menu: QMenu = self.addMenu('Help')
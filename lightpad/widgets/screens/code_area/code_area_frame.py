@@ -21,11 +21,19 @@
 #  SOFTWARE.
 #
 
-from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QFrame, QSplitter, QVBoxLayout
+import os
+from typing import List, Optional, Union
 
-from lightpad.utils.commons import init_layout
+from PySide6.QtCore import Qt, Slot
+from PySide6.QtWidgets import QFrame, QHBoxLayout, QSplitter, QVBoxLayout, QWidget
+
+from lightpad.utils.commons import debug, init_layout, raise_exception
 from lightpad.widgets.screens.code_area.code_tabs.code_tabs_widget import CodeTabsWidget
+from lightpad.widgets.screens.code_area.code_tabs.editor.code_editor import CodeEditor
+from lightpad.widgets.screens.code_area.code_tabs.editor.diff_view import DiffView
+from lightpad.widgets.screens.code_area.code_tabs.editor.editor_view import EditorView
+from lightpad.widgets.screens.code_area.minimap.minimap_widget import MinimapWidget
+from lightpad.widgets.screens.code_area.terminal.terminal_widget import TerminalWidget
 
 
 class CodeAreaFrame(QFrame):
@@ -38,16 +46,140 @@ class CodeAreaFrame(QFrame):
 
         self._splitter_vertical: QSplitter = QSplitter(Qt.Orientation.Vertical)
 
+        self._editor_frame: QFrame = QFrame()
+        init_layout(self._editor_frame, QHBoxLayout)
+
         self.code_tabs_widget: CodeTabsWidget = CodeTabsWidget()
-        # /* TBD --- Terminal Frame
-        # self.terminal_frame = QFrame()
-        # self.terminal_frame.setStyleSheet('background: black;')
-        # */
+        self.minimap_widget: MinimapWidget = MinimapWidget()
+
+        # Split views of opened files, next to or below the tabs, in nested splitters when split both ways
+        self._splitter_views: QSplitter = QSplitter(Qt.Orientation.Horizontal)
+        self._splitter_views.addWidget(self.code_tabs_widget)
+        self._editor_views: List[Union[EditorView, DiffView]] = []
+
+        self._editor_frame.layout().addWidget(self._splitter_views)
+        self._editor_frame.layout().addWidget(self.minimap_widget)
+
+        # Hidden until toggled, the shell is started when it is first shown
+        self.terminal_widget: TerminalWidget = TerminalWidget()
+        self.terminal_widget.hide()
 
-        self._splitter_vertical.addWidget(self.code_tabs_widget)
-        # self._splitter_vertical.addWidget(self.terminal_frame)
+        self._splitter_vertical.addWidget(self._editor_frame)
+        self._splitter_vertical.addWidget(self.terminal_widget)
 
-        # self._splitter_vertical.setStretchFactor(0, 8)
-        # self._splitter_vertical.setStretchFactor(1, 2)
+        self._splitter_vertical.setStretchFactor(0, 8)
+        self._splitter_vertical.setStretchFactor(1, 2)
 
         self.layout().addWidget(self._splitter_vertical)
+
+        self.code_tabs_widget.currentChanged.connect(self.handle_current_tab_changed)  # type: ignore
+        self.code_tabs_widget.tab_closing_signal.connect(self.close_editor_views)  # type: ignore
+
+    @Slot(int)
+    def handle_current_tab_changed(self, index: int) -> None:
+        """Show the minimap of the current code editor tab."""
+        self.minimap_widget.set_editor(self.code_tabs_widget.current_code_editor())
+
+    def split_current_editor(self, orientation: Qt.Orientation) -> Optional[EditorView]:
+        """Show the file of the current code editor tab in a new view.
+
+        Parameters
+        ----------
+        orientation: Qt.Orientation
+            Horizontal to place views side by side, vertical to stack them.
+
+        Returns
+        -------
+        editor_view: Optional[EditorView]
+            New view, None if there is no opened file.
+        """
+        code_editor: Optional[CodeEditor] = self.code_tabs_widget.current_code_editor()
+        if code_editor is None:
+            return None
+        editor_view: EditorView = EditorView(code_editor)
+        self._add_editor_view(editor_view, orientation)
+        editor_view.setFocus()
+        return editor_view
+
+    def compare_with_saved(self) -> Optional[DiffView]:
+        """Show the changes of the current code editor since its file was saved, next to the tabs.
+
+        Returns
+        -------
+        diff_view: Optional[DiffView]
+            New view, None if there is no opened file or it could not be read.
+        """
+        code_editor: Optional[CodeEditor] = self.code_tabs_widget.current_code_editor()
+        if code_editor is None or code_editor.is_loading() or not os.path.isfile(code_editor.file_path):
+            return None
+        try:
+            diff_view: DiffView = DiffView(code_editor)
+        except (OSError, UnicodeDecodeError, EOFError):
+            raise_exception('Could not read the saved file!', terminate=False)
+            debug('Could not read saved version of: %s' % (code_editor.file_path))
+            return None
+        self._add_editor_view(diff_view, Qt.Orientation.Horizontal)
+        return diff_view
+
+    def _focused_editor_view(self) -> Optional[Union[EditorView, DiffView]]:
+        for editor_view in self._editor_views:
+            if editor_view.hasFocus():
+                return editor_view
+        return None
+
+    def _add_editor_view(self, editor_view: Union[EditorView, DiffView], orientation: Qt.Orientation) -> None:
+        """Split the focused view, or the tabs if no view has focus, placing editor_view after it."""
+        target: QWidget = self._focused_editor_view() or self.code_tabs_widget
+        splitter: QSplitter = target.parentWidget()  # type: ignore
+        if splitter.count() > 1 and splitter.orientation() != orientation:
+            # Split the other way in a splitter of its own, so that the other views keep their place
+            sizes: List[int] = splitter.sizes()
+            nested_splitter: QSplitter = QSplitter(orientation)
+            splitter.insertWidget(splitter.indexOf(target), nested_splitter)
+            nested_splitter.addWidget(target)
+            splitter.setSizes(sizes)
+            splitter = nested_splitter
+        splitter.setOrientation(orientation)
+
+        index: int = splitter.indexOf(target)
+        sizes = splitter.sizes()
+        splitter.insertWidget(index + 1, editor_view)
+        # The target gives up half of its space
+        sizes[index : index + 1] = [sizes[index] - sizes[index] // 2, sizes[index] // 2]
+        splitter.setSizes(sizes)
+        self._editor_views.append(editor_view)
+
+    def _close_editor_view(self, editor_view: Union[EditorView, DiffView]) -> None:
+        self._editor_views.remove(editor_view)
+        splitter: QSplitter = editor_view.parentWidget()  # type: ignore
+        editor_view.hide()
+        editor_view.deleteLater()
+        # Out of the splitter now rather than once deleted, so that it is counted out below
+        editor_view.setParent(None)  # type: ignore
+
+        if splitter is not self._splitter_views and splitter.count() == 1:
+            # A nested splitter left with a single widget is replaced by it
+            parent_splitter: QSplitter = splitter.parentWidget()  # type: ignore
+            sizes: List[int] = parent_splitter.sizes()
+            parent_splitter.replaceWidget(parent_splitter.indexOf(splitter), splitter.widget(0))
+            parent_splitter.setSizes(sizes)
+            splitter.deleteLater()
+
+    def close_split(self) -> None:
+        """Close the focused view, or the last one if none has focus."""
+        editor_view: Optional[Union[EditorView, DiffView]] = self._focused_editor_view()
+        if editor_view is not None:
+            self._close_editor_view(editor_view)
+        elif self._editor_views:
+            self._close_editor_view(self._editor_views[-1])
+
+    def has_split(self) -> bool:
+        """Whether any view is shown besides the tabs."""
+        return bool(self._editor_views)
+
+    @Slot(object)
+    def close_editor_views(self, code_editor: CodeEditor) -> None:
+        """Close the views of a code editor, its document is about to be cleared."""
+        for editor_view in list(self._editor_views):
+            if editor_view.code_editor is code_editor:
+                self._close_editor_view(editor_view)
@@ -22,30 +22,112 @@
 #
 
 import os
-from typing import Dict
+from typing import Dict, List, Optional, Union
 
-from PySide6.QtCore import Signal
-from PySide6.QtWidgets import QTabWidget
+from PySide6.QtCore import QTimer, Signal
+from PySide6.QtWidgets import QMessageBox, QTabWidget
 
-from lightpad.utils.commons import debug, string_width
+from lightpad.utils.commons import DebugType, debug, string_width
+from lightpad.utils.memory import format_size, format_usage, memory_budget
 from lightpad.widgets.screens.code_area.code_tabs.editor.code_editor import CodeEditor
+from lightpad.widgets.screens.code_area.code_tabs.hex_viewer.hex_viewer import HexViewer
 
 
 class CodeTabsWidget(QTabWidget):
     """Handles code editor tabs"""
 
     all_tabs_closed_signal: Signal = Signal()
+    tab_closing_signal: Signal = Signal(object)
+    loading_progress_signal: Signal = Signal(str, int)  # file path, percent
+    follow_mode_signal: Signal = Signal(bool)  # whether the code editor emitting it follows its file
+    # Estimated bytes used by each part of each code editor keyed by file path, and if all exceed the budget
+    memory_usage_signal: Signal = Signal(object, bool)
+
+    FILE_WATCH_INTERVAL: int = 2_000  # milliseconds
+    MEMORY_CHECK_INTERVAL: int = 5_000  # milliseconds
 
     def __init__(self) -> None:
         super().__init__()
 
-        self._opened_files_dict: Dict[str, CodeEditor] = {}
+        # Text files are opened in code editors, other files in hex viewers
+        self._opened_files_dict: Dict[str, Union[CodeEditor, HexViewer]] = {}
 
         self.setTabsClosable(True)
         self.setMovable(True)
 
         self.tabCloseRequested.connect(self.handle_tab_close)  # type: ignore
 
+        # One timer stats all opened files
+        self._file_watch_timer: QTimer = QTimer()
+        self._file_watch_timer.timeout.connect(self.check_files_on_disk)  # type: ignore
+        self._file_watch_timer.start(self.FILE_WATCH_INTERVAL)
+
+        # Bytes all tabs together should stay under, see lightpad.utils.memory
+        self.memory_budget: Optional[int] = memory_budget()
+        self._is_over_budget: bool = False
+        self._logged_memory_usage: Dict[str, Dict[str, int]] = {}
+        self._memory_check_timer: QTimer = QTimer()
+        self._memory_check_timer.timeout.connect(self.check_memory_usage)  # type: ignore
+        self._memory_check_timer.start(self.MEMORY_CHECK_INTERVAL)
+
+    def check_memory_usage(self) -> None:
+        """Estimate the memory used by each tab, log it when it changed and enforce the memory budget.
+
+        Over budget, the oldest steps of undo histories are dropped, largest history first, and a warning is logged if
+        that was not enough.
+        """
+        usage: Dict[str, Dict[str, int]] = {
+            file_path: code_editor.memory_usage()
+            for file_path, code_editor in self._opened_files_dict.items()
+            if isinstance(code_editor, CodeEditor)
+        }
+        total: int = sum(sum(parts.values()) for parts in usage.values())
+
+        if usage != self._logged_memory_usage:
+            self._logged_memory_usage = usage
+            for file_path, parts in usage.items():
+                debug('Memory used by %s: %s' % (file_path, format_usage(parts)))
+
+        if self.memory_budget is not None and total > self.memory_budget:
+            # Undo histories can be given up without closing tabs, oldest steps of the largest history first
+            for file_path in sorted(usage, key=lambda file_path: -usage[file_path]['undo']):
+                if total <= self.memory_budget or not usage[file_path]['undo']:
+                    break
+                code_editor: CodeEditor = self._opened_files_dict[file_path]  # type: ignore
+                total -= code_editor.undo_history.size
+                code_editor.undo_history.trim(max(self.memory_budget - total, 0))
+                total += code_editor.undo_history.size
+                usage[file_path]['undo'] = code_editor.undo_history.size
+
+        is_over_budget: bool = self.memory_budget is not None and total > self.memory_budget
+        if is_over_budget and not self._is_over_budget:
+            debug(
+                'Tabs use about %s, over the memory budget of %s'
+                % (format_size(total), format_size(self.memory_budget)),  # type: ignore
+                debug_type=DebugType.WARNING,
+            )
+        self._is_over_budget = is_over_budget
+        self.memory_usage_signal.emit(usage, is_over_budget)
+
+    def check_files_on_disk(self) -> None:
+        """Reload tabs whose files were changed by other processes."""
+        self._file_watch_timer.stop()
+        for file_path, code_editor in list(self._opened_files_dict.items()):
+            if not isinstance(code_editor, CodeEditor) or not code_editor.changed_on_disk():
+                continue
+            if code_editor.document().isModified():
+                answer = QMessageBox.question(
+                    self,
+                    'File Changed',
+                    '%s changed on disk. Reload it and discard unsaved changes?' % (file_path),
+                )
+                if answer != QMessageBox.StandardButton.Yes:
+                    code_editor.ignore_disk_changes()
+                    continue
+            debug('Reloading %s, it changed on disk' % (file_path))
+            code_editor.reload_from_disk()
+        self._file_watch_timer.start(self.FILE_WATCH_INTERVAL)
+
     def handle_tab_close(self, index: int) -> None:
         """Actions to be performed when a tab is closed.
 
@@ -58,16 +140,23 @@ class CodeTabsWidget(QTabWidget):
         -------
         None
         """
-        code_editor_instance: CodeEditor = self.widget(index)  # type: ignore
+        code_editor_instance: Union[CodeEditor, HexViewer] = self.widget(index)  # type: ignore
         file_path: str = list(self._opened_files_dict.keys())[
             list(self._opened_files_dict.values()).index(code_editor_instance)
         ]
         self._opened_files_dict.pop(file_path, None)
         debug('poping %s from cached file paths' % (file_path))
         self.removeTab(index)
-        code_editor_instance.content_update_timer.stop()
-        del code_editor_instance.content_view
-        code_editor_instance.clear()
+        if isinstance(code_editor_instance, HexViewer):
+            code_editor_instance.close_file()
+        else:
+            self.tab_closing_signal.emit(code_editor_instance)
+            code_editor_instance.stop_loading()
+            code_editor_instance.set_follow_mode(False)
+            code_editor_instance.close_journal()
+            code_editor_instance.buffer_words.detach()
+            del code_editor_instance.content_view
+            code_editor_instance.clear()
         del code_editor_instance
 
         if self.count() == 0:
@@ -89,11 +178,16 @@ class CodeTabsWidget(QTabWidget):
         status: bool = True
         if file_path in self._opened_files_dict.keys():
             debug('File path is already present in an opened tab')
-            code_editor: CodeEditor = self._opened_files_dict[file_path]
-            self.setCurrentWidget(code_editor)
+            self.setCurrentWidget(self._opened_files_dict[file_path])
         else:
-            code_editor_instance: CodeEditor = CodeEditor()
+            code_editor_instance: Union[CodeEditor, HexViewer] = CodeEditor()
+            code_editor_instance.loading_progress_signal.connect(self.loading_progress_signal)  # type: ignore
+            code_editor_instance.follow_mode_signal.connect(self.follow_mode_signal)  # type: ignore
             status = code_editor_instance.open_file(file_path)
+            if not status and code_editor_instance.is_binary:
+                debug('Opening binary file in hex viewer: %s' % (file_path))
+                code_editor_instance = HexViewer()
+                status = code_editor_instance.open_file(file_path)
             if status:
                 file_name: str = os.path.basename(os.path.normpath(file_path))
                 self.addTab(code_editor_instance, string_width(file_name, -16, True))
@@ -103,6 +197,72 @@ class CodeTabsWidget(QTabWidget):
                 del code_editor_instance
         return status
 
+    def open_files(self, file_paths: List[str]) -> None:
+        """Create a code editor tab for each of the given files at once, and read the files concurrently.
+
+        Tabs show a placeholder until their file is read. Tabs of files which turn out to be binary are
+        replaced by hex viewers, and those of files which cannot be opened are closed.
+
+        Parameters
+        ----------
+        file_paths: List[str]
+            Paths of files to be opened, the first one becomes the current tab.
+
+        Returns
+        -------
+        None
+        """
+        current: Optional[Union[CodeEditor, HexViewer]] = None
+        for file_path in file_paths:
+            if file_path not in self._opened_files_dict:
+                code_editor: CodeEditor = CodeEditor()
+                code_editor.loading_progress_signal.connect(self.loading_progress_signal)  # type: ignore
+                code_editor.follow_mode_signal.connect(self.follow_mode_signal)  # type: ignore
+                code_editor.opened_signal.connect(  # type: ignore
+                    lambda status, code_editor=code_editor: self._handle_opened(code_editor, status)
+                )
+                self.addTab(code_editor, string_width(os.path.basename(os.path.normpath(file_path)), -16, True))
+                self._opened_files_dict[file_path] = code_editor
+                code_editor.open_file_later(file_path)
+            if current is None:
+                current = self._opened_files_dict[file_path]
+        if current is not None:
+            self.setCurrentWidget(current)
+
+    def _handle_opened(self, code_editor: CodeEditor, status: bool) -> None:
+        """Replace the tab of a file opened by open_files by a hex viewer if it is binary, close it if it failed."""
+        index: int = self.indexOf(code_editor)
+        if status or index == -1:
+            return
+        if code_editor.is_binary:
+            debug('Opening binary file in hex viewer: %s' % (code_editor.file_path))
+            hex_viewer: HexViewer = HexViewer()
+            if hex_viewer.open_file(code_editor.file_path):
+                is_current: bool = self.currentIndex() == index
+                self.insertTab(index + 1, hex_viewer, self.tabText(index))
+                if is_current:
+                    self.setCurrentIndex(index + 1)
+                self.handle_tab_close(index)
+                self._opened_files_dict[hex_viewer.file_path] = hex_viewer
+                return
+        self.handle_tab_close(index)
+
+    def get_editor(self, file_path: str) -> Optional[CodeEditor]:
+        """Get the code editor tab of the given file, if it is opened."""
+        code_editor: Optional[Union[CodeEditor, HexViewer]] = self._opened_files_dict.get(file_path)
+        return code_editor if isinstance(code_editor, CodeEditor) else None
+
+    def current_code_editor(self) -> Optional[CodeEditor]:
+        """Get the current tab, if it is a code editor."""
+        code_editor: Optional[Union[CodeEditor, HexViewer]] = self.currentWidget()  # type: ignore
+        return code_editor if isinstance(code_editor, CodeEditor) else None
+
+    def close_journals(self) -> None:
+        """Delete crash recovery journals of all tabs, called on clean exit."""
+        for code_editor in self._opened_files_dict.values():
+            if isinstance(code_editor, CodeEditor):
+                code_editor.close_journal()
+
     def get_text(self) -> str:
         """Get text of current code editor tab.
 
@@ -111,4 +271,5 @@ class CodeTabsWidget(QTabWidget):
         text: str
             Text of current code editor tab.
         """
-        return self.currentWidget().toPlainText()  # type: ignore
+        code_editor: Optional[CodeEditor] = self.current_code_editor()
+        return code_editor.file_text() if code_editor is not None else ''
@@ -0,0 +1,113 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import sys
+from typing import Any, List
+
+from PySide6.QtGui import QTextBlock, QTextDocument
+
+from lightpad.utils.commons import DebugType, debug
+
+
+def value_size(value: Any) -> int:
+    """Bytes used by a value and the items of a tuple value, not counting objects Python shares."""
+    if value is None or type(value) is bool or type(value) is int and -5 <= value <= 256:
+        return 0
+    if type(value) is tuple:
+        return sys.getsizeof(value) + sum(map(value_size, value))
+    return sys.getsizeof(value)
+
+
+class BlockIndex:
+    """Value computed per block of a document, kept in sync with its edits.
+
+    Only the blocks touched by an edit are computed again, the values of the other
+    blocks are kept and shifted. Subclasses implement compute and may override updated
+    to maintain structures derived from the values.
+    """
+
+    # Values whose sizes are averaged to estimate the memory used by all of them
+    MEMORY_SAMPLE_SIZE: int = 64
+
+    def __init__(self, document: QTextDocument) -> None:
+        self.document: QTextDocument = document
+        self.values: List[Any] = []
+        self._block_count: int = 0
+        self.rebuild()
+        document.contentsChange.connect(self.handle_contents_change)  # type: ignore
+
+    def compute(self, block: QTextBlock) -> Any:
+        """Value of a block."""
+        raise NotImplementedError
+
+    def updated(self, first: int, removed: List[Any], added: List[Any]) -> None:
+        """Called after values of blocks starting at first were replaced."""
+
+    def memory_usage(self) -> int:
+        """Estimated bytes used by the values, from the sizes of a sample of them."""
+        count: int = len(self.values)
+        size: int = sys.getsizeof(self.values)
+        if count:
+            sample: List[Any] = self.values[:: max(1, count // self.MEMORY_SAMPLE_SIZE)]
+            size += count * sum(map(self.value_size, sample)) // len(sample)
+        return size
+
+    def value_size(self, value: Any) -> int:
+        """Bytes used by a value."""
+        return value_size(value)
+
+    def rebuild(self) -> None:
+        """Compute the values of all blocks."""
+        removed: List[Any] = self.values
+        self.values = []
+        block: QTextBlock = self.document.firstBlock()
+        while block.isValid():
+            self.values.append(self.compute(block))
+            block = block.next()
+        self._block_count = self.document.blockCount()
+        self.updated(0, removed, self.values)
+
+    def handle_contents_change(self, position: int, removed: int, added: int) -> None:
+        """Compute values of the changed blocks again."""
+        block_count: int = self.document.blockCount()
+        first_block: QTextBlock = self.document.findBlock(position)
+        first: int = first_block.blockNumber()
+        last: int = self.document.findBlock(min(position + added, self.document.characterCount() - 1)).blockNumber()
+        old_last: int = max(first - 1, last - (block_count - self._block_count))
+
+        new_values: List[Any] = []
+        block: QTextBlock = first_block
+        while block.isValid() and block.blockNumber() <= last:
+            new_values.append(self.compute(block))
+            block = block.next()
+
+        old_values: List[Any] = self.values[first : old_last + 1]
+        self.values[first : old_last + 1] = new_values
+        self._block_count = block_count
+
+        if len(self.values) != block_count:
+            # Blocks were removed without a matching change notification
+            debug('%s out of sync, rebuilding it' % (type(self).__name__), debug_type=DebugType.WARNING)
+            self.rebuild()
+            return
+        self.updated(first, old_values, new_values)
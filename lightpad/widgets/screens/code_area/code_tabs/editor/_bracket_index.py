@@ -0,0 +1,306 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import re
+import sys
+from bisect import bisect_right
+from typing import List, Optional, Pattern, Tuple
+
+from PySide6.QtGui import QTextBlock
+
+from lightpad.widgets.screens.code_area.code_tabs.editor._block_index import BlockIndex
+
+BRACKET_PAIRS: str = '()[]{}'
+OPENING_BRACKETS: str = BRACKET_PAIRS[0::2]
+CLOSING_BRACKETS: str = BRACKET_PAIRS[1::2]
+
+_BRACKET_PATTERN: Pattern = re.compile(r'[()\[\]{}]')
+
+# Number of unmatched closing brackets, followed by the number of unmatched opening brackets
+BracketSummary = Tuple[int, int]
+
+_EMPTY: BracketSummary = (0, 0)
+
+
+def combine(left: BracketSummary, right: BracketSummary) -> BracketSummary:
+    """Summary of two consecutive pieces of text."""
+    matched: int = min(left[1], right[0])
+    return left[0] + right[0] - matched, left[1] + right[1] - matched
+
+
+def summarize(text: str) -> BracketSummary:
+    """Summary of the brackets in a piece of text, treating all bracket kinds alike."""
+    depth: int = 0
+    min_depth: int = 0
+    for match in _BRACKET_PATTERN.finditer(text):
+        if match.group() in OPENING_BRACKETS:
+            depth += 1
+        else:
+            depth -= 1
+            min_depth = min(min_depth, depth)
+    return -min_depth, depth - min_depth
+
+
+class BracketIndex(BlockIndex):
+    """Bracket summary per block and per chunk of about CHUNK_SIZE blocks, in a segment tree.
+
+    A matching bracket is found by scanning the blocks left in the chunk of the bracket,
+    then descending the segment tree of chunk summaries to the chunk holding the match,
+    in O(log n) steps, and scanning the blocks of that chunk. Summaries of chunks and tree
+    nodes are computed lazily. An edit merges the chunks it touched into one, split again
+    if it grew past twice CHUNK_SIZE blocks, and only drops their summaries and those of
+    the nodes above them, the tree is built again if the number of chunks changed.
+    """
+
+    CHUNK_SIZE: int = 256
+
+    def __init__(self, document) -> None:
+        # Number of the first block of each chunk, a chunk ends where the next one starts
+        self._chunk_starts: List[int] = []
+        # Segment tree of the chunk summaries, node i combines nodes 2i and 2i + 1, leaves start at _tree_size,
+        # None where not computed yet, so a node is None whenever one of its children is
+        self._tree: List[Optional[BracketSummary]] = []
+        self._tree_size: int = 1
+        super().__init__(document)
+
+    def compute(self, block: QTextBlock) -> BracketSummary:
+        return summarize(block.text())
+
+    def memory_usage(self) -> int:
+        return super().memory_usage() + sys.getsizeof(self._chunk_starts) + sys.getsizeof(self._tree)
+
+    def updated(self, first: int, removed: List[BracketSummary], added: List[BracketSummary]) -> None:
+        if first == 0 and len(added) == len(self.values):
+            # Rebuilt
+            self._chunk_starts = list(range(0, len(self.values), self.CHUNK_SIZE))
+            self._build_tree([None] * len(self._chunk_starts))
+            return
+
+        shift: int = len(added) - len(removed)
+        first_chunk: int = max(0, bisect_right(self._chunk_starts, first) - 1)
+        last_chunk: int = max(first_chunk, bisect_right(self._chunk_starts, first + len(removed) - 1) - 1)
+        if removed == added:
+            # Edits within blocks
+            for chunk in range(first_chunk, last_chunk + 1):
+                self._drop_summary(chunk)
+            return
+
+        start: int = self._chunk_starts[first_chunk]
+        # Values are those after the edit already, the starts of the chunks are those before it
+        end: int = (
+            self._chunk_starts[last_chunk + 1] + shift if last_chunk + 1 < len(self._chunk_starts) else len(self.values)
+        )
+        size: int = end - start
+        chunk_count: int = 1 if size <= 2 * self.CHUNK_SIZE else -(-size // self.CHUNK_SIZE)
+        starts: List[int] = [start + (size * index) // chunk_count for index in range(chunk_count)] if size else []
+        self._chunk_starts[first_chunk:] = starts + [
+            chunk_start + shift for chunk_start in self._chunk_starts[last_chunk + 1 :]
+        ]
+        if len(starts) == last_chunk + 1 - first_chunk:
+            for chunk in range(first_chunk, last_chunk + 1):
+                self._drop_summary(chunk)
+        else:
+            # The chunks after the edit moved to other leaves
+            summaries: List[Optional[BracketSummary]] = self._tree[self._tree_size :]
+            summaries[first_chunk : last_chunk + 1] = [None] * len(starts)
+            self._build_tree(summaries[: len(self._chunk_starts)])
+
+    def _build_tree(self, summaries: List[Optional[BracketSummary]]) -> None:
+        """Build the segment tree from the summaries of the chunks, None if unknown."""
+        self._tree_size = 1
+        while self._tree_size < len(summaries):
+            self._tree_size *= 2
+        self._tree = [None] * self._tree_size + summaries + [_EMPTY] * (self._tree_size - len(summaries))
+        for node in range(self._tree_size - 1, 0, -1):
+            left, right = self._tree[2 * node], self._tree[2 * node + 1]
+            if left is not None and right is not None:
+                self._tree[node] = combine(left, right)
+
+    def _drop_summary(self, chunk: int) -> None:
+        """Forget the summary of a chunk and of the tree nodes above it."""
+        node: int = self._tree_size + chunk
+        while node and self._tree[node] is not None:
+            self._tree[node] = None
+            node //= 2
+
+    def _chunk_end(self, chunk: int) -> int:
+        return self._chunk_starts[chunk + 1] if chunk + 1 < len(self._chunk_starts) else len(self.values)
+
+    def _node_summary(self, node: int) -> BracketSummary:
+        summary: Optional[BracketSummary] = self._tree[node]
+        if summary is None:
+            if node >= self._tree_size:
+                chunk: int = node - self._tree_size
+                summary = _EMPTY
+                for value in self.values[self._chunk_starts[chunk] : self._chunk_end(chunk)]:
+                    summary = combine(summary, value)
+            else:
+                summary = combine(self._node_summary(2 * node), self._node_summary(2 * node + 1))
+            self._tree[node] = summary
+        return summary
+
+    def _find_chunk_after(self, chunk: int, depth: int) -> Tuple[int, int]:
+        """Find the first chunk from chunk on which closes depth opened brackets.
+
+        Returns
+        -------
+        chunk: Tuple[int, int]
+            Chunk number, or -1 if there is none, and the depth left at its start.
+        """
+        if chunk >= len(self._chunk_starts):
+            return -1, depth
+        node: int = self._tree_size + chunk
+        skipped: BracketSummary = _EMPTY
+        while True:
+            # Up to the largest node starting at the next chunk to be skipped
+            while node % 2 == 0:
+                node //= 2
+            summary: BracketSummary = combine(skipped, self._node_summary(node))
+            if summary[0] >= depth:
+                # The match is under this node, down to its chunk
+                while node < self._tree_size:
+                    node *= 2
+                    summary = combine(skipped, self._node_summary(node))
+                    if summary[0] < depth:
+                        skipped = summary
+                        node += 1
+                return node - self._tree_size, depth + skipped[1] - skipped[0]
+            skipped = summary
+            node += 1
+            if node & (node - 1) == 0:
+                return -1, depth  # Past the last leaf
+
+    def _find_chunk_before(self, chunk: int, depth: int) -> Tuple[int, int]:
+        """Find the last chunk before chunk which opens depth closed brackets.
+
+        Returns
+        -------
+        chunk: Tuple[int, int]
+            Chunk number, or -1 if there is none, and the depth left at its end.
+        """
+        if chunk <= 0:
+            return -1, depth
+        node: int = self._tree_size + chunk
+        skipped: BracketSummary = _EMPTY
+        while True:
+            # Up to the largest node ending at the previous chunk to be skipped
+            node -= 1
+            while node > 1 and node % 2:
+                node //= 2
+            summary: BracketSummary = combine(self._node_summary(node), skipped)
+            if summary[1] >= depth:
+                # The match is under this node, down to its chunk
+                while node < self._tree_size:
+                    node = 2 * node + 1
+                    summary = combine(self._node_summary(node), skipped)
+                    if summary[1] < depth:
+                        skipped = summary
+                        node -= 1
+                return node - self._tree_size, depth + skipped[0] - skipped[1]
+            skipped = summary
+            if node & (node - 1) == 0:
+                return -1, depth  # Before the first leaf
+
+    def _scan_blocks(self, number: int, stop: int, depth: int, forward: bool) -> Tuple[int, int]:
+        """Find the block closing depth opened brackets from block number to stop (excluded) in a direction."""
+        step: int = 1 if forward else -1
+        while number != stop:
+            closes, opens = self.values[number]
+            unmatched, matching = (closes, opens) if forward else (opens, closes)
+            if unmatched >= depth:
+                return number, depth
+            depth += matching - unmatched
+            number += step
+        return -1, depth
+
+    def _find_block(self, block_number: int, depth: int, forward: bool) -> Tuple[int, int]:
+        """Find the block closing depth opened brackets after block_number, or opening before it if not forward.
+
+        Returns
+        -------
+        block: Tuple[int, int]
+            Block number, or -1 if there is none, and the depth left at the start of that block's scan.
+        """
+        number: int = block_number + (1 if forward else -1)
+        if not 0 <= number < len(self.values):
+            return -1, depth
+        chunk: int = bisect_right(self._chunk_starts, number) - 1
+        if forward:
+            number, depth = self._scan_blocks(number, self._chunk_end(chunk), depth, True)
+            if number < 0:
+                chunk, depth = self._find_chunk_after(chunk + 1, depth)
+                if chunk >= 0:
+                    number, depth = self._scan_blocks(self._chunk_starts[chunk], self._chunk_end(chunk), depth, True)
+        else:
+            number, depth = self._scan_blocks(number, self._chunk_starts[chunk] - 1, depth, False)
+            if number < 0:
+                chunk, depth = self._find_chunk_before(chunk, depth)
+                if chunk >= 0:
+                    number, depth = self._scan_blocks(
+                        self._chunk_end(chunk) - 1, self._chunk_starts[chunk] - 1, depth, False
+                    )
+        return number, depth
+
+    def find_match(self, position: int) -> Optional[int]:
+        """Position of the bracket matching the bracket at position.
+
+        Parameters
+        ----------
+        position: int
+            Position of a bracket in the document.
+
+        Returns
+        -------
+        match: Optional[int]
+            Position of the matching bracket, of any kind, or None if it has none.
+        """
+        bracket: str = self.document.characterAt(position)
+        if bracket not in BRACKET_PAIRS:
+            return None
+        forward: bool = bracket in OPENING_BRACKETS
+        block: QTextBlock = self.document.findBlock(position)
+        text: str = block.text()
+        column: int = position - block.position()
+
+        depth: int = 1
+        block_number: int = block.blockNumber()
+        text_slice: range = range(column + 1, len(text)) if forward else range(column - 1, -1, -1)
+        while True:
+            for index in text_slice:
+                character: str = text[index]
+                if character in BRACKET_PAIRS:
+                    depth += 1 if (character in OPENING_BRACKETS) == forward else -1
+                    if depth == 0:
+                        return block.position() + index
+            block_number, depth = self._find_block(block_number, depth, forward)
+            if block_number < 0:
+                return None
+            block = self.document.findBlockByNumber(block_number)
+            text = block.text()
+            text_slice = range(len(text)) if forward else range(len(text) - 1, -1, -1)
+
+
+def is_pair(first: str, second: str) -> bool:
+    """Check if two brackets are an opening and its closing bracket, in any order."""
+    index: int = BRACKET_PAIRS.find(first)
+    return index >= 0 and BRACKET_PAIRS[index ^ 1] == second
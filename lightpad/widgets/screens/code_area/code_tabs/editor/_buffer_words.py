@@ -0,0 +1,227 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import re
+import sys
+from collections import Counter
+from concurrent.futures import Future
+from itertools import chain
+from typing import List, Optional, Pattern, Tuple
+
+from PySide6.QtGui import QTextBlock, QTextDocument
+
+from lightpad.utils.commons import DebugType, debug
+from lightpad.utils.word_index import WordIndex, word_pool
+from lightpad.widgets.screens.code_area.code_tabs.editor._block_index import BlockIndex
+
+MIN_WORD_LENGTH: int = 3
+
+_WORD_PATTERN: Pattern = re.compile(r'\w{%d,}' % MIN_WORD_LENGTH)
+
+# Characters of raw text split into blocks at once while finding their words in the word pool
+SPLIT_SIZE: int = 1024 * 1024
+
+
+def block_words(text: str) -> Tuple[str, ...]:
+    """Words of the text of a block."""
+    # Interned, so that each distinct word is stored once however often it occurs
+    return tuple(map(sys.intern, _WORD_PATTERN.findall(text)))
+
+
+def find_block_words(text: str, separator: str = '\u2029') -> Tuple[List[Tuple[str, ...]], Counter]:
+    """Words of each block of the raw text of a document, and the number of occurrences of each word.
+
+    Run in the word pool. The text is split SPLIT_SIZE characters at a time, so that the GUI thread is never
+    kept waiting long for the interpreter lock. Blocks are separated by separator, or by newlines in loaded text.
+    """
+    values: List[Tuple[str, ...]] = []
+    counts: Counter = Counter()
+    start: int = 0
+    while True:
+        end: int = text.find(separator, start + SPLIT_SIZE)
+        words: List[Tuple[str, ...]] = [
+            block_words(block_text) for block_text in text[start : end if end >= 0 else len(text)].split(separator)
+        ]
+        values.extend(words)
+        counts.update(chain.from_iterable(words))
+        if end < 0:
+            return values, counts
+        start = end + 1
+
+
+def find_chunk_words(head: List[str], text: str, end: int) -> Tuple[List[Tuple[str, ...]], Counter]:
+    """find_block_words of the lines ended by a chunk of loaded text, run in the word pool.
+
+    The lines are head, the start of the first line given by previous chunks, followed by text up to end,
+    its last newline.
+    """
+    return find_block_words(''.join(head) + text[:end], '\n')
+
+
+def merge_chunk_words(chunks: List[Future], tail: List[str]) -> Tuple[List[Tuple[str, ...]], Counter]:
+    """Words of each block of a loaded document from those of its chunks and of its last line, tail.
+
+    Run in the word pool, after the chunks.
+    """
+    values: List[Tuple[str, ...]] = []
+    counts: Counter = Counter()
+    for chunk in chunks:
+        chunk_values, chunk_counts = chunk.result()
+        values.extend(chunk_values)
+        counts.update(chunk_counts)
+    last_words: Tuple[str, ...] = block_words(''.join(tail))
+    values.append(last_words)
+    counts.update(last_words)
+    return values, counts
+
+
+class BufferWords(BlockIndex):
+    """Words per block of a document, added to and removed from a shared WordIndex as blocks change.
+
+    While disabled, edits are not followed and the document has no words in the index. build finds the
+    words of a loaded document in the word pool, off the GUI thread, from the chunks given to add_chunk
+    while it was loaded, or else from its text.
+    """
+
+    def __init__(self, document: QTextDocument, word_index: WordIndex) -> None:
+        self._word_index: WordIndex = word_index
+        self.is_enabled: bool = True
+        self._build: Optional[Future] = None
+        # Set when the document is edited while disabled
+        self._is_changed: bool = False
+        # Words being found in the word pool of the chunks of the document being loaded, None if not loaded in order
+        self._chunks: Optional[List[Future]] = None
+        # Start of the last line of the chunks, not ended by a newline yet
+        self._tail: List[str] = []
+        super().__init__(document)
+
+    def compute(self, block: QTextBlock) -> Tuple[str, ...]:
+        return block_words(block.text())
+
+    def value_size(self, value: Tuple[str, ...]) -> int:
+        # Words are interned, shared with the other documents
+        return sys.getsizeof(value)
+
+    def updated(self, first: int, removed: List[Tuple[str, ...]], added: List[Tuple[str, ...]]) -> None:
+        self._word_index.update(chain.from_iterable(removed), chain.from_iterable(added))
+
+    def handle_contents_change(self, position: int, removed: int, added: int) -> None:
+        if self.is_enabled:
+            super().handle_contents_change(position, removed, added)
+        else:
+            self._is_changed = True
+
+    def set_enabled(self, enabled: bool) -> None:
+        """Follow edits, finding the words of all blocks at once, or stop and remove the words from the index."""
+        self._build = None
+        if enabled:
+            self._chunks = None
+        if enabled == self.is_enabled:
+            return
+        self.is_enabled = enabled
+        if enabled:
+            self.rebuild()
+        else:
+            self._word_index.update(chain.from_iterable(self.values), ())
+            self.values = []
+
+    def start_loading(self) -> None:
+        """Disable while the document is loaded, the words of the chunks given to add_chunk are found meanwhile."""
+        self.set_enabled(False)
+        self._chunks = []
+        self._tail = []
+
+    def add_chunk(self, text: str) -> None:
+        """Find the words of the lines ended by text, appended to the document being loaded, in the word pool."""
+        if self._chunks is None:
+            return
+        end: int = text.rfind('\n')
+        if end < 0:
+            self._tail.append(text)
+            return
+        self._chunks.append(word_pool().submit(find_chunk_words, self._tail, text, end))
+        self._tail = [text[end + 1 :]]
+
+    def skip_chunks(self) -> None:
+        """Stop finding words of chunks, the document is not loaded in order, build finds them from its text."""
+        self._chunks = None
+        self._tail = []
+
+    def build(self) -> Future:
+        """Disable and find the words of the document in the word pool, see finish_build.
+
+        Returns
+        -------
+        build: Future
+            Words being found, done on a thread of the word pool.
+        """
+        chunks: Optional[List[Future]] = self._chunks
+        self.set_enabled(False)
+        self._is_changed = False
+        if chunks is not None:
+            # Queued after the chunks, the pool has a single thread
+            self._build = word_pool().submit(merge_chunk_words, chunks, self._tail)
+        else:
+            self._build = word_pool().submit(find_block_words, self.document.toRawText())
+        self.skip_chunks()
+        return self._build
+
+    def finish_build(self, build: Future) -> bool:
+        """Follow edits from the words found by build, unless the document changed meanwhile.
+
+        Parameters
+        ----------
+        build: Future
+            Done build, ignored if another one was started or the index was enabled or disabled since.
+
+        Returns
+        -------
+        status: bool
+            False if its words have to be found again, the document changed since build or its blocks are not
+            the lines of the chunks it was loaded from.
+        """
+        if build is not self._build:
+            return True
+        self._build = None
+        if self._is_changed:
+            return False
+        if build.exception() is not None:
+            debug('Could not find words in the word pool: %s' % (build.exception()), debug_type=DebugType.WARNING)
+            self.set_enabled(True)
+            return True
+
+        values, counts = build.result()
+        if len(values) != self.document.blockCount():
+            # Long lines were split into several blocks while loading
+            debug('Blocks of the loaded document are not its lines, finding its words from its text')
+            return False
+        self.values = values
+        self._block_count = len(values)
+        self.is_enabled = True
+        self._word_index.update((), counts)
+        return True
+
+    def detach(self) -> None:
+        """Remove the words of the document from the shared index and stop following it."""
+        self.document.contentsChange.disconnect(self.handle_contents_change)
+        self.set_enabled(False)
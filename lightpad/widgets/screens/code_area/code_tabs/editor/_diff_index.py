@@ -0,0 +1,191 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Optional
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtGui import QTextBlock, QTextDocument
+
+from lightpad.utils.myers_diff import LineRange, diff_ids
+from lightpad.widgets.screens.code_area.code_tabs.editor._block_index import BlockIndex, value_size
+
+# Kinds of change of a block, compared to the saved version
+UNCHANGED: int = 0
+ADDED: int = 1
+CHANGED: int = 2
+REMOVED: int = 3  # lines were removed before the block
+
+
+class DiffNotifier(QObject):
+    """Signals of a DiffIndex, which is not a QObject itself."""
+
+    changed: Signal = Signal()
+    saved: Signal = Signal()  # the saved version was set or cleared
+    finished: Signal = Signal(int, object)  # generation, line ranges
+
+
+class DiffIndex(BlockIndex):
+    """Hash of the text per block, and the line ranges in which the document differs from its saved version.
+
+    After an edit only the region between the closest unchanged lines around it is compared again. If that
+    region is larger than MAX_INCREMENTAL_LINES, it is marked as changed as a whole until the whole document
+    was compared on a worker thread, so that typing never waits for a diff.
+    """
+
+    MAX_INCREMENTAL_LINES: int = 2_000
+    DIFF_DELAY: int = 300  # milliseconds
+
+    def __init__(self, document: QTextDocument) -> None:
+        # Hashes of the lines of the saved version, None until the document was loaded or saved
+        self.saved_hashes: Optional[array] = None
+        self.hunks: List[LineRange] = []
+        self._hunk_starts: List[int] = []
+        self._hunk_ends: List[int] = []
+
+        # Incremented on each change of the hunks, results of diffs started before are dropped
+        self._generation: int = 0
+        self._is_approximate: bool = False
+        self._is_diffing: bool = False
+
+        self.notifier: DiffNotifier = DiffNotifier()
+        self.notifier.finished.connect(self._handle_diff_finished)  # type: ignore
+        self._diff_timer: QTimer = QTimer()
+        self._diff_timer.setSingleShot(True)
+        self._diff_timer.timeout.connect(self._start_diff)  # type: ignore
+
+        super().__init__(document)
+
+    def compute(self, block: QTextBlock) -> int:
+        return hash(block.text())
+
+    def memory_usage(self) -> int:
+        return (
+            super().memory_usage()
+            + sys.getsizeof(self.saved_hashes)
+            + sys.getsizeof(self.hunks)
+            + sum(map(value_size, self.hunks))
+            + sys.getsizeof(self._hunk_starts)
+            + sys.getsizeof(self._hunk_ends)
+        )
+
+    def is_approximate(self) -> bool:
+        """Check if a changed region is marked as a whole until the document was compared on a worker thread."""
+        return self._is_approximate
+
+    def _set_hunks(self, hunks: List[LineRange]) -> None:
+        self.hunks = hunks
+        self._hunk_starts = [hunk[2] for hunk in hunks]
+        self._hunk_ends = [hunk[3] for hunk in hunks]
+        self._generation += 1
+        self.notifier.changed.emit()
+
+    def set_saved(self) -> None:
+        """Make the current text the saved version, after it was loaded or saved."""
+        self.saved_hashes = array('q', self.values)
+        self._is_approximate = False
+        self._diff_timer.stop()
+        self._set_hunks([])
+        self.notifier.saved.emit()
+
+    def clear_saved(self) -> None:
+        """Forget the saved version, while the document is loaded again."""
+        self.saved_hashes = None
+        self._is_approximate = False
+        self._diff_timer.stop()
+        self._set_hunks([])
+        self.notifier.saved.emit()
+
+    def updated(self, first: int, removed: List[int], added: List[int]) -> None:
+        """Compare the edited region and the changed regions touching it again, shift the regions after it."""
+        if self.saved_hashes is None:
+            return
+        hunks: List[LineRange] = self.hunks
+        edit_end: int = first + len(removed)
+        delta: int = len(added) - len(removed)
+
+        # Changed regions overlapping or touching the edit, in block numbers from before it
+        low: int = bisect_left(self._hunk_ends, first)
+        high: int = bisect_right(self._hunk_starts, edit_end)
+        new_start: int = min(first, hunks[low][2]) if low < high else first
+        new_end: int = max(edit_end, hunks[high - 1][3]) if low < high else edit_end
+
+        # Outside changed regions, lines are shifted by the lines removed or added by the regions before them
+        old_start: int = new_start + (hunks[low - 1][1] - hunks[low - 1][3] if low > 0 else 0)
+        old_end: int = new_end + (hunks[high - 1][1] - hunks[high - 1][3] if high > 0 else 0)
+        new_end += delta
+
+        replacement: List[LineRange]
+        if (old_end - old_start) + (new_end - new_start) > self.MAX_INCREMENTAL_LINES:
+            replacement = [(old_start, old_end, new_start, new_end)]
+            self._is_approximate = True
+            self._diff_timer.start(self.DIFF_DELAY)
+        else:
+            replacement = [
+                (old_start + a_start, old_start + a_end, new_start + b_start, new_start + b_end)
+                for a_start, a_end, b_start, b_end in diff_ids(
+                    self.saved_hashes[old_start:old_end], array('q', self.values[new_start:new_end])
+                )
+            ]
+        tail: List[LineRange] = hunks[high:]
+        if delta:
+            tail = [(a_start, a_end, b_start + delta, b_end + delta) for a_start, a_end, b_start, b_end in tail]
+        self._set_hunks(hunks[:low] + replacement + tail)
+
+    def _start_diff(self) -> None:
+        """Compare the whole document with the saved version on a worker thread."""
+        if self._is_diffing or self.saved_hashes is None:
+            return
+        self._is_diffing = True
+        threading.Thread(
+            target=self._diff, args=(self._generation, self.saved_hashes, array('q', self.values)), daemon=True
+        ).start()
+
+    def _diff(self, generation: int, saved_hashes: array, hashes: array) -> None:
+        self.notifier.finished.emit(generation, diff_ids(saved_hashes, hashes))
+
+    def _handle_diff_finished(self, generation: int, hunks: List[LineRange]) -> None:
+        self._is_diffing = False
+        if generation == self._generation:
+            self._is_approximate = False
+            self._set_hunks(hunks)
+        elif self._is_approximate:
+            # Edited while comparing, compare again once editing pauses
+            self._diff_timer.start(self.DIFF_DELAY)
+
+    def marker(self, block_number: int) -> int:
+        """Kind of change of a block compared to the saved version, one of UNCHANGED, ADDED, CHANGED and REMOVED."""
+        index: int = bisect_right(self._hunk_starts, block_number) - 1
+        if index >= 0:
+            old_start, old_end, new_start, new_end = self.hunks[index]
+            if block_number < new_end:
+                return ADDED if old_start == old_end else CHANGED
+            if new_start == new_end == block_number:
+                return REMOVED
+        if block_number == len(self.values) - 1 and self.hunks and self.hunks[-1][2] == len(self.values):
+            # Lines removed from the end are marked at the last block
+            return REMOVED
+        return UNCHANGED
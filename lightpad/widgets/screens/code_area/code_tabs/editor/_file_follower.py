@@ -0,0 +1,129 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import io
+import os
+from typing import BinaryIO, Optional
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from lightpad.utils.commons import DebugType, debug
+from lightpad.utils.encoding import newline_decoder, pending_size
+from lightpad.utils.file_state import FileStat, stat_file
+
+
+class FileFollower(QObject):
+    """Reads what other processes write to the end of a file, like tail -f.
+
+    The file is polled every INTERVAL milliseconds and at most BATCH_SIZE bytes are read per poll. A file
+    replaced by another one, as done by log rotation, is read to its end before the new one is followed from
+    its start, and a truncated file is followed from its start again.
+    """
+
+    INTERVAL: int = 250  # milliseconds
+    BATCH_SIZE: int = 4 * 1024 * 1024
+
+    read_signal: Signal = Signal(str, int)  # decoded text, offset in the file of the first byte not decoded
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.file_path: str = ''
+        self._file: Optional[BinaryIO] = None
+        self._encoding: str = 'utf-8'
+        self._decoder: io.IncrementalNewlineDecoder = newline_decoder(self._encoding)
+
+        self._timer: QTimer = QTimer()
+        self._timer.timeout.connect(self.poll)  # type: ignore
+
+    def is_following(self) -> bool:
+        """Check if a file is followed."""
+        return self._file is not None
+
+    def start(self, file_path: str, offset: int, encoding: str) -> bool:
+        """Follow a file, reading it from offset on from the next poll.
+
+        Parameters
+        ----------
+        file_path: str
+            Path of the file.
+        offset: int
+            Number of bytes of the file read already.
+        encoding: str
+            Encoding of the file, invalid bytes are replaced.
+
+        Returns
+        -------
+        status: bool
+            True if the file could be opened, else False.
+        """
+        self.stop()
+        try:
+            self._file = open(file_path, 'rb')
+        except OSError as e:
+            debug('Could not follow %s: %s' % (file_path, e), debug_type=DebugType.WARNING)
+            return False
+        self.file_path = file_path
+        self._file.seek(offset)
+        self._encoding = encoding
+        self._decoder = newline_decoder(encoding, errors='replace')
+        self._timer.start(self.INTERVAL)
+        return True
+
+    def stop(self) -> None:
+        """Stop following the file."""
+        self._timer.stop()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def poll(self) -> None:
+        """Read the bytes written to the followed file since the last poll, read_signal is emitted if any."""
+        if self._file is None:
+            return
+
+        disk_stat: Optional[FileStat] = stat_file(self.file_path)
+        if disk_stat is None:
+            return
+
+        text: str = ''
+        if disk_stat[2] != os.fstat(self._file.fileno()).st_ino:
+            try:
+                new_file: BinaryIO = open(self.file_path, 'rb')
+            except OSError as e:
+                # Replaced again or removed since it was stat'ed, retried on the next poll
+                debug('Could not open the new %s: %s' % (self.file_path, e), debug_type=DebugType.WARNING)
+                return
+            # Rotated, finish reading the old file and follow the new one from its start
+            debug('%s was replaced, following the new file' % (self.file_path))
+            text = self._decoder.decode(self._file.read(), final=True)
+            self._file.close()
+            self._file = new_file
+            self._decoder.reset()
+        elif disk_stat[1] < self._file.tell():
+            debug('%s was truncated, following it from its start' % (self.file_path))
+            self._file.seek(0)
+            self._decoder.reset()
+
+        text += self._decoder.decode(self._file.read(self.BATCH_SIZE))
+        if text:
+            self.read_signal.emit(text, self._file.tell() - pending_size(self._decoder, self._encoding))
@@ -0,0 +1,180 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+from typing import List, Optional, Tuple
+
+from PySide6.QtGui import QTextBlock, QTextDocument
+
+from lightpad.widgets.screens.code_area.code_tabs.editor._block_index import BlockIndex
+
+FOLDED: int = 1  # QTextBlock.userState of the first block of a folded region
+
+TAB_WIDTH: int = 4
+OPENING_BRACKETS: str = '([{'
+CLOSING_BRACKETS: str = ')]}'
+
+# Indentation (-1 for blank lines) and net number of opened brackets of a block
+FoldInfo = Tuple[int, int]
+
+
+class FoldIndex(BlockIndex):
+    """Indentation and bracket balance per block, from which fold regions are derived.
+
+    A block starts a fold region if the next non blank block is indented deeper, in
+    which case the region ends before the next block that is not, or else if it opens
+    more brackets than it closes, in which case the region ends before the block
+    which closes them.
+    """
+
+    MAX_BRACKET_SCAN: int = 100_000  # blocks
+
+    def compute(self, block: QTextBlock) -> FoldInfo:
+        text: str = block.text()
+        stripped: str = text.lstrip()
+        if not stripped:
+            return -1, 0
+        indent: int = len(text[: len(text) - len(stripped)].expandtabs(TAB_WIDTH))
+        balance: int = sum(stripped.count(bracket) for bracket in OPENING_BRACKETS) - sum(
+            stripped.count(bracket) for bracket in CLOSING_BRACKETS
+        )
+        return indent, balance
+
+    def updated(self, first: int, removed: List[FoldInfo], added: List[FoldInfo]) -> None:
+        """Unfold regions whose first block or hidden blocks were edited."""
+        block: QTextBlock = self.document.findBlockByNumber(first)
+        for _ in range(len(added)):
+            if not block.isValid():
+                break
+            if block.userState() == FOLDED:
+                self.set_folded(block.blockNumber(), False)
+            block = block.next()
+
+        enclosing: QTextBlock = self.document.findBlockByNumber(first)
+        while enclosing.isValid() and not enclosing.isVisible():
+            enclosing = enclosing.previous()
+        if enclosing.isValid() and enclosing.blockNumber() != first and enclosing.userState() == FOLDED:
+            self.set_folded(enclosing.blockNumber(), False)
+
+    def _next_non_blank(self, block_number: int) -> int:
+        """Number of the next non blank block after block_number, or the block count."""
+        number: int = block_number + 1
+        while number < len(self.values) and self.values[number][0] < 0:
+            number += 1
+        return number
+
+    def fold_end(self, block_number: int) -> Optional[int]:
+        """Last block of the fold region starting at block_number, or None if it does not start one."""
+        if block_number >= len(self.values) or self.values[block_number][0] < 0:
+            return None
+        indent, balance = self.values[block_number]
+
+        next_number: int = self._next_non_blank(block_number)
+        if next_number < len(self.values) and self.values[next_number][0] > indent:
+            end: int = next_number
+            number: int = self._next_non_blank(next_number)
+            while number < len(self.values) and self.values[number][0] > indent:
+                end = number
+                number = self._next_non_blank(number)
+            return end
+
+        if balance > 0:
+            depth: int = balance
+            last_number: int = min(len(self.values), block_number + self.MAX_BRACKET_SCAN)
+            for number in range(block_number + 1, last_number):
+                depth += self.values[number][1]
+                if depth <= 0:
+                    return number - 1 if number - 1 > block_number else None
+        return None
+
+    def is_fold_start(self, block_number: int) -> bool:
+        """Cheap check if a block starts a fold region, without looking for its end."""
+        if block_number >= len(self.values) or self.values[block_number][0] < 0:
+            return False
+        indent, balance = self.values[block_number]
+        next_number: int = self._next_non_blank(block_number)
+        return balance > 0 or (next_number < len(self.values) and self.values[next_number][0] > indent)
+
+    def is_folded(self, block_number: int) -> bool:
+        return self.document.findBlockByNumber(block_number).userState() == FOLDED
+
+    def set_folded(self, block_number: int, folded: bool) -> bool:
+        """Fold or unfold the region starting at block_number.
+
+        Visibility of all its blocks is toggled first and the document layout is
+        updated once for the whole region afterwards. Nested folded regions stay
+        folded when unfolding.
+
+        Parameters
+        ----------
+        block_number: int
+            First block of the region.
+        folded: bool
+            Fold if True, else unfold.
+
+        Returns
+        -------
+        status: bool
+            True if the visibility of any block changed, else False.
+        """
+        start_block: QTextBlock = self.document.findBlockByNumber(block_number)
+        block: QTextBlock = start_block.next()
+        last_block: QTextBlock = start_block
+
+        if folded:
+            end: Optional[int] = self.fold_end(block_number)
+            if end is None:
+                return False
+            start_block.setUserState(FOLDED)
+            while block.isValid() and block.blockNumber() <= end:
+                block.setVisible(False)
+                last_block = block
+                block = block.next()
+        else:
+            start_block.setUserState(-1)
+            # Hidden blocks following the first block belong to its region, even if it was edited since
+            while block.isValid() and not block.isVisible():
+                block.setVisible(True)
+                last_block = block
+                if block.userState() == FOLDED:
+                    nested_end: Optional[int] = self.fold_end(block.blockNumber())
+                    while (
+                        nested_end is not None and block.next().isValid() and block.next().blockNumber() <= nested_end
+                    ):
+                        block = block.next()
+                    last_block = block
+                block = block.next()
+
+        if last_block == start_block:
+            return False
+        self.document.markContentsDirty(
+            start_block.position(), last_block.position() + last_block.length() - start_block.position()
+        )
+        return True
+
+
+def first_visible_ancestor(document: QTextDocument, block_number: int) -> int:
+    """Number of the closest visible block at or before block_number."""
+    block: QTextBlock = document.findBlockByNumber(block_number)
+    while block.isValid() and not block.isVisible():
+        block = block.previous()
+    return max(0, block.blockNumber())
@@ -22,7 +22,7 @@
 #
 
 from PySide6.QtCore import QSize
-from PySide6.QtGui import QPaintEvent
+from PySide6.QtGui import QMouseEvent, QPaintEvent
 from PySide6.QtWidgets import QWidget
 
 
@@ -39,3 +39,6 @@ class LineNumberArea(QWidget):
 
     def paintEvent(self, event: QPaintEvent) -> None:
         self._text_editor.line_number_area_paint_event(event)
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        self._text_editor.line_number_area_mouse_press_event(event)
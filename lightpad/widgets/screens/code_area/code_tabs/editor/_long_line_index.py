@@ -0,0 +1,271 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import re
+import sys
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Pattern, Tuple
+
+from PySide6.QtGui import QTextBlock, QTextBlockFormat, QTextCursor, QTextDocument, QTextFormat
+
+from lightpad.widgets.screens.code_area.code_tabs.editor._block_index import BlockIndex, value_size
+
+# A document with a line longer than LONG_LINE_LENGTH has its long lines split into blocks of SOFT_BREAK_COLUMN
+LONG_LINE_LENGTH: int = 10_000
+SOFT_BREAK_COLUMN: int = 1024
+
+# Block format property of blocks continuing the line of the block before them
+SOFT_BREAK_PROPERTY: int = QTextFormat.Property.UserProperty
+
+# Newlines of inserted text, each ends a block, a CRLF is never split
+NEWLINE_PATTERN: Pattern = re.compile('\r\n|\r|\n')
+
+
+def soft_break_segments(text: str, column: int) -> List[Tuple[str, bool]]:
+    """Split text at its CRLF, CR and LF newlines and every SOFT_BREAK_COLUMN characters of a line.
+
+    Parameters
+    ----------
+    text: str
+        Text appended to a line.
+    column: int
+        Length of the line text is appended to.
+
+    Returns
+    -------
+    segments: List[Tuple[str, bool]]
+        Text of each segment and whether a soft break, rather than a newline, precedes it.
+        The first segment continues the line, whatever its flag.
+    """
+    segments: List[Tuple[str, bool]] = []
+    for line in NEWLINE_PATTERN.split(text):
+        start: int = min(len(line), max(0, SOFT_BREAK_COLUMN - column))
+        segments.append((line[:start], False))
+        while start < len(line):
+            segments.append((line[start : start + SOFT_BREAK_COLUMN], True))
+            start += SOFT_BREAK_COLUMN
+        column = 0
+    return segments
+
+
+class LongLineIndex(BlockIndex):
+    """Blocks split off long lines, so that Qt never lays out or highlights a whole minified file at once.
+
+    Once a line longer than LONG_LINE_LENGTH is loaded, lines are inserted as blocks of at most
+    SOFT_BREAK_COLUMN characters, all but the first marked by SOFT_BREAK_PROPERTY in their block format.
+    Merging blocks keeps the format of the first and undo restores formats, so soft breaks follow edits,
+    and they are left out when the document is saved. Blocks split by the user are newlines, their
+    copied format is cleared.
+
+    While a file is loaded around a line it was asked to show, lines before that may be missing from the
+    document, see set_gap, so that line numbers are those of the file.
+    """
+
+    def __init__(self, document: QTextDocument) -> None:
+        self.is_enabled: bool = False
+        # Set while the user edits, blocks inserted meanwhile are not soft breaks
+        self.is_user_edit: bool = False
+        self._is_clearing: bool = False
+        # Sorted numbers of the blocks preceded by a soft break
+        self.soft_blocks: List[int] = []
+        # Line of each soft block, soft_blocks[index] - index, which never decreases as blocks are sorted
+        self._soft_lines: List[int] = []
+        self._soft_format: QTextBlockFormat = QTextBlockFormat()
+        self._soft_format.setProperty(SOFT_BREAK_PROPERTY, True)
+        # Lines of the file missing before the block of gap_cursor
+        self.gap_cursor: Optional[QTextCursor] = None
+        self.gap_lines: int = 0
+        super().__init__(document)
+
+    def compute(self, block: QTextBlock) -> bool:
+        return self.is_enabled and bool(block.blockFormat().property(SOFT_BREAK_PROPERTY))
+
+    def memory_usage(self) -> int:
+        size: int = super().memory_usage() + sys.getsizeof(self.soft_blocks) + sys.getsizeof(self._soft_lines)
+        if self.soft_blocks:
+            size += len(self.soft_blocks) * (value_size(self.soft_blocks[-1]) + value_size(self._soft_lines[-1]))
+        return size
+
+    def set_enabled(self, enabled: bool) -> None:
+        """Split long lines inserted from now on, or stop tracking soft breaks."""
+        if enabled != self.is_enabled:
+            self.is_enabled = enabled
+            self.rebuild()
+
+    def updated(self, first: int, removed: List[bool], added: List[bool]) -> None:
+        if removed == added:
+            # Edits within blocks
+            return
+        start: int = bisect_left(self.soft_blocks, first)
+        end: int = bisect_left(self.soft_blocks, first + len(removed))
+        shift: int = len(added) - len(removed)
+        self.soft_blocks[start:] = [first + offset for offset, is_soft in enumerate(added) if is_soft] + [
+            block_number + shift for block_number in self.soft_blocks[end:]
+        ]
+        self._update_soft_lines(start)
+
+    def _update_soft_lines(self, start: int) -> None:
+        """Bring _soft_lines in line with soft_blocks, which changed from index start on."""
+        self._soft_lines[start:] = [
+            block_number - index for index, block_number in enumerate(self.soft_blocks[start:], start)
+        ]
+
+    def handle_contents_change(self, position: int, removed: int, added: int) -> None:
+        super().handle_contents_change(position, removed, added)
+        if self.is_user_edit and not self._is_clearing and self.soft_blocks:
+            self._clear_inserted_soft_breaks(position, added)
+
+    def _clear_inserted_soft_breaks(self, position: int, added: int) -> None:
+        """Turn blocks the user inserted into lines of their own, they copied the format of the split block."""
+        first: int = self.document.findBlock(position).blockNumber() + 1
+        last: int = self.document.findBlock(position + added).blockNumber()
+        start: int = bisect_left(self.soft_blocks, first)
+        end: int = bisect_right(self.soft_blocks, last)
+        if start == end:
+            return
+        self._is_clearing = True
+        cursor: QTextCursor = QTextCursor(self.document)
+        # Part of the edit which inserted the blocks, undone together with it
+        cursor.joinPreviousEditBlock()
+        for block_number in self.soft_blocks[start:end]:
+            cursor.setPosition(self.document.findBlockByNumber(block_number).position())
+            cursor.setBlockFormat(QTextBlockFormat())
+            # The document does not notify format changes made while it notifies the edit
+            self.values[block_number] = False
+        cursor.endEditBlock()
+        del self.soft_blocks[start:end]
+        self._update_soft_lines(start)
+        self._is_clearing = False
+
+    def insert(self, cursor: QTextCursor, text: str) -> None:
+        """Insert text, splitting long lines if enabled.
+
+        Text is appended at the end of the document, or inserted at the start of a block if it is made of
+        whole lines.
+
+        Parameters
+        ----------
+        cursor: QTextCursor
+            Cursor at the end of the document, or at the start of a block if text ends with a newline.
+        text: str
+            Text to be inserted.
+
+        Returns
+        -------
+        None
+        """
+        column: int = cursor.positionInBlock()
+        if not self.is_enabled:
+            lines: List[str] = NEWLINE_PATTERN.split(text)
+            if column + len(lines[0]) <= LONG_LINE_LENGTH and all(len(line) <= LONG_LINE_LENGTH for line in lines):
+                cursor.insertText(text)
+                return
+            self.set_enabled(True)
+            # Split the start of the line, inserted before it was known to be long, as well
+            cursor.setPosition(cursor.block().position(), QTextCursor.MoveMode.KeepAnchor)
+            text = cursor.selectedText() + text
+            cursor.removeSelectedText()
+            column = 0
+
+        is_soft_block: bool = bool(cursor.blockFormat().property(SOFT_BREAK_PROPERTY))
+        newlines: List[str] = []
+        for number, (segment, is_soft) in enumerate(soft_break_segments(text, column)):
+            if number == 0:
+                newlines.append(segment)
+            elif not is_soft and not is_soft_block:
+                # Inserted newlines copy the format of the block they split
+                newlines.append(segment)
+            else:
+                cursor.insertText('\n'.join(newlines))
+                newlines = [segment]
+                cursor.insertBlock(self._soft_format if is_soft else QTextBlockFormat())
+                is_soft_block = is_soft
+        cursor.insertText('\n'.join(newlines))
+
+    def set_gap(self, cursor: Optional[QTextCursor], lines: int = 0) -> None:
+        """Count lines of the file as missing before the block of a cursor, or none if cursor is None.
+
+        Parameters
+        ----------
+        cursor: Optional[QTextCursor]
+            Cursor at the start of the first block after the missing lines, moved along as text is inserted.
+        lines: int
+            Number of missing lines. (default is 0)
+
+        Returns
+        -------
+        None
+        """
+        self.gap_cursor = cursor
+        self.gap_lines = lines if cursor is not None else 0
+
+    def gap_line(self) -> Optional[int]:
+        """Number of the first missing line, None if no line is missing."""
+        if self.gap_cursor is None:
+            return None
+        gap_block: int = self.gap_cursor.blockNumber()
+        return gap_block - bisect_right(self.soft_blocks, gap_block)
+
+    def line_number(self, block_number: int) -> int:
+        """Number of the line of the file a block is part of, starting at 0."""
+        line_number: int = block_number - bisect_right(self.soft_blocks, block_number)
+        if self.gap_cursor is not None and block_number >= self.gap_cursor.blockNumber():
+            line_number += self.gap_lines
+        return line_number
+
+    def block_number(self, line_number: int) -> int:
+        """Number of the first block of a line of the file, starting at 0, that after the gap if it is missing."""
+        gap_line: Optional[int] = self.gap_line()
+        if gap_line is not None and line_number >= gap_line:
+            line_number = max(gap_line, line_number - self.gap_lines)
+        return line_number + bisect_right(self._soft_lines, line_number)
+
+    def is_soft_block(self, block_number: int) -> bool:
+        """Check if a block is preceded by a soft break."""
+        index: int = bisect_left(self.soft_blocks, block_number)
+        return index < len(self.soft_blocks) and self.soft_blocks[index] == block_number
+
+    def join_soft_breaks(self, text: str) -> str:
+        """Text of the document without its soft breaks.
+
+        Parameters
+        ----------
+        text: str
+            Plain text of the document.
+
+        Returns
+        -------
+        text: str
+            Text with the lines split into blocks joined again.
+        """
+        if not self.soft_blocks:
+            return text
+        parts: List[str] = []
+        start: int = 0
+        for block_number in self.soft_blocks:
+            # The soft break is the block separator before the block
+            separator: int = self.document.findBlockByNumber(block_number).position() - 1
+            parts.append(text[start:separator])
+            start = separator + 1
+        parts.append(text[start:])
+        return ''.join(parts)
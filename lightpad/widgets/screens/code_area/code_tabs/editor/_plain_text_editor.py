@@ -22,24 +22,102 @@
 #
 
 
-from typing import Union
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 
-from PySide6.QtCore import QRect, Qt, Slot
-from PySide6.QtGui import QColor, QPainter, QPaintEvent, QResizeEvent, QTextFormat
-from PySide6.QtWidgets import QPlainTextEdit, QTextEdit
+from PySide6.QtCore import QMimeData, QPoint, QRect, QRectF, Qt, Slot
+from PySide6.QtGui import (
+    QColor,
+    QDragEnterEvent,
+    QKeyEvent,
+    QKeySequence,
+    QMouseEvent,
+    QPainter,
+    QPaintEvent,
+    QResizeEvent,
+    QShortcut,
+    QTextBlock,
+    QTextCursor,
+    QTextDocument,
+    QTextFormat,
+)
+from PySide6.QtWidgets import QApplication, QPlainTextEdit, QTextEdit
 
+from lightpad.widgets.screens.code_area.code_tabs.editor._bracket_index import BRACKET_PAIRS, BracketIndex, is_pair
+from lightpad.widgets.screens.code_area.code_tabs.editor._diff_index import ADDED, CHANGED, REMOVED, DiffIndex
+from lightpad.widgets.screens.code_area.code_tabs.editor._fold_index import FoldIndex, first_visible_ancestor
 from lightpad.widgets.screens.code_area.code_tabs.editor._line_number_area import LineNumberArea
+from lightpad.widgets.screens.code_area.code_tabs.editor._long_line_index import LongLineIndex
+
+# Keys moving all cursors when there are several
+_CURSOR_MOVES: Dict[int, QTextCursor.MoveOperation] = {
+    Qt.Key.Key_Left: QTextCursor.MoveOperation.Left,
+    Qt.Key.Key_Right: QTextCursor.MoveOperation.Right,
+    Qt.Key.Key_Up: QTextCursor.MoveOperation.Up,
+    Qt.Key.Key_Down: QTextCursor.MoveOperation.Down,
+    Qt.Key.Key_Home: QTextCursor.MoveOperation.StartOfLine,
+    Qt.Key.Key_End: QTextCursor.MoveOperation.EndOfLine,
+}
+_WORD_MOVES: Dict[int, QTextCursor.MoveOperation] = {
+    Qt.Key.Key_Left: QTextCursor.MoveOperation.WordLeft,
+    Qt.Key.Key_Right: QTextCursor.MoveOperation.WordRight,
+}
+
+# Colors of the markers of lines changed since the document was saved, in the left padding of the gutter
+DIFF_MARKER_WIDTH: int = 3
+_DIFF_MARKER_COLORS: Dict[int, QColor] = {
+    ADDED: QColor(Qt.GlobalColor.darkGreen),
+    CHANGED: QColor(Qt.GlobalColor.blue),
+    REMOVED: QColor(Qt.GlobalColor.red),
+}
 
 
 class PlainTextEditor(QPlainTextEdit):
     """Text editor implementation"""
 
-    def __init__(self) -> None:
+    def __init__(self, source: Optional['PlainTextEditor'] = None) -> None:
         super().__init__()
 
         self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
 
         self.line_number_area: LineNumberArea = LineNumberArea(self)
+        self.fold_index: FoldIndex
+        self.bracket_index: BracketIndex
+        self.diff_index: DiffIndex
+        self.long_line_index: LongLineIndex
+        if source is None:
+            self.fold_index = FoldIndex(self.document())
+            self.bracket_index = BracketIndex(self.document())
+            self.diff_index = DiffIndex(self.document())
+            self.long_line_index = LongLineIndex(self.document())
+        else:
+            # Views of the same document share it, its layout and its indexes
+            self.setDocument(source.document())
+            self.fold_index = source.fold_index
+            self.bracket_index = source.bracket_index
+            self.diff_index = source.diff_index
+            self.long_line_index = source.long_line_index
+        self.diff_index.notifier.changed.connect(self.line_number_area.update)  # type: ignore
+
+        self._jump_to_bracket_shortcut: QShortcut = QShortcut(QKeySequence('Ctrl+Shift+\\'), self)
+        self._jump_to_bracket_shortcut.setContext(Qt.ShortcutContext.WidgetShortcut)
+        self._jump_to_bracket_shortcut.activated.connect(self.jump_to_matching_bracket)  # type: ignore
+
+        # Cursors besides the text cursor, edited together with it
+        self.extra_cursors: List[QTextCursor] = []
+        # Document revision and cursor positions after the last coalescing edit, to join the next one to it
+        self._coalesce_state: Optional[Tuple[int, List[int]]] = None
+
+        self._select_next_shortcut: QShortcut = QShortcut(QKeySequence('Ctrl+D'), self)
+        self._select_next_shortcut.setContext(Qt.ShortcutContext.WidgetShortcut)
+        self._select_next_shortcut.activated.connect(self.select_next_occurrence)  # type: ignore
+
+        self._add_cursor_above_shortcut: QShortcut = QShortcut(QKeySequence('Ctrl+Alt+Up'), self)
+        self._add_cursor_above_shortcut.setContext(Qt.ShortcutContext.WidgetShortcut)
+        self._add_cursor_above_shortcut.activated.connect(self.add_cursor_above)  # type: ignore
+
+        self._add_cursor_below_shortcut: QShortcut = QShortcut(QKeySequence('Ctrl+Alt+Down'), self)
+        self._add_cursor_below_shortcut.setContext(Qt.ShortcutContext.WidgetShortcut)
+        self._add_cursor_below_shortcut.activated.connect(self.add_cursor_below)  # type: ignore
 
         self.blockCountChanged[int].connect(self.update_line_number_area_width)  # type: ignore
         self.updateRequest[QRect, int].connect(self.update_line_number_area)  # type: ignore
@@ -51,14 +129,18 @@ class PlainTextEditor(QPlainTextEdit):
     def line_number_area_width(self) -> int:
         """Returns the width of line number area."""
         digits: int = 1
-        max_num: Union[int, float] = max(1, self.blockCount())
+        max_num: Union[int, float] = max(1, self.long_line_index.line_number(self.blockCount() - 1) + 1)
         while max_num >= 10:
             max_num *= 0.1
             digits += 1
 
-        space = 3 + self.fontMetrics().horizontalAdvance('9') * digits
+        space = DIFF_MARKER_WIDTH + self.fontMetrics().horizontalAdvance('9') * digits + self.fold_marker_width()
         return space
 
+    def fold_marker_width(self) -> int:
+        """Returns the width of the fold marker column, at the right of the line number area."""
+        return self.fontMetrics().height()
+
     def resizeEvent(self, e: QResizeEvent) -> None:
         super().resizeEvent(e)
         cr = self.contentsRect()
@@ -76,19 +158,76 @@ class PlainTextEditor(QPlainTextEdit):
             top = self.blockBoundingGeometry(block).translated(offset).top()
             bottom = top + self.blockBoundingRect(block).height()
 
+            marker_width = self.fold_marker_width()
             while block.isValid() and top <= event.rect().bottom():
                 if block.isVisible() and bottom >= event.rect().top():
-                    number = str(block_number + 1)
-                    painter.setPen(Qt.GlobalColor.black)
-                    width = self.line_number_area.width()
+                    width = self.line_number_area.width() - marker_width
                     height = self.fontMetrics().height()
-                    painter.drawText(0, top, width, height, Qt.AlignmentFlag.AlignRight, number)  # type: ignore
+                    if self.long_line_index.is_soft_block(block_number):
+                        # Continues the line above, split off a long line
+                        painter.setPen(Qt.GlobalColor.darkGray)
+                        painter.drawText(0, top, width, height, Qt.AlignmentFlag.AlignRight, '\u21aa')  # type: ignore
+                    else:
+                        number = str(self.long_line_index.line_number(block_number) + 1)
+                        painter.setPen(Qt.GlobalColor.black)
+                        painter.drawText(0, top, width, height, Qt.AlignmentFlag.AlignRight, number)  # type: ignore
+
+                    if self.fold_index.is_folded(block_number):
+                        marker = '\u25b8'
+                    elif self.fold_index.is_fold_start(block_number):
+                        marker = '\u25be'
+                    else:
+                        marker = ''
+                    if marker:
+                        painter.setPen(Qt.GlobalColor.darkGray)
+                        painter.drawText(width, top, marker_width, height, Qt.AlignmentFlag.AlignCenter, marker)  # type: ignore
+
+                    diff_marker = self.diff_index.marker(block_number)
+                    if diff_marker == REMOVED:
+                        rect = QRectF(0, top - 1, 2 * DIFF_MARKER_WIDTH, 3)
+                    else:
+                        rect = QRectF(0, top, DIFF_MARKER_WIDTH, bottom - top)
+                    if diff_marker:
+                        painter.fillRect(rect, _DIFF_MARKER_COLORS[diff_marker])
 
                 block = block.next()
                 top = bottom
                 bottom = top + self.blockBoundingRect(block).height()
                 block_number += 1
 
+    def line_number_area_mouse_press_event(self, event: QMouseEvent) -> None:
+        """Toggle folding when a fold marker is clicked"""
+        if event.position().x() < self.line_number_area.width() - self.fold_marker_width():
+            return
+        block = self.cursorForPosition(QPoint(0, int(event.position().y()))).block()
+        self.toggle_fold(block.blockNumber())
+
+    def toggle_fold(self, block_number: int) -> None:
+        """Fold the region starting at the given block, or unfold it if folded.
+
+        Parameters
+        ----------
+        block_number: int
+            Number of the first block of the region.
+
+        Returns
+        -------
+        None
+        """
+        if not self.fold_index.set_folded(block_number, not self.fold_index.is_folded(block_number)):
+            return
+
+        cursor: QTextCursor = self.textCursor()
+        if not cursor.block().isVisible():
+            visible_block = self.document().findBlockByNumber(
+                first_visible_ancestor(self.document(), cursor.blockNumber())
+            )
+            cursor.setPosition(visible_block.position())
+            self.setTextCursor(cursor)
+
+        self.viewport().update()
+        self.line_number_area.update()
+
     @Slot(int)
     def update_line_number_area_width(self, newBlockCount: int) -> None:
         """Signal slot to update line number area width based on newBlockCount"""
@@ -106,6 +245,274 @@ class PlainTextEditor(QPlainTextEdit):
         if rect.contains(self.viewport().rect()):
             self.update_line_number_area_width(0)
 
+    def _bracket_at_cursor(self) -> Optional[int]:
+        """Position of the bracket after the cursor, else of the bracket before it."""
+        position: int = self.textCursor().position()
+        for candidate in (position, position - 1):
+            if candidate >= 0 and self.document().characterAt(candidate) in BRACKET_PAIRS:
+                return candidate
+        return None
+
+    def _bracket_selections(self) -> List[QTextEdit.ExtraSelection]:
+        """Selections highlighting the bracket at the cursor and its match."""
+        bracket: Optional[int] = self._bracket_at_cursor()
+        if bracket is None:
+            return []
+        match: Optional[int] = self.bracket_index.find_match(bracket)
+        matched: bool = match is not None and is_pair(
+            self.document().characterAt(bracket), self.document().characterAt(match)
+        )
+
+        selections: List[QTextEdit.ExtraSelection] = []
+        for position in (bracket, match):
+            if position is None:
+                continue
+            selection = QTextEdit.ExtraSelection()
+            selection.format.setBackground(  # type: ignore
+                QColor(Qt.GlobalColor.green).lighter(160) if matched else QColor(Qt.GlobalColor.red).lighter(160)
+            )
+            selection.cursor = QTextCursor(self.document())  # type: ignore
+            selection.cursor.setPosition(position)  # type: ignore
+            selection.cursor.setPosition(position + 1, QTextCursor.MoveMode.KeepAnchor)  # type: ignore
+            selections.append(selection)
+        return selections
+
+    @Slot()
+    def jump_to_matching_bracket(self) -> None:
+        """Move the cursor to the bracket matching the one at the cursor"""
+        bracket: Optional[int] = self._bracket_at_cursor()
+        if bracket is None:
+            return
+        match: Optional[int] = self.bracket_index.find_match(bracket)
+        if match is not None:
+            cursor: QTextCursor = self.textCursor()
+            cursor.setPosition(match)
+            self.setTextCursor(cursor)
+
+    def _set_cursors(self, cursors: List[QTextCursor]) -> None:
+        """Make the first cursor the text cursor and the others extra cursors, dropping duplicates."""
+        seen: Set[Tuple[int, int]] = set()
+        unique_cursors: List[QTextCursor] = []
+        for cursor in cursors:
+            key: Tuple[int, int] = (cursor.position(), cursor.anchor())
+            if key not in seen:
+                seen.add(key)
+                unique_cursors.append(cursor)
+
+        self.extra_cursors = unique_cursors[1:]
+        if self.textCursor() == unique_cursors[0]:
+            # setTextCursor does not notify when the cursor did not move, the extra cursors may have
+            self.highlight_current_line()
+        self.setTextCursor(unique_cursors[0])
+        self.viewport().update()
+
+    def _cursor_at(self, anchor: int, position: int) -> QTextCursor:
+        cursor: QTextCursor = QTextCursor(self.document())
+        cursor.setPosition(anchor)
+        cursor.setPosition(position, QTextCursor.MoveMode.KeepAnchor)
+        return cursor
+
+    def apply_to_cursors(
+        self, action: Callable[[QTextCursor], object], edit: bool = True, coalesce: bool = False
+    ) -> None:
+        """Apply an action to the text cursor and all extra cursors.
+
+        Edits are made in a single edit block, so that they are laid out once and undone in one step.
+        The text cursor is set only once, so cursorPositionChanged is emitted once.
+        Coalescing edits made right after each other, with the cursors where the last one left them, are joined
+        into one undo step, like Qt does for typing with a single cursor.
+
+        Parameters
+        ----------
+        action: Callable[[QTextCursor], object]
+            Called with each cursor.
+        edit: bool
+            Action edits the document. (default is True)
+        coalesce: bool
+            Join the edit to the last one if that coalesced too. (default is False)
+
+        Returns
+        -------
+        None
+        """
+        cursors: List[QTextCursor] = [self.textCursor()] + self.extra_cursors
+        if not edit:
+            for cursor in cursors:
+                action(cursor)
+            self._set_cursors(cursors)
+            self.ensureCursorVisible()
+            return
+
+        # The document adjusts every live cursor on each edit, so while editing the cursors are kept as
+        # positions and the edits are made with a single cursor, from the last position to the first
+        spans: List[Tuple[int, int]] = [(cursor.anchor(), cursor.position()) for cursor in cursors]
+        del cursors
+        self.extra_cursors = []
+        self.setExtraSelections([])
+
+        document: QTextDocument = self.document()
+        order: List[int] = sorted(range(len(spans)), key=lambda index: min(spans[index]), reverse=True)
+        shifts: List[int] = [0] * len(spans)
+        cursor: QTextCursor = QTextCursor(document)
+        if coalesce and self._coalesce_state == (document.revision(), sorted(position for _, position in spans)):
+            cursor.joinPreviousEditBlock()
+        else:
+            cursor.beginEditBlock()
+        for index in order:
+            character_count: int = document.characterCount()
+            cursor.setPosition(spans[index][0])
+            cursor.setPosition(spans[index][1], QTextCursor.MoveMode.KeepAnchor)
+            action(cursor)
+            spans[index] = (cursor.anchor(), cursor.position())
+            shifts[index] = document.characterCount() - character_count
+        cursor.endEditBlock()
+
+        # Edits before a cursor, made after it, shift it
+        shift: int = 0
+        for index in reversed(order):
+            spans[index] = (spans[index][0] + shift, spans[index][1] + shift)
+            shift += shifts[index]
+        self._coalesce_state = (document.revision(), sorted(position for _, position in spans)) if coalesce else None
+        self._set_cursors([self._cursor_at(anchor, position) for anchor, position in spans])
+        self.ensureCursorVisible()
+
+    @Slot()
+    def clear_extra_cursors(self) -> None:
+        """Keep only the text cursor"""
+        if self.extra_cursors:
+            self.extra_cursors = []
+            self.highlight_current_line()
+            self.viewport().update()
+
+    @Slot()
+    def select_next_occurrence(self) -> None:
+        """Select the word at the cursor, or add a cursor selecting the next occurrence of the selection"""
+        cursor: QTextCursor = self.textCursor()
+        if not cursor.hasSelection():
+            cursor.select(QTextCursor.SelectionType.WordUnderCursor)
+            self.setTextCursor(cursor)
+            return
+
+        text: str = cursor.selectedText()
+        cursors: List[QTextCursor] = [cursor] + self.extra_cursors
+        selected: Set[int] = {selection.selectionStart() for selection in cursors}
+        start: int = max(selection.selectionEnd() for selection in cursors)
+        flags: QTextDocument.FindFlag = QTextDocument.FindFlag.FindCaseSensitively
+        found: QTextCursor = self.document().find(text, start, flags)
+        if found.isNull():
+            found = self.document().find(text, 0, flags)
+        if found.isNull() or found.selectionStart() in selected:
+            return
+        self._set_cursors([found, *cursors])
+        self.ensureCursorVisible()
+
+    def _add_cursor_vertically(self, operation: QTextCursor.MoveOperation) -> None:
+        cursors: List[QTextCursor] = [self.textCursor()] + self.extra_cursors
+        key: Callable[[QTextCursor], int] = QTextCursor.position
+        cursor: QTextCursor = QTextCursor(
+            min(cursors, key=key) if operation == QTextCursor.MoveOperation.Up else max(cursors, key=key)
+        )
+        cursor.clearSelection()
+        if cursor.movePosition(operation):
+            self._set_cursors([cursor, *cursors])
+            self.ensureCursorVisible()
+
+    @Slot()
+    def add_cursor_above(self) -> None:
+        """Add a cursor on the line above the topmost cursor"""
+        self._add_cursor_vertically(QTextCursor.MoveOperation.Up)
+
+    @Slot()
+    def add_cursor_below(self) -> None:
+        """Add a cursor on the line below the bottommost cursor"""
+        self._add_cursor_vertically(QTextCursor.MoveOperation.Down)
+
+    def keyPressEvent(self, e: QKeyEvent) -> None:
+        # Blocks typed are newlines, while undo and redo restore soft breaks as they were
+        self.long_line_index.is_user_edit = not (
+            e.matches(QKeySequence.StandardKey.Undo) or e.matches(QKeySequence.StandardKey.Redo)
+        )
+        try:
+            self._handle_key_press(e)
+        finally:
+            self.long_line_index.is_user_edit = False
+
+    def dragEnterEvent(self, e: QDragEnterEvent) -> None:
+        # Dropped files are left to the main window, which opens them, rather than inserted as text
+        if any(url.isLocalFile() for url in e.mimeData().urls()):
+            e.ignore()
+            return
+        super().dragEnterEvent(e)
+
+    def insertFromMimeData(self, source: QMimeData) -> None:
+        self.long_line_index.is_user_edit = True
+        try:
+            super().insertFromMimeData(source)
+        finally:
+            self.long_line_index.is_user_edit = False
+
+    def _handle_key_press(self, e: QKeyEvent) -> None:
+        if not self.extra_cursors or self.isReadOnly():
+            super().keyPressEvent(e)
+            return
+
+        key: int = e.key()
+        text: str = e.text()
+        modifiers: Qt.KeyboardModifier = e.modifiers()
+        if key == Qt.Key.Key_Escape:
+            self.clear_extra_cursors()
+        elif key in _CURSOR_MOVES:
+            operation: QTextCursor.MoveOperation = _CURSOR_MOVES[key]
+            if modifiers & Qt.KeyboardModifier.ControlModifier and key in _WORD_MOVES:
+                operation = _WORD_MOVES[key]
+            mode: QTextCursor.MoveMode = (
+                QTextCursor.MoveMode.KeepAnchor
+                if modifiers & Qt.KeyboardModifier.ShiftModifier
+                else QTextCursor.MoveMode.MoveAnchor
+            )
+            self.apply_to_cursors(lambda cursor: cursor.movePosition(operation, mode), edit=False)
+        elif key == Qt.Key.Key_Backspace:
+            self.apply_to_cursors(QTextCursor.deletePreviousChar)
+        elif key == Qt.Key.Key_Delete:
+            self.apply_to_cursors(QTextCursor.deleteChar)
+        else:
+            if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+                text = '\n'
+            elif e.matches(QKeySequence.StandardKey.Paste):
+                text = QApplication.clipboard().text()
+            elif not (text.isprintable() or text == '\t') or modifiers & (
+                Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.AltModifier
+            ):
+                text = ''
+            if text:
+                # Words typed are undone together, as without extra cursors
+                self.apply_to_cursors(lambda cursor: cursor.insertText(text), coalesce=len(text) == 1 and text != '\n')
+            else:
+                super().keyPressEvent(e)
+
+    def mousePressEvent(self, e: QMouseEvent) -> None:
+        if e.button() == Qt.MouseButton.LeftButton and e.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self._set_cursors([self.cursorForPosition(e.position().toPoint()), self.textCursor(), *self.extra_cursors])
+            return
+        self.clear_extra_cursors()
+        super().mousePressEvent(e)
+
+    def paintEvent(self, e: QPaintEvent) -> None:
+        super().paintEvent(e)
+        if not self.extra_cursors:
+            return
+
+        # Carets of the extra cursors, only those on visible blocks are looked up
+        first_position: int = self.firstVisibleBlock().position()
+        last_block: QTextBlock = self.cursorForPosition(QPoint(0, self.viewport().height())).block()
+        last_position: int = last_block.position() + last_block.length()
+        painter: QPainter = QPainter(self.viewport())
+        for cursor in self.extra_cursors:
+            if first_position <= cursor.position() <= last_position:
+                rect: QRect = self.cursorRect(cursor)
+                painter.fillRect(rect.x(), rect.y(), max(self.cursorWidth(), 1), rect.height(), self.palette().text())
+        painter.end()
+
     @Slot()
     def highlight_current_line(self) -> None:
         """Signal slot to implement line highlighting"""
@@ -124,4 +531,14 @@ class PlainTextEditor(QPlainTextEdit):
 
             extra_selections.append(selection)
 
+        for cursor in self.extra_cursors:
+            if cursor.hasSelection():
+                selection = QTextEdit.ExtraSelection()
+                selection.format.setBackground(self.palette().highlight())  # type: ignore
+                selection.format.setForeground(self.palette().highlightedText())  # type: ignore
+                selection.cursor = cursor  # type: ignore
+                extra_selections.append(selection)
+
+        extra_selections += self._bracket_selections()
+
         self.setExtraSelections(extra_selections)
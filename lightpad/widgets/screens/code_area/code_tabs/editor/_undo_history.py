@@ -0,0 +1,193 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QTextCursor, QTextDocument
+from PySide6.QtWidgets import QPlainTextEdit
+
+from lightpad.utils.commons import DebugType, debug
+from lightpad.utils.memory import format_size
+
+# An edit as position, number of characters removed and text inserted there
+Edit = Tuple[int, int, str]
+
+
+class UndoHistory:
+    """Estimates the size of the undo history of an editor and keeps it under a budget, dropping its oldest steps.
+
+    Qt can only clear the whole undo history of a document. Dropping its oldest steps instead undoes the steps
+    which are kept, redoes them to record their edits, undoes them again, clears the history and applies the
+    recorded edits again, one undo step each. The redo steps are given up then.
+    """
+
+    # Estimated bytes an undo step uses besides the text it changed
+    STEP_SIZE: int = 128
+
+    def __init__(self, editor: QPlainTextEdit, budget: int) -> None:
+        self.editor: QPlainTextEdit = editor
+        self.document: QTextDocument = editor.document()
+        self.budget: int = budget
+        # Set while trim changes the document, which is not an edit
+        self.is_trimming: bool = False
+
+        # Each undo step, oldest first and followed by the redo steps, as the number of commands on the undo stack
+        # once it is done and its estimated bytes. Qt counts commands rather than steps, an edit block being one
+        # step made of several commands.
+        self._ends: List[int] = []
+        self._sizes: List[int] = []
+        self._undo_steps: int = 0
+        self._redo_steps: int = 0
+        self._is_step_added: bool = False
+        # Edits recorded by trim while redoing the steps it keeps
+        self._edits: Optional[List[Edit]] = None
+        self._is_trim_pending: bool = False
+
+        self.document.contentsChange.connect(self._on_contents_change)  # type: ignore
+        self.document.undoCommandAdded.connect(self._on_undo_command_added)  # type: ignore
+
+    @property
+    def size(self) -> int:
+        """Estimated bytes of the undo and redo steps."""
+        return sum(self._sizes)
+
+    def reset(self) -> None:
+        """Forget the steps, after the history was cleared or disabled."""
+        self._ends = []
+        self._sizes = []
+        self._undo_steps = self.document.availableUndoSteps()
+        self._redo_steps = self.document.availableRedoSteps()
+        self._is_step_added = False
+
+    def _on_undo_command_added(self) -> None:
+        # Notified before the change which added it, also when the command joined the previous edit block
+        self._is_step_added = True
+
+    def _on_contents_change(self, position: int, removed: int, added: int) -> None:
+        if self._edits is not None:
+            self._edits.append((position, removed, self._text(position, added)))
+            return
+        if not self.document.isUndoRedoEnabled():
+            return
+
+        undo_steps: int = self.document.availableUndoSteps()
+        redo_steps: int = self.document.availableRedoSteps()
+        # Undo and redo change the number of redo steps, edits leave none
+        if self._is_step_added or redo_steps == self._redo_steps:
+            while self._ends and self._ends[-1] > self._undo_steps:
+                self._ends.pop()
+                self._sizes.pop()
+            size: int = 2 * (removed + added)
+            if self._is_step_added or not self._ends:
+                self._ends.append(undo_steps)
+                self._sizes.append(self.STEP_SIZE + size)
+            else:
+                # Typing merged into the last step
+                self._ends[-1] = undo_steps
+                self._sizes[-1] += size
+        self._undo_steps = undo_steps
+        self._redo_steps = redo_steps
+        self._is_step_added = False
+
+        if self.size > self.budget and not self._is_trim_pending:
+            debug('Undo history exceeds %s' % (format_size(self.budget)), debug_type=DebugType.WARNING)
+            # Not while the document notifies a change
+            self._is_trim_pending = True
+            QTimer.singleShot(0, lambda: self.trim(self.budget // 2))
+
+    def _text(self, position: int, length: int) -> str:
+        cursor: QTextCursor = QTextCursor(self.document)
+        cursor.setPosition(position)
+        cursor.setPosition(min(position + length, self.document.characterCount() - 1), QTextCursor.MoveMode.KeepAnchor)
+        return cursor.selectedText().replace('\u2029', '\n')
+
+    def trim(self, size: int) -> None:
+        """Drop the oldest undo steps and the redo steps until the history is estimated at most size bytes.
+
+        Parameters
+        ----------
+        size: int
+            Bytes the history may keep.
+
+        Returns
+        -------
+        None
+        """
+        self._is_trim_pending = False
+        if not self.document.isUndoRedoEnabled() or self.size <= size:
+            return
+
+        # Keep the newest undo steps which fit, the steps are undone down to the end of the last one dropped
+        undo_steps: int = bisect_right(self._ends, self.document.availableUndoSteps())
+        first: int = undo_steps
+        total: int = 0
+        while first > 0 and total + self._sizes[first - 1] <= size:
+            first -= 1
+            total += self._sizes[first]
+        base: int = self._ends[first - 1] if first > 0 else 0
+        debug(
+            'Dropping %d of %d undo steps and %d redo steps, about %s'
+            % (first, undo_steps, len(self._ends) - undo_steps, format_size(self.size - total))
+        )
+
+        cursor: QTextCursor = self.editor.textCursor()
+        anchor, position = cursor.anchor(), cursor.position()
+        scroll: Tuple[int, int] = (self.editor.horizontalScrollBar().value(), self.editor.verticalScrollBar().value())
+        is_modified: bool = self.document.isModified()
+
+        self.is_trimming = True
+        undone: int = 0
+        while self.document.availableUndoSteps() > base and self.document.isUndoAvailable():
+            self.document.undo()
+            undone += 1
+        steps: List[List[Edit]] = []
+        for _ in range(undone):
+            self._edits = []
+            self.document.redo()
+            steps.append(self._edits)
+        self._edits = None
+        for _ in range(undone):
+            self.document.undo()
+        self.document.clearUndoRedoStacks()
+        self.reset()
+
+        # One undo step each, their sizes are tracked as for any edit
+        cursor = QTextCursor(self.document)
+        for edits in steps:
+            cursor.beginEditBlock()
+            for edit_position, removed, text in edits:
+                last_position: int = self.document.characterCount() - 1
+                cursor.setPosition(min(edit_position, last_position))
+                cursor.setPosition(min(edit_position + removed, last_position), QTextCursor.MoveMode.KeepAnchor)
+                cursor.insertText(text)
+            cursor.endEditBlock()
+        self.is_trimming = False
+
+        cursor.setPosition(anchor)
+        cursor.setPosition(position, QTextCursor.MoveMode.KeepAnchor)
+        self.editor.setTextCursor(cursor)
+        self.editor.horizontalScrollBar().setValue(scroll[0])
+        self.editor.verticalScrollBar().setValue(scroll[1])
+        self.document.setModified(is_modified)
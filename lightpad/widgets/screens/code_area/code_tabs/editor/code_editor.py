@@ -21,20 +21,67 @@
 #  SOFTWARE.
 #
 
+import codecs
+import io
+import mmap
 import os
+import re
 import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
 
-from PySide6.QtCore import QTimer
-from PySide6.QtGui import QFont, QFontDatabase
+from PySide6.QtCore import QRect, QStringListModel, Qt, QTimer, Signal, Slot
+from PySide6.QtGui import QFont, QFontDatabase, QKeyEvent, QKeySequence, QShortcut, QTextBlock, QTextCursor
+from PySide6.QtWidgets import QCompleter, QInputDialog
 
 from lightpad import base_dir
-from lightpad.utils.commons import debug, raise_exception
+from lightpad.utils.commons import DebugType, debug, raise_exception
+from lightpad.utils.compressed_file import (
+    DecompressingReader,
+    compression_for_path,
+    is_compression_available,
+    open_compressed,
+)
+from lightpad.utils.encoding import newline_decoder, pending_size
+from lightpad.utils.file_state import FileStat, is_appended, read_file_state, stat_file
+from lightpad.utils.journal import EditJournal, Record
+from lightpad.utils.line_diff import LineRange, diff_lines
+from lightpad.utils.memory import undo_budget
+from lightpad.utils.newline_index import NewlineIndex, is_newline_indexable
+from lightpad.utils.text_file import TextFile, read_text_file, submit_read
+from lightpad.utils.word_index import buffer_word_index
+from lightpad.widgets.screens.code_area.code_tabs.editor._buffer_words import MIN_WORD_LENGTH, BufferWords
+from lightpad.widgets.screens.code_area.code_tabs.editor._file_follower import FileFollower
+from lightpad.widgets.screens.code_area.code_tabs.editor._long_line_index import soft_break_segments
 from lightpad.widgets.screens.code_area.code_tabs.editor._plain_text_editor import PlainTextEditor
+from lightpad.widgets.screens.code_area.code_tabs.editor._undo_history import UndoHistory
 
 
 class CodeEditor(PlainTextEditor):
     """Code Editor widget"""
 
+    CHUNK_SIZE: int = 10_000
+
+    # Lines loaded first around a line asked for before the file was loaded up to it
+    REGION_LINES: int = 2_000
+
+    # Follow mode keeps the last FOLLOW_MAX_BLOCKS lines
+    FOLLOW_MAX_BLOCKS: int = 100_000
+
+    # Maximum number of words offered by completion
+    COMPLETION_LIMIT: int = 20
+
+    # Estimated bytes a document uses per block besides its text
+    BLOCK_SIZE: int = 128
+
+    loading_finished_signal: Signal = Signal()
+    loading_progress_signal: Signal = Signal(str, int)  # file path, percent
+    opened_signal: Signal = Signal(bool)  # whether a file read by open_file_later could be opened
+    follow_mode_signal: Signal = Signal(bool)  # whether the file is followed, emitted by set_follow_mode
+    read_only_signal: Signal = Signal(bool)  # whether the editor is read only, emitted when it changes
+    _read_signal: Signal = Signal(object)  # future of the read
+    _words_signal: Signal = Signal(object)  # future of the words found by BufferWords.build
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -42,7 +89,45 @@ class CodeEditor(PlainTextEditor):
         self.content_view: memoryview = memoryview(b'')
         self.content_index: int = 0
 
+        # On disk format, used to decode the file and to write it back unchanged
+        self.encoding: str = 'utf-8'
+        self.bom: bytes = b''
+        self.newline: str = os.linesep
+        self._decoder: io.IncrementalNewlineDecoder = newline_decoder(self.encoding)
+        # Set once a line ending of the file being loaded was decoded
+        self._is_newline_seen: bool = False
+
+        # Set when open_file found the file is not text
+        self.is_binary: bool = False
+
+        # Compressed files are decompressed while loading and compressed again when saved
+        self.compression: Optional[str] = None
+        self._decompressing_reader: Optional[DecompressingReader] = None
+
+        # State of the file on disk when it was last loaded or saved, used to detect external changes
+        self._disk_stat: Optional[FileStat] = None
+        self._disk_tail: bytes = b''
+
+        # Follow mode, appends what other processes write to the end of the file
+        self._file_follower: FileFollower = FileFollower()
+        self._file_follower.read_signal.connect(self._append_followed)  # type: ignore
+        self._follow_pending: bool = False
+        self._is_partial: bool = False
+
         self.start_time: float = 0.0
+        # Read of the file in the read pool, see open_file_later
+        self._pending_read: Optional[Future] = None
+
+        # Crash recovery journal of unsaved edits, see lightpad.utils.journal
+        self._journal: Optional[EditJournal] = None
+        self._pending_journal_records: List[Record] = []
+        # Line, starting at 1, and column to move to once the file is loaded
+        self._pending_line: Optional[Tuple[int, int]] = None
+        # Newline index of content_view, built when a line which is not loaded yet is asked for
+        self._newline_index: Optional[NewlineIndex] = None
+        # Bytes of content_view missing from the document before the region loaded first, see _load_region
+        self._gap_range: Tuple[int, int] = (0, 0)
+        self._inserting_content: bool = False
 
         font_id: int = QFontDatabase.addApplicationFont(
             os.path.join(
@@ -61,43 +146,870 @@ class CodeEditor(PlainTextEditor):
         self.content_update_timer: QTimer = QTimer()
         self.content_update_timer.timeout.connect(self.update_content)  # type: ignore
 
-    def update_content(self) -> None:
-        content = self.content_view[self.content_index : self.content_index + 10_000].tobytes().decode('utf-8')
-        if content:
-            self.appendPlainText(content)
-            self.content_index += 10_000
+        self.document().contentsChange.connect(self._on_contents_change)  # type: ignore
+        self.undo_history: UndoHistory = UndoHistory(self, undo_budget())
+        self._read_signal.connect(self._handle_read)  # type: ignore
+        self._words_signal.connect(self._handle_words)  # type: ignore
+
+        # Word completion from the words of all opened documents
+        self.buffer_words: BufferWords = BufferWords(self.document(), buffer_word_index)
+        self._completion_model: QStringListModel = QStringListModel(self)
+        self._completer: QCompleter = QCompleter(self._completion_model, self)
+        self._completer.setWidget(self)
+        self._completer.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+        self._completer.setModelSorting(QCompleter.ModelSorting.UnsortedModel)
+        self._completer.setCaseSensitivity(Qt.CaseSensitivity.CaseSensitive)
+        self._completer.activated[str].connect(self.insert_completion)  # type: ignore
+
+        self._complete_shortcut: QShortcut = QShortcut(QKeySequence('Ctrl+Space'), self)
+        self._complete_shortcut.setContext(Qt.ShortcutContext.WidgetShortcut)
+        self._complete_shortcut.activated.connect(self.show_completions)  # type: ignore
+
+        self._go_to_line_shortcut: QShortcut = QShortcut(QKeySequence('Ctrl+G'), self)
+        self._go_to_line_shortcut.setContext(Qt.ShortcutContext.WidgetShortcut)
+        self._go_to_line_shortcut.activated.connect(self.show_go_to_line_dialog)  # type: ignore
+
+        self._go_to_offset_shortcut: QShortcut = QShortcut(QKeySequence('Ctrl+Shift+G'), self)
+        self._go_to_offset_shortcut.setContext(Qt.ShortcutContext.WidgetShortcut)
+        self._go_to_offset_shortcut.activated.connect(self.show_go_to_offset_dialog)  # type: ignore
+
+    def setReadOnly(self, ro: bool) -> None:
+        # Read only while loading and following, views of the document follow along
+        changed: bool = ro != self.isReadOnly()
+        super().setReadOnly(ro)
+        if changed:
+            self.read_only_signal.emit(ro)
+
+    def keyPressEvent(self, e: QKeyEvent) -> None:
+        if self._completer.popup().isVisible() and e.key() in (
+            Qt.Key.Key_Enter,
+            Qt.Key.Key_Return,
+            Qt.Key.Key_Tab,
+            Qt.Key.Key_Backtab,
+            Qt.Key.Key_Escape,
+        ):
+            # Handled by the completer popup
+            e.ignore()
+            return
+        super().keyPressEvent(e)
+
+        text: str = e.text()
+        if self._completer.popup().isVisible() or (text and (text[-1].isalnum() or text[-1] == '_')):
+            self.show_completions(automatic=True)
+
+    def _word_before_cursor(self) -> str:
+        cursor: QTextCursor = self.textCursor()
+        match: Optional[re.Match] = re.search(r'\w+$', cursor.block().text()[: cursor.positionInBlock()])
+        return match.group() if match else ''
+
+    @Slot()
+    def show_completions(self, automatic: bool = False) -> None:
+        """Show the words starting with the word before the cursor.
+
+        Parameters
+        ----------
+        automatic: bool
+            Shown while typing, only once the word is long enough. (default is False)
+
+        Returns
+        -------
+        None
+        """
+        prefix: str = self._word_before_cursor()
+        words: List[str] = []
+        if not self.isReadOnly() and not self.extra_cursors and len(prefix) >= (MIN_WORD_LENGTH if automatic else 1):
+            words = buffer_word_index.complete(prefix, self.COMPLETION_LIMIT)
+        if not words:
+            self._completer.popup().hide()
+            return
+
+        self._completion_model.setStringList(words)
+        self._completer.setCompletionPrefix(prefix)
+        self._completer.popup().setCurrentIndex(self._completion_model.index(0))
+        rect: QRect = self.cursorRect()
+        rect.setWidth(
+            self._completer.popup().sizeHintForColumn(0)
+            + self._completer.popup().verticalScrollBar().sizeHint().width()
+        )
+        self._completer.complete(rect)
+
+    @Slot(str)
+    def insert_completion(self, word: str) -> None:
+        """Complete the word before the cursor."""
+        cursor: QTextCursor = self.textCursor()
+        cursor.insertText(word[len(self._completer.completionPrefix()) :])
+        self.setTextCursor(cursor)
+
+    def _on_contents_change(self, position: int, removed: int, added: int) -> None:
+        """Record user edits in the journal."""
+        if self._inserting_content:
+            return
+        # Edited while loading, the words of the loaded chunks are not those of the document
+        self.buffer_words.skip_chunks()
+        if self._journal is None or self.undo_history.is_trimming:
+            return
+        cursor: QTextCursor = QTextCursor(self.document())
+        cursor.setPosition(position)
+        cursor.setPosition(min(position + added, self.document().characterCount() - 1), QTextCursor.MoveMode.KeepAnchor)
+        self._journal.record(position, removed, cursor.selectedText().replace('\u2029', '\n'))
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Estimate the memory used by the document and what is kept along with it.
+
+        Returns
+        -------
+        usage: Dict[str, int]
+            Bytes used by the document, its undo history, its indexes and the file being loaded.
+        """
+        return {
+            'document': 2 * self.document().characterCount() + self.BLOCK_SIZE * self.blockCount(),
+            'undo': self.undo_history.size,
+            'indexes': sum(
+                index.memory_usage()
+                for index in (
+                    self.fold_index,
+                    self.bracket_index,
+                    self.diff_index,
+                    self.long_line_index,
+                    self.buffer_words,
+                )
+            ),
+            'buffer': len(self.content_view),
+        }
+
+    def replay_journal(self, records: List[Record]) -> None:
+        """Apply recovered edits to the document, once it has been loaded.
+
+        Parameters
+        ----------
+        records: List[Record]
+            Edits read from a journal.
+
+        Returns
+        -------
+        None
+        """
+        if self.is_loading():
+            self._pending_journal_records = records
+            return
+
+        last_position: int = self.document().characterCount() - 1
+        cursor: QTextCursor = QTextCursor(self.document())
+        self.long_line_index.is_user_edit = True
+        cursor.beginEditBlock()
+        for position, removed, text in records:
+            cursor.setPosition(min(position, last_position))
+            cursor.setPosition(min(position + removed, last_position), QTextCursor.MoveMode.KeepAnchor)
+            cursor.insertText(text)
+            last_position = self.document().characterCount() - 1
+        cursor.endEditBlock()
+        self.long_line_index.is_user_edit = False
+
+    def go_to_line(self, line: int, column: int = 0) -> None:
+        """Move the cursor to a line, loading the part of the file around it first if it is not loaded yet.
+
+        Parameters
+        ----------
+        line: int
+            Line number, starting at 1.
+        column: int
+            Characters before the cursor in the line. (default is 0)
+
+        Returns
+        -------
+        None
+        """
+        line = max(0, line - 1)
+        if self.is_loading() and not self._is_line_loaded(line) and not self._load_region(line):
+            # Lines are loaded in order, the cursor is moved once all are
+            self._pending_line = (line + 1, column)
+            return
+
+        self._pending_line = None
+        block: QTextBlock = self.document().findBlockByNumber(
+            min(self.long_line_index.block_number(line), self.blockCount() - 1)
+        )
+        # Columns past the first block of a long line are in the blocks split off it
+        while column > block.length() - 1 and self.long_line_index.is_soft_block(block.blockNumber() + 1):
+            column -= block.length() - 1
+            block = block.next()
+        cursor: QTextCursor = QTextCursor(block)
+        cursor.setPosition(block.position() + min(column, block.length() - 1))
+        self.setTextCursor(cursor)
+        self.centerCursor()
+
+    def go_to_offset(self, offset: int) -> None:
+        """Move the cursor to the character at a byte offset of the file as saved.
+
+        Parameters
+        ----------
+        offset: int
+            Offset in the file, a byte order mark included.
+
+        Returns
+        -------
+        None
+        """
+        if self.compression is not None or not self._is_newline_indexable():
+            raise_exception(
+                'Byte offsets cannot be found in %s files!' % (self.compression or self.encoding), terminate=False
+            )
+            return
+        if self._pending_read is not None:
+            return
+
+        if self.is_loading() and self._decompressing_reader is None:
+            self.go_to_line(*self._location_of_offset(self._content_newline_index(), offset))
+            return
+        try:
+            with open(self.file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    self.go_to_line(1)
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    self.go_to_line(*self._location_of_offset(NewlineIndex(buffer, len(self.bom)), offset))
+        except OSError as e:
+            raise_exception('Could not read %s!' % (self.file_path), terminate=False)
+            debug('Could not read %s: %s' % (self.file_path, e), debug_type=DebugType.WARNING)
+
+    def _location_of_offset(self, newline_index: NewlineIndex, offset: int) -> Tuple[int, int]:
+        """Line, starting at 1, and column of the character at a byte offset, a character it is within included."""
+        offset = min(max(offset, newline_index.start), newline_index.size)
+        line: int = newline_index.line_of(offset)
+        line_start: int = newline_index.line_start(line)  # type: ignore
+        return line + 1, len(codecs.decode(newline_index.buffer[line_start:offset], self.encoding, errors='ignore'))
+
+    @Slot()
+    def show_go_to_line_dialog(self) -> None:
+        """Ask for a line and go to it"""
+        line, ok = QInputDialog.getInt(
+            self, 'Go to Line', 'Line:', self.long_line_index.line_number(self.textCursor().blockNumber()) + 1, 1
+        )
+        if ok:
+            self.go_to_line(line)
+
+    @Slot()
+    def show_go_to_offset_dialog(self) -> None:
+        """Ask for a byte offset of the file and go to it"""
+        text, ok = QInputDialog.getText(self, 'Go to Byte Offset', 'Offset (decimal, or hexadecimal with 0x):')
+        if not ok or not text.strip():
+            return
+        try:
+            self.go_to_offset(int(text.strip(), 0))
+        except ValueError:
+            raise_exception('Invalid offset!', terminate=False)
+
+    def _is_newline_indexable(self) -> bool:
+        return self.newline in ('\n', '\r\n') and is_newline_indexable(self.encoding)
+
+    def _content_newline_index(self) -> NewlineIndex:
+        if self._newline_index is None:
+            self._newline_index = NewlineIndex(self.content_view.obj, len(self.bom))  # type: ignore
+        return self._newline_index
+
+    def _is_line_loaded(self, line: int) -> bool:
+        """Check if a line, starting at 0, is in the document while it is loaded."""
+        gap_line: Optional[int] = self.long_line_index.gap_line()
+        if gap_line is not None and gap_line <= line < gap_line + self.long_line_index.gap_lines:
+            return False
+        # The last block may hold only the start of a line
+        return line < self.long_line_index.line_number(self.blockCount() - 1)
+
+    def _load_region(self, line: int) -> bool:
+        """Load the lines around a line, starting at 0, which is not loaded yet, before those preceding them.
+
+        The line being loaded is finished first, so that the document ends with a whole line. The region is
+        then appended, and the lines between them, if any, are missing from the document until update_content
+        has inserted them before the region. The lines after the region are appended as usual meanwhile.
+
+        Returns
+        -------
+        status: bool
+            False if the file can only be loaded in order.
+        """
+        if (
+            self._pending_read is not None
+            or self._decompressing_reader is not None
+            or self.long_line_index.gap_cursor is not None
+            or not self._is_newline_indexable()
+        ):
+            return False
+
+        data: bytes = self.content_view.obj  # type: ignore
+        newline_index: NewlineIndex = self._content_newline_index()
+        line = min(line, newline_index.line_count - 1)
+        try:
+            if self.content_index > len(self.bom) and data[self.content_index - 1] != ord('\n'):
+                end: int = newline_index.line_end(self.content_index)
+                content: str = self._decoder.decode(data[self.content_index : end], final=end >= len(data))
+                self.content_index = end
+                self._inserting_content = True
+                self._append_content(content)
+                self._inserting_content = False
+
+            region_start: int = max(
+                self.content_index, newline_index.line_start(max(0, line - self.REGION_LINES // 2))  # type: ignore
+            )
+            region_end: int = newline_index.line_start(line + self.REGION_LINES // 2) or len(data)
+            if region_start >= region_end:
+                return False
+            content = codecs.decode(data[region_start:region_end], self.encoding)
+        except UnicodeDecodeError:
+            self._fall_back_to_latin1()
+            return False
+
+        debug('Loading lines around line %d of %s first' % (line + 1, self.file_path))
+        # Lines are not loaded in order anymore
+        self.buffer_words.skip_chunks()
+        gap_position: int = self.document().characterCount() - 1
+        self._inserting_content = True
+        self._append_content(content)
+        self._inserting_content = False
+        if region_start > self.content_index:
+            gap_cursor: QTextCursor = QTextCursor(self.document())
+            gap_cursor.setPosition(gap_position)
+            self.long_line_index.set_gap(
+                gap_cursor, newline_index.line_of(region_start) - newline_index.line_of(self.content_index)
+            )
+            self._gap_range = (self.content_index, region_start)
+        self.content_index = region_end
+        self._decoder = newline_decoder(self.encoding)
+        self.loading_progress_signal.emit(self.file_path, self._loading_progress())
+        return True
+
+    def _fill_gap(self) -> None:
+        """Insert the next chunk of the lines missing before the region loaded first, keeping the view in place."""
+        data: bytes = self.content_view.obj  # type: ignore
+        start, end = self._gap_range
+        stop: int = self._content_newline_index().line_end(min(start + self.CHUNK_SIZE, end) - 1, end)
+        content: str = codecs.decode(data[start:stop], self.encoding)
+
+        gap_cursor: QTextCursor = self.long_line_index.gap_cursor  # type: ignore
+        is_view_after_gap: bool = self.firstVisibleBlock().blockNumber() >= gap_cursor.blockNumber()
+        block_count: int = self.blockCount()
+        self._inserting_content = True
+        self.long_line_index.insert(gap_cursor, content)
+        self._inserting_content = False
+        if stop < end:
+            self.long_line_index.set_gap(gap_cursor, self.long_line_index.gap_lines - content.count('\n'))
+        else:
+            self.long_line_index.set_gap(None)
+        self._gap_range = (stop, end)
+        if is_view_after_gap:
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() + self.blockCount() - block_count)
+
+    def close_journal(self) -> None:
+        """Delete the journal, unsaved edits are given up."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _decode_next_chunk(self) -> str:
+        """Decode the next chunk of the file being loaded."""
+        if self._decompressing_reader is not None:
+            data: bytes = self._decompressing_reader.read()
+            self.content_index += len(data)
+            content: str = self._decoder.decode(data, final=self._decompressing_reader.finished)
+        else:
+            chunk: bytes = self.content_view[self.content_index : self.content_index + self.CHUNK_SIZE].tobytes()
+            self.content_index += len(chunk)
+            content = self._decoder.decode(chunk, final=self.content_index >= len(self.content_view))
+
+        if not self._is_newline_seen and self._decoder.newlines is not None:
+            # The samples the newline style was detected from may have held no line ending, or a cut one
+            self._is_newline_seen = True
+            if isinstance(self._decoder.newlines, str):
+                self.newline = self._decoder.newlines
+        return content
+
+    def _is_all_read(self) -> bool:
+        """Check if all of the file being loaded was decoded."""
+        if self._decompressing_reader is not None:
+            return self._decompressing_reader.finished
+        return self.content_index >= len(self.content_view)
+
+    def _loading_progress(self) -> int:
+        """Percentage of the file being loaded read so far, of the compressed file if it is compressed."""
+        if self._decompressing_reader is not None:
+            return int(100 * self._decompressing_reader.progress())
+        missing: int = self._gap_range[1] - self._gap_range[0] if self.long_line_index.gap_cursor is not None else 0
+        return int(100 * (self.content_index - missing) / len(self.content_view)) if self.content_view else 100
+
+    def _stop_decompressing(self) -> None:
+        if self._decompressing_reader is not None:
+            self._decompressing_reader.stop()
+            self._decompressing_reader = None
+
+    def _start_loading(self) -> None:
+        """(Re)start streaming content_view, or the decompressed file, into the document."""
+        self.content_update_timer.stop()
+        self.content_index = len(self.bom)
+        self._decoder = newline_decoder(self.encoding)
+        self._is_newline_seen = False
+        self._stop_decompressing()
+        self.long_line_index.set_gap(None)
+        self._newline_index = None
+        self.diff_index.clear_saved()
+        if self.compression is not None:
+            self._decompressing_reader = DecompressingReader(
+                self.file_path, self.compression, self.CHUNK_SIZE, skip=len(self.bom)
+            )
+
+        try:
+            content: str = self._decode_next_chunk()
+        except UnicodeDecodeError:
+            self._fall_back_to_latin1()
+            return
+
+        # Loading is not an edit, keep it out of the undo history and the journal
+        self.document().setUndoRedoEnabled(False)
+        # Words are found from the chunks while loading, see _index_words
+        self.buffer_words.start_loading()
+        self._inserting_content = True
+        self.setPlainText('')
+        self.long_line_index.set_enabled(False)
+        self._append_content(content)
+        self._inserting_content = False
+        self.buffer_words.add_chunk(content)
+        if not self._is_all_read():
+            self.content_update_timer.start(100)
         else:
-            self.content_update_timer.stop()
-            debug(f'Took: %.2f seconds to read %s' % (time.monotonic() - self.start_time, self.file_path))
+            self._finish_loading()
+
+    def _fall_back_to_latin1(self) -> None:
+        """Restart loading as latin-1, which can decode any byte sequence."""
+        # The sampled parts of the file looked like UTF-8, but the rest is not
+        debug(
+            'Invalid %s data in %s, reloading as latin-1' % (self.encoding, self.file_path),
+            debug_type=DebugType.WARNING,
+        )
+        self.encoding = 'latin-1'
+        self._start_loading()
+
+    def _finish_loading(self) -> None:
+        self.content_update_timer.stop()
+        if self._decompressing_reader is not None:
+            if self._decompressing_reader.error is not None:
+                # Keep what could be decompressed, but do not overwrite the file with it
+                self._is_partial = True
+                raise_exception('File is corrupt, only a part of it could be decompressed!', terminate=False)
+                debug(
+                    'Could not decompress %s: %s' % (self.file_path, self._decompressing_reader.error),
+                    debug_type=DebugType.WARNING,
+                )
+            self._decompressing_reader = None
+        # The document holds the text now
+        self.content_view = memoryview(b'')
+        self._newline_index = None
+        self.loading_progress_signal.emit(self.file_path, 100)
+        self.document().setUndoRedoEnabled(True)
+        self.undo_history.reset()
+        self.document().setModified(False)
+        self.diff_index.set_saved()
+        self._index_words()
+        debug(f'Took: %.2f seconds to read %s' % (time.monotonic() - self.start_time, self.file_path))
+        self.loading_finished_signal.emit()
+
+        if self._follow_pending:
+            self._follow_pending = False
+            self.set_follow_mode(True)
+
+        if self._pending_journal_records:
+            records, self._pending_journal_records = self._pending_journal_records, []
+            self.replay_journal(records)
 
-    def open_file(self, file_path: str) -> bool:
+        if self._pending_line is not None:
+            (line, column), self._pending_line = self._pending_line, None
+            self.go_to_line(line, column)
+
+    def update_content(self) -> None:
+        """Append the next chunk of the file being loaded to the document, and fill in lines missing before it."""
+        try:
+            if self.long_line_index.gap_cursor is not None:
+                self._fill_gap()
+            elif self._is_all_read():
+                self._finish_loading()
+                return
+
+            if not self._is_all_read():
+                content: str = self._decode_next_chunk()
+                if content:
+                    self._inserting_content = True
+                    self._append_content(content)
+                    self._inserting_content = False
+                    self.buffer_words.add_chunk(content)
+        except UnicodeDecodeError:
+            self._fall_back_to_latin1()
+            return
+        self.loading_progress_signal.emit(self.file_path, self._loading_progress())
+
+    def _index_words(self) -> None:
+        """Find the words of the document for completion in the word pool."""
+        # Called on the thread of the pool, the signal hands the words to the GUI thread
+        self.buffer_words.build().add_done_callback(self._words_signal.emit)
+
+    @Slot(object)
+    def _handle_words(self, build: Future) -> None:
+        if not self.buffer_words.finish_build(build):
+            # Edited meanwhile
+            self._index_words()
+
+    def _append_content(self, content: str) -> None:
+        """Append text read from the file to the document, long lines are split into blocks."""
+        cursor: QTextCursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        self.long_line_index.insert(cursor, content)
+
+    def file_text(self) -> str:
+        """Text of the document as it is saved, with lines split into blocks joined again."""
+        return self.long_line_index.join_soft_breaks(self.toPlainText())
+
+    def open_file(self, file_path: str, read: Optional[Future] = None) -> bool:
         """Open file for editing.
 
         Parameters
         ----------
         file_path: str
             The path to file to be opened.
+        read: Optional[Future]
+            Read of the file by read_text_file, the file is read here if None. (default is None)
 
         Returns
         -------
         status: bool
             True if file was successfully opened, else False.
         """
-        self.start_time = time.monotonic()
+        if read is None:
+            self.start_time = time.monotonic()
         try:
-            content: str = ''
+            text_file: TextFile = read.result() if read is not None else read_text_file(file_path)
+            if text_file.exists:
+                if text_file.compression is not None and not is_compression_available(text_file.compression):
+                    raise_exception('Install zstandard to open %s files!' % (text_file.compression), terminate=False)
+                    debug('Not opening %s compressed file: %s' % (text_file.compression, file_path))
+                    return False
 
-            if os.path.isfile(file_path):
-                with open(file_path, 'rb') as f:
-                    self.content_view = memoryview(f.read())
-                    content = self.content_view[:10_000].tobytes().decode('utf-8')
-                    self.content_index += 10_000
-                    self.content_update_timer.start(100)
+                if text_file.text_format is None:
+                    debug('Not opening binary file as text: %s' % (file_path))
+                    self.is_binary = True
+                    return False
+                self.compression = text_file.compression
+                self.encoding, self.bom, self.newline = text_file.text_format
+                # Compressed files are decompressed as a stream while loading, instead of being read at once
+                self.content_view = memoryview(text_file.content)
 
-            self.setPlainText(content)
             self.file_path = file_path
+            self._disk_stat, self._disk_tail = text_file.stat, text_file.tail
+            self._start_loading()
+            self._journal = EditJournal(file_path)
             return True
         except:
             raise_exception(f'Unsupported file type!', terminate=False)
             debug('Could not open file: %s' % (file_path))
             return False
+
+    def open_file_later(self, file_path: str) -> None:
+        """Read a file in the read pool and open it once read, the editor is read only meanwhile.
+
+        opened_signal is emitted with the status of open_file.
+
+        Parameters
+        ----------
+        file_path: str
+            The path to file to be opened.
+
+        Returns
+        -------
+        None
+        """
+        self.start_time = time.monotonic()
+        self.file_path = file_path
+        self.setReadOnly(True)
+        self.setPlaceholderText('Reading %s...' % (os.path.basename(file_path)))
+        self._pending_read = submit_read(file_path)
+        # Called on a thread of the pool, the signal hands the read to the GUI thread
+        self._pending_read.add_done_callback(self._read_signal.emit)
+
+    @Slot(object)
+    def _handle_read(self, read: Future) -> None:
+        if read is not self._pending_read:
+            return  # Stopped meanwhile
+        self._pending_read = None
+        self.setReadOnly(False)
+        self.setPlaceholderText('')
+        status: bool = self.open_file(self.file_path, read)
+        if status and self._pending_line is not None:
+            # Asked for while the file was read, it can be loaded first now
+            (line, column), self._pending_line = self._pending_line, None
+            self.go_to_line(line, column)
+        self.opened_signal.emit(status)
+
+    def save_file(self, file_path: str) -> bool:
+        """Save the document to a file, using the encoding, BOM and newlines it was opened with.
+
+        Parameters
+        ----------
+        file_path: str
+            The path to save the document to.
+
+        Returns
+        -------
+        status: bool
+            True if file was successfully saved, else False.
+        """
+        if self._pending_read is not None or self.long_line_index.gap_cursor is not None:
+            raise_exception('This file is still being read, it cannot be saved yet!', terminate=False)
+            debug('Not saving file being read: %s' % (file_path))
+            return False
+        if self._is_partial:
+            raise_exception('Only the end of this file is loaded, it cannot be saved!', terminate=False)
+            debug('Not saving partially loaded file: %s' % (file_path))
+            return False
+
+        text: str = self.file_text()
+        if self.newline != '\n':
+            text = text.replace('\n', self.newline)
+        try:
+            data: bytes = text.encode(self.encoding)
+        except UnicodeEncodeError:
+            raise_exception(f'File contains characters that cannot be saved as {self.encoding}!', terminate=False)
+            debug('Could not encode file: %s' % (file_path))
+            return False
+
+        compression: Optional[str] = (
+            self.compression if file_path == self.file_path else compression_for_path(file_path)
+        )
+        if compression is not None and not is_compression_available(compression):
+            raise_exception('Install zstandard to save %s files!' % (compression), terminate=False)
+            debug('Could not compress file: %s' % (file_path))
+            return False
+
+        with open(file_path, 'wb') as f:
+            if compression is None:
+                f.write(self.bom)
+                f.write(data)
+            else:
+                # Compressed as it is written, the compressed file is never held in memory
+                with open_compressed(f, compression, 'wb') as stream:
+                    stream.write(self.bom)
+                    stream.write(data)
+        self.compression = compression
+
+        if self._journal is not None and file_path == self.file_path:
+            self._journal.reset()
+        else:
+            self.close_journal()
+            self._journal = EditJournal(file_path)
+        self.file_path = file_path
+        self._remember_disk_state()
+        self.document().setModified(False)
+        self.diff_index.set_saved()
+        return True
+
+    def stop_loading(self) -> None:
+        """Stop reading the file and streaming it into the document."""
+        if self._pending_read is not None:
+            self._pending_read.cancel()
+            self._pending_read = None
+        self.content_update_timer.stop()
+        self._stop_decompressing()
+        self.long_line_index.set_gap(None)
+
+    def is_loading(self) -> bool:
+        """Check if the file is still being read or streamed into the document."""
+        return self._pending_read is not None or self.content_update_timer.isActive()
+
+    def _remember_disk_state(self, size: Optional[int] = None) -> None:
+        """Remember stat and last bytes of the file on disk, as if it ended at size if given."""
+        self._disk_stat, self._disk_tail = read_file_state(self.file_path, size)
+
+    def changed_on_disk(self) -> bool:
+        """Check if the file was changed by another process since it was loaded or saved."""
+        if self.is_loading() or self.is_following():
+            return False
+        disk_stat: Optional[FileStat] = stat_file(self.file_path)
+        return disk_stat is not None and disk_stat != self._disk_stat
+
+    def ignore_disk_changes(self) -> None:
+        """Accept the current file on disk as the saved state, without reloading it."""
+        self._remember_disk_state()
+
+    def _replace_lines(self, cursor: QTextCursor, first: int, last: int, lines: List[str]) -> None:
+        """Replace blocks first to last (exclusive) by lines."""
+        document = self.document()
+        if last < document.blockCount():
+            cursor.setPosition(document.findBlockByNumber(first).position())
+            cursor.setPosition(document.findBlockByNumber(last).position(), QTextCursor.MoveMode.KeepAnchor)
+            cursor.insertText(''.join(line + '\n' for line in lines))
+        elif first > 0:
+            previous_block = document.findBlockByNumber(first - 1)
+            cursor.setPosition(previous_block.position() + previous_block.length() - 1)
+            cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+            cursor.insertText(''.join('\n' + line for line in lines))
+        else:
+            cursor.setPosition(0)
+            cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+            cursor.insertText('\n'.join(lines))
+
+    def _append_from_disk(self) -> None:
+        """Append the bytes added to the end of the file since it was last read."""
+        offset: int = self._disk_stat[1]  # type: ignore
+        with open(self.file_path, 'rb') as f:
+            f.seek(offset)
+            data: bytes = f.read()
+
+        # Characters still being written are read on the next change
+        decoder: io.IncrementalNewlineDecoder = newline_decoder(self.encoding)
+        text: str = decoder.decode(data, final=False)
+
+        self._append_content(text)
+        self._remember_disk_state(offset + len(data) - pending_size(decoder, self.encoding))
+
+    def read_saved_lines(self) -> List[str]:
+        """Read the lines of the file on disk, decompressed and decoded as the document was.
+
+        Returns
+        -------
+        lines: List[str]
+            Lines without their line endings, long lines split as they are in the document.
+        """
+        with open(self.file_path, 'rb') as f:
+            if self.compression is None:
+                data: bytes = f.read()
+            else:
+                with open_compressed(f, self.compression) as stream:
+                    data = stream.read()
+        if data.startswith(self.bom):
+            data = data[len(self.bom) :]
+        lines: List[str] = data.decode(self.encoding).replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        if self.long_line_index.is_enabled:
+            lines = [segment for line in lines for segment, _ in soft_break_segments(line, 0)]
+        return lines
+
+    def _diff_from_disk(self) -> None:
+        """Replace only the lines which differ from the file on disk."""
+        new_lines: List[str] = self.read_saved_lines()
+        old_lines: List[str] = self.document().toRawText().split('\u2029')
+
+        line_ranges: List[LineRange] = diff_lines(old_lines, new_lines)
+        del old_lines
+        cursor: QTextCursor = QTextCursor(self.document())
+        cursor.beginEditBlock()
+        # Bottom up, so that block numbers of the remaining ranges stay valid
+        for old_start, old_end, new_start, new_end in reversed(line_ranges):
+            self._replace_lines(cursor, old_start, old_end, new_lines[new_start:new_end])
+        cursor.endEditBlock()
+        debug('Reloaded %d changed line ranges of %s' % (len(line_ranges), self.file_path))
+        self._remember_disk_state()
+
+    def is_following(self) -> bool:
+        """Check if follow mode is enabled."""
+        return self._file_follower.is_following() or self._follow_pending
+
+    def set_follow_mode(self, enabled: bool) -> None:
+        """Keep appending what is written to the end of the file, like tail -f.
+
+        The editor is read only while following, and only the last FOLLOW_MAX_BLOCKS lines are kept, which
+        disables undo until following stops. The view keeps scrolling to the end unless it was scrolled away
+        from it. A document with unsaved changes is not followed, they would be mixed with the file.
+        follow_mode_signal is emitted with the resulting state.
+
+        Parameters
+        ----------
+        enabled: bool
+            Start following if True, else stop.
+
+        Returns
+        -------
+        None
+        """
+        if not enabled:
+            self._follow_pending = False
+            if self._file_follower.is_following():
+                self._file_follower.stop()
+                self.setMaximumBlockCount(0)
+                self.setReadOnly(False)
+                self.document().setUndoRedoEnabled(True)
+                self.undo_history.reset()
+        elif self.document().isModified():
+            raise_exception('Save the changes to this file before following it!', terminate=False)
+            debug('Not following modified file: %s' % (self.file_path))
+        elif not self._file_follower.is_following() and self._disk_stat is not None and self.compression is None:
+            if self.is_loading():
+                self._follow_pending = True
+            else:
+                self._start_following()
+        self.follow_mode_signal.emit(self.is_following())
+
+    def _start_following(self) -> None:
+        if not self._file_follower.start(self.file_path, self._disk_stat[1], self.encoding):  # type: ignore
+            raise_exception('Could not open the file to follow it!', terminate=False)
+            return
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(self.FOLLOW_MAX_BLOCKS)
+        # Catch up at once rather than on the first tick
+        self._file_follower.poll()
+
+    def _append_followed(self, text: str, offset: int) -> None:
+        """Append text read by the file follower, offset is where it stopped reading the file."""
+        scroll_bar = self.verticalScrollBar()
+        at_end: bool = scroll_bar.value() == scroll_bar.maximum()
+        # Recovered edits may have been replayed since following started, they stay unsaved
+        is_modified: bool = self.document().isModified()
+
+        self._inserting_content = True
+        self._append_content(text)
+        self._inserting_content = False
+        if self.blockCount() >= self.FOLLOW_MAX_BLOCKS:
+            self._is_partial = True
+
+        if at_end:
+            scroll_bar.setValue(scroll_bar.maximum())
+        if not is_modified:
+            self.document().setModified(False)
+            self.diff_index.set_saved()
+        self._remember_disk_state(offset)
+
+    def reload_from_disk(self) -> None:
+        """Bring the document in line with the file on disk, editing only what changed.
+
+        Appended bytes are read on their own, otherwise the changed line ranges are replaced.
+        Either way cursor, scroll position and undo history are kept.
+
+        Returns
+        -------
+        None
+        """
+        if stat_file(self.file_path) is None:
+            return
+
+        self._inserting_content = True
+        try:
+            # With unsaved edits the document no longer matches what was read, appending is not enough
+            if self.compression is not None:
+                # Compressed files can only be read from their start, stream it again
+                self.close_journal()
+                self.open_file(self.file_path)
+            elif not self.document().isModified() and is_appended(self.file_path, self._disk_stat, self._disk_tail):
+                self._append_from_disk()
+            elif self.long_line_index.is_enabled:
+                # Changed lines would be inserted without splitting them into blocks, read it again instead
+                self.close_journal()
+                self.open_file(self.file_path)
+            else:
+                self._diff_from_disk()
+        except UnicodeDecodeError:
+            debug(
+                '%s is no longer valid %s, reopening it' % (self.file_path, self.encoding), debug_type=DebugType.WARNING
+            )
+            # The journal holds edits of the document being replaced, replaying them on the new content would corrupt it
+            self.close_journal()
+            self.open_file(self.file_path)
+        finally:
+            self._inserting_content = False
+
+        self.document().setModified(False)
+        if not self.is_loading():
+            self.diff_index.set_saved()
+        if self._journal is not None:
+            self._journal.reset()
@@ -0,0 +1,198 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import threading
+from array import array
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence
+
+from PySide6.QtCore import Qt, QTimer, Signal, Slot
+from PySide6.QtGui import QColor, QTextBlock, QTextBlockFormat, QTextCursor
+from PySide6.QtWidgets import QPlainTextEdit
+
+from lightpad.utils.myers_diff import LineRange, diff_ids
+from lightpad.widgets.screens.code_area.code_tabs.editor.code_editor import CodeEditor
+
+
+class DiffView(QPlainTextEdit):
+    """Read only unified diff of the saved version of the file of a code editor and its document.
+
+    The changed line ranges are those of the diff index of the editor, so the view follows edits
+    without comparing the texts again. The saved lines are read when it is opened, and taken from the
+    document whenever the document becomes the saved version. If the file was changed by another process,
+    the index does not match it and the texts are compared on a worker thread instead.
+    """
+
+    CONTEXT_LINES: int = 3
+    MAX_SHOWN_LINES: int = 50_000
+    REFRESH_DELAY: int = 300  # milliseconds
+
+    _diffed_signal: Signal = Signal(int, object)  # generation, line ranges
+
+    def __init__(self, code_editor: CodeEditor) -> None:
+        super().__init__()
+
+        self.code_editor: CodeEditor = code_editor
+
+        self.setReadOnly(True)
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.setFont(code_editor.font())
+        self.document().setUndoRedoEnabled(False)
+
+        self._saved_lines: List[str] = code_editor.read_saved_lines()
+        self._saved_hashes: array = array('q', map(hash, self._saved_lines))
+        # The file may have been changed by another process since it was loaded or saved
+        self._is_index_current: bool = self._saved_hashes == code_editor.diff_index.saved_hashes
+        # Incremented on each refresh, results of comparisons started before are dropped
+        self._generation: int = 0
+        self._is_diffing: bool = False
+
+        self._refresh_timer: QTimer = QTimer()
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.timeout.connect(self.refresh)  # type: ignore
+        self._diffed_signal.connect(self._handle_diffed)  # type: ignore
+        code_editor.diff_index.notifier.changed.connect(self.schedule_refresh)  # type: ignore
+        code_editor.diff_index.notifier.saved.connect(self._handle_saved)  # type: ignore
+
+        self.refresh()
+
+    @Slot()
+    def _handle_saved(self) -> None:
+        """Take the saved lines from the document, which is the saved version now."""
+        saved_hashes: Optional[array] = self.code_editor.diff_index.saved_hashes
+        if saved_hashes is None:
+            # Loaded again, the document becomes the saved version once loaded
+            return
+        self._saved_lines = self.code_editor.document().toRawText().split('\u2029')
+        self._saved_hashes = saved_hashes
+        self._is_index_current = True
+        self.schedule_refresh()
+
+    def _start_diff(self) -> None:
+        self._is_diffing = True
+        threading.Thread(
+            target=self._diff,
+            args=(self._generation, self._saved_hashes, array('q', self.code_editor.diff_index.values)),
+            daemon=True,
+        ).start()
+
+    def _diff(self, generation: int, saved_hashes: array, hashes: array) -> None:
+        self._diffed_signal.emit(generation, diff_ids(saved_hashes, hashes))
+
+    def _handle_diffed(self, generation: int, line_ranges: List[LineRange]) -> None:
+        self._is_diffing = False
+        if self._is_index_current:
+            self.refresh()
+        elif generation == self._generation:
+            self._show(line_ranges)
+        else:
+            # Edited while comparing
+            self._start_diff()
+
+    def _document_lines(self, start: int, end: int) -> List[str]:
+        """Text of the blocks start to end (exclusive) of the document of the code editor."""
+        lines: List[str] = []
+        block: QTextBlock = self.code_editor.document().findBlockByNumber(start)
+        while block.isValid() and len(lines) < end - start:
+            lines.append(block.text())
+            block = block.next()
+        return lines
+
+    def _diff_text(self, line_ranges: Sequence[LineRange]) -> List[str]:
+        """Lines of the unified diff, with CONTEXT_LINES unchanged lines around each changed range."""
+        block_count: int = self.code_editor.document().blockCount()
+        lines: List[str] = ['--- %s (saved)' % (self.code_editor.file_path), '+++ %s' % (self.code_editor.file_path)]
+
+        # Ranges whose context would overlap are shown in one hunk
+        groups: List[List[LineRange]] = []
+        for line_range in line_ranges:
+            if groups and line_range[2] - groups[-1][-1][3] <= 2 * self.CONTEXT_LINES:
+                groups[-1].append(line_range)
+            else:
+                groups.append([line_range])
+
+        for index, group in enumerate(groups):
+            new_start: int = max(0, group[0][2] - self.CONTEXT_LINES)
+            old_start: int = group[0][0] - (group[0][2] - new_start)
+            new_end: int = min(block_count, group[-1][3] + self.CONTEXT_LINES)
+            old_end: int = min(len(self._saved_lines), group[-1][1] + (new_end - group[-1][3]))
+            lines.append(
+                '@@ -%d,%d +%d,%d @@' % (old_start + 1, old_end - old_start, new_start + 1, new_end - new_start)
+            )
+
+            # Blocks of the hunk are read at once, looking up a block costs as much as reading a few
+            new_lines: List[str] = self._document_lines(new_start, new_end)
+            position: int = new_start
+            for a_start, a_end, b_start, b_end in group:
+                lines.extend(' ' + line for line in new_lines[position - new_start : b_start - new_start])
+                lines.extend('-' + line for line in self._saved_lines[a_start:a_end])
+                lines.extend('+' + line for line in new_lines[b_start - new_start : b_end - new_start])
+                position = b_end
+            lines.extend(' ' + line for line in new_lines[position - new_start :])
+
+            if len(lines) > self.MAX_SHOWN_LINES:
+                lines.append('... %d more hunks' % (len(groups) - index - 1))
+                break
+        return lines
+
+    @Slot()
+    def schedule_refresh(self) -> None:
+        """Show the changes again once editing pauses."""
+        self._refresh_timer.start(self.REFRESH_DELAY)
+
+    @Slot()
+    def refresh(self) -> None:
+        """Show the current changes, keeping the scroll position, once compared if the index does not match."""
+        if self._is_index_current:
+            if not self.code_editor.diff_index.is_approximate():
+                # Otherwise shown once the index was compared again, it notifies the change
+                self._show(self.code_editor.diff_index.hunks)
+            return
+        self._generation += 1
+        if not self._is_diffing:
+            self._start_diff()
+
+    def _show(self, line_ranges: Sequence[LineRange]) -> None:
+        lines: List[str] = self._diff_text(line_ranges) if line_ranges else ['No changes since the file was saved']
+
+        formats: Dict[str, QTextBlockFormat] = {'': QTextBlockFormat()}
+        for prefix, color in (
+            ('-', QColor(Qt.GlobalColor.red).lighter(170)),
+            ('+', QColor(Qt.GlobalColor.green).lighter(170)),
+            ('@', QColor(Qt.GlobalColor.lightGray)),
+        ):
+            formats[prefix] = QTextBlockFormat()
+            formats[prefix].setBackground(color)
+
+        scroll_value: int = self.verticalScrollBar().value()
+        self.clear()
+        # Blocks inserted with a newline take the format of the block they are split from, so each run of lines
+        # with the same format is inserted at once. The file names heading the diff are not colored.
+        cursor: QTextCursor = QTextCursor(self.document())
+        cursor.beginEditBlock()
+        cursor.insertText('\n'.join(lines[:2]))
+        for prefix, run in groupby(lines[2:], key=lambda line: line[:1] if line[:1] in formats else ''):
+            cursor.insertBlock(formats[prefix])
+            cursor.insertText('\n'.join(run))
+        cursor.endEditBlock()
+        self.verticalScrollBar().setValue(scroll_value)
@@ -0,0 +1,47 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+from PySide6.QtGui import QTextCursor
+
+from lightpad.widgets.screens.code_area.code_tabs.editor._plain_text_editor import PlainTextEditor
+from lightpad.widgets.screens.code_area.code_tabs.editor.code_editor import CodeEditor
+
+
+class EditorView(PlainTextEditor):
+    """Another view of the document of a code editor, with its own cursor, scroll position and gutter.
+
+    The document is shared, not copied, so a view of a large file costs no memory and no load.
+    """
+
+    def __init__(self, code_editor: CodeEditor) -> None:
+        super().__init__(code_editor)
+
+        self.code_editor: CodeEditor = code_editor
+
+        self.setFont(code_editor.font())
+        self.setReadOnly(code_editor.isReadOnly())
+        code_editor.read_only_signal.connect(self.setReadOnly)  # type: ignore
+
+        # Start where the code editor is
+        self.setTextCursor(QTextCursor(code_editor.textCursor()))
+        self.verticalScrollBar().setValue(code_editor.verticalScrollBar().value())
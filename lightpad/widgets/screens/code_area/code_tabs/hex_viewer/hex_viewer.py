@@ -0,0 +1,271 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import math
+import mmap
+import os
+from typing import BinaryIO, Dict, Optional, Tuple
+
+from PySide6.QtCore import QPointF, QRectF, Qt, Slot
+from PySide6.QtGui import (
+    QColor,
+    QFontDatabase,
+    QFontMetricsF,
+    QKeySequence,
+    QPainter,
+    QPaintEvent,
+    QResizeEvent,
+    QShortcut,
+)
+from PySide6.QtWidgets import QAbstractScrollArea, QInputDialog, QLineEdit
+
+from lightpad.utils.commons import debug, raise_exception
+
+# Characters shown for bytes in the ASCII column, applied to bytes decoded as latin-1
+_PRINTABLE_TABLE: Dict[int, str] = {byte: chr(byte) if 0x20 <= byte < 0x7F else '.' for byte in range(256)}
+
+
+def parse_byte_pattern(text: str) -> bytes:
+    """Bytes given as hexadecimal pairs, like 'de ad be ef', else the UTF-8 encoded text."""
+    try:
+        return bytes.fromhex(text)
+    except ValueError:
+        return text.encode('utf-8')
+
+
+class HexViewer(QAbstractScrollArea):
+    """Read only hexadecimal and ASCII view of a file which is not text.
+
+    The file is memory mapped and only the visible rows are read and drawn, so
+    files of any size open instantly and use constant memory.
+    """
+
+    BYTES_PER_ROW: int = 16
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.file_path: str = ''
+        self._file: Optional[BinaryIO] = None
+        self._map: Optional[mmap.mmap] = None
+        self._size: int = 0
+        self._offset_digits: int = 8
+        self._selection: Tuple[int, int] = (0, 0)  # start, length
+        self._pattern: bytes = b''
+
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        # Same as the current line highlight of code editors
+        self._selection_color: QColor = QColor(Qt.GlobalColor.yellow).lighter(160)
+
+        self._go_to_offset_shortcut: QShortcut = QShortcut(QKeySequence('Ctrl+G'), self)
+        self._go_to_offset_shortcut.activated.connect(self.show_go_to_offset_dialog)  # type: ignore
+        self._find_shortcut: QShortcut = QShortcut(QKeySequence.StandardKey.Find, self)
+        self._find_shortcut.activated.connect(self.show_find_dialog)  # type: ignore
+        self._find_next_shortcut: QShortcut = QShortcut(QKeySequence.StandardKey.FindNext, self)
+        self._find_next_shortcut.activated.connect(self.find_next)  # type: ignore
+        for shortcut in (self._go_to_offset_shortcut, self._find_shortcut, self._find_next_shortcut):
+            shortcut.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+
+    def open_file(self, file_path: str) -> bool:
+        """Map file for viewing.
+
+        Parameters
+        ----------
+        file_path: str
+            The path to file to be opened.
+
+        Returns
+        -------
+        status: bool
+            True if file was successfully opened, else False.
+        """
+        try:
+            self._file = open(file_path, 'rb')
+            self._size = os.fstat(self._file.fileno()).st_size
+            # Empty files cannot be mapped
+            if self._size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.close_file()
+            raise_exception('Could not open file!', terminate=False)
+            debug('Could not map file: %s' % (file_path))
+            return False
+
+        self.file_path = file_path
+        self._offset_digits = max(8, len('%x' % (self._size)))
+        self._update_scroll_bars()
+        self.viewport().update()
+        return True
+
+    def close_file(self) -> None:
+        """Unmap and close the file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._size = 0
+
+    def _row_height(self) -> int:
+        return self.fontMetrics().height()
+
+    def _visible_rows(self) -> int:
+        return max(1, self.viewport().height() // self._row_height())
+
+    def _update_scroll_bars(self) -> None:
+        # Scroll bar values are 32 bit, beyond that the last rows cannot be scrolled to
+        row_count: int = min((self._size + self.BYTES_PER_ROW - 1) // self.BYTES_PER_ROW, 2**31 - 1)
+        self.verticalScrollBar().setRange(0, max(0, row_count - self._visible_rows()))
+        self.verticalScrollBar().setPageStep(self._visible_rows())
+
+        # Rows are drawn with half a character of margin on both sides
+        char_width: float = QFontMetricsF(self.font()).horizontalAdvance('0')
+        row_width: int = math.ceil((self._byte_columns(self.BYTES_PER_ROW - 1)[1] + 2) * char_width)
+        self.horizontalScrollBar().setRange(0, max(0, row_width - self.viewport().width()))
+        self.horizontalScrollBar().setPageStep(self.viewport().width())
+        self.horizontalScrollBar().setSingleStep(math.ceil(char_width))
+
+    def resizeEvent(self, e: QResizeEvent) -> None:
+        super().resizeEvent(e)
+        self._update_scroll_bars()
+
+    def scrollContentsBy(self, dx: int, dy: int) -> None:
+        self.viewport().update()
+
+    def _format_row(self, offset: int) -> str:
+        """Offset, hexadecimal and ASCII columns of the row starting at offset."""
+        data: bytes = self._map[offset : offset + self.BYTES_PER_ROW]  # type: ignore
+        half: int = self.BYTES_PER_ROW // 2
+        hex_columns: str = ' '.join('%02x' % (byte) for byte in data[:half])
+        if len(data) > half:
+            hex_columns += '  ' + ' '.join('%02x' % (byte) for byte in data[half:])
+        return '%0*x  %-*s  %s' % (
+            self._offset_digits,
+            offset,
+            3 * self.BYTES_PER_ROW,
+            hex_columns,
+            data.decode('latin-1').translate(_PRINTABLE_TABLE),
+        )
+
+    def _byte_columns(self, index: int) -> Tuple[int, int]:
+        """Character columns of the hexadecimal and ASCII cells of a byte in its row."""
+        hex_column: int = self._offset_digits + 2 + 3 * index + (1 if index >= self.BYTES_PER_ROW // 2 else 0)
+        ascii_column: int = self._offset_digits + 2 + 3 * self.BYTES_PER_ROW + 2 + index
+        return hex_column, ascii_column
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        if self._map is None:
+            return
+        painter: QPainter = QPainter(self.viewport())
+        painter.setFont(self.font())
+        row_height: int = self._row_height()
+        char_width: float = QFontMetricsF(self.font()).horizontalAdvance('0')
+        x: float = char_width / 2 - self.horizontalScrollBar().value()
+
+        selection_start, selection_length = self._selection
+        offset: int = self.verticalScrollBar().value() * self.BYTES_PER_ROW
+        y: int = 0
+        while offset < self._size and y < self.viewport().height():
+            # Selected bytes of this row
+            for index in range(
+                max(selection_start - offset, 0), min(selection_start + selection_length - offset, self.BYTES_PER_ROW)
+            ):
+                hex_column, ascii_column = self._byte_columns(index)
+                painter.fillRect(
+                    QRectF(x + hex_column * char_width, y, 2 * char_width, row_height), self._selection_color
+                )
+                painter.fillRect(
+                    QRectF(x + ascii_column * char_width, y, char_width, row_height), self._selection_color
+                )
+            painter.drawText(QPointF(x, y + self.fontMetrics().ascent()), self._format_row(offset))
+            offset += self.BYTES_PER_ROW
+            y += row_height
+        painter.end()
+
+    def _select(self, start: int, length: int) -> None:
+        """Select bytes and scroll them into the middle of the view."""
+        self._selection = (start, length)
+        row: int = start // self.BYTES_PER_ROW
+        first_row: int = self.verticalScrollBar().value()
+        if not first_row <= row < first_row + self._visible_rows():
+            self.verticalScrollBar().setValue(row - self._visible_rows() // 2)
+        self.viewport().update()
+
+    def go_to_offset(self, offset: int) -> None:
+        """Scroll to and select the byte at offset."""
+        self._select(max(0, min(offset, self._size - 1)), 1)
+
+    def find(self, pattern: bytes, start: int = 0) -> bool:
+        """Select the next occurrence of a byte pattern from start, wrapping around the end of the file.
+
+        Parameters
+        ----------
+        pattern: bytes
+            Bytes to be searched.
+        start: int
+            Offset to search from. (default is 0)
+
+        Returns
+        -------
+        status: bool
+            True if the pattern was found, else False.
+        """
+        if self._map is None or not pattern:
+            return False
+        self._pattern = pattern
+        index: int = self._map.find(pattern, start)
+        if index < 0 and start > 0:
+            index = self._map.find(pattern, 0, start + len(pattern) - 1)
+        if index < 0:
+            return False
+        self._select(index, len(pattern))
+        return True
+
+    @Slot()
+    def find_next(self) -> None:
+        """Select the next occurrence of the last searched pattern"""
+        if self._pattern:
+            self.find(self._pattern, self._selection[0] + 1)
+
+    @Slot()
+    def show_go_to_offset_dialog(self) -> None:
+        """Ask for an offset and go to it"""
+        text, ok = QInputDialog.getText(self, 'Go to Offset', 'Offset (decimal, or hexadecimal with 0x):')
+        if not ok or not text.strip():
+            return
+        try:
+            self.go_to_offset(int(text.strip(), 0))
+        except ValueError:
+            raise_exception('Invalid offset!', terminate=False)
+
+    @Slot()
+    def show_find_dialog(self) -> None:
+        """Ask for a byte pattern and find it"""
+        # bytes.hex takes no separator before Python 3.8
+        pattern: str = ' '.join('%02x' % byte for byte in self._pattern)
+        text, ok = QInputDialog.getText(
+            self, 'Find Bytes', 'Bytes (hexadecimal pairs, or text):', QLineEdit.EchoMode.Normal, pattern
+        )
+        if ok and text and not self.find(parse_byte_pattern(text), self._selection[0] + 1):
+            raise_exception('Bytes not found!', terminate=False)
@@ -0,0 +1,285 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import re
+from collections import OrderedDict
+from typing import List, Optional, Pattern, Tuple
+
+from PySide6.QtCore import QRect, Qt, QTimer, Slot
+from PySide6.QtGui import QColor, QImage, QMouseEvent, QPainter, QPaintEvent, QTextBlock, QTextCursor
+from PySide6.QtWidgets import QWidget
+
+from lightpad.utils.colors import BASE_COLOR, SHADE, get_color
+from lightpad.widgets.screens.code_area.code_tabs.editor.code_editor import CodeEditor
+
+_TOKEN_PATTERN: Pattern = re.compile(r'[A-Za-z_]\w*|\d[\w.]*|[^\w\s]+')
+
+
+def _bgra(hex_color: str) -> bytes:
+    """Pixel bytes of a color, in the memory layout of QImage.Format_RGB32."""
+    color: QColor = QColor(hex_color)
+    return bytes((color.blue(), color.green(), color.red(), 255))
+
+
+class MinimapWidget(QWidget):
+    """Downsampled overview of the current code editor, one pixel row per line.
+
+    The image is kept as tiles of TILE_LINES rows in a bounded cache, keyed by their first
+    line. Only tiles which are shown get rendered, neighbouring tiles are rendered ahead when
+    idle, and edits only redraw the rows of their lines, or the tiles holding them if the line
+    count changed, tiles after those are moved by the number of added or removed lines.
+    """
+
+    WIDTH: int = 100  # pixels, one per column
+    TILE_LINES: int = 256
+    MAX_TILES: int = 64
+    PREFETCH_TILES: int = 4
+    TAB_WIDTH: int = 4
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.setFixedWidth(self.WIDTH)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+
+        self._code_editor: Optional[CodeEditor] = None
+        self._tiles: 'OrderedDict[int, QImage]' = OrderedDict()  # first line of a tile to its image
+        self._block_count: int = 0
+        self._first_line: int = 0
+
+        self._background: bytes = _bgra(get_color(BASE_COLOR.GREY, SHADE.EXTRA_LIGHT))
+        self._word_color: bytes = _bgra(get_color(BASE_COLOR.GREY, SHADE.DARK))
+        self._number_color: bytes = _bgra(get_color(BASE_COLOR.BLUE, SHADE.LIGHTER))
+        self._symbol_color: bytes = _bgra(get_color(BASE_COLOR.RED, SHADE.NORMAL))
+        self._slider_color: QColor = QColor(get_color(BASE_COLOR.GREY, SHADE.NORMAL))
+        self._slider_color.setAlpha(60)
+
+        self._prefetch_timer: QTimer = QTimer()
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.timeout.connect(self.prefetch_tiles)  # type: ignore
+
+        self.hide()
+
+    def set_editor(self, code_editor: Optional[CodeEditor]) -> None:
+        """Show the minimap of the given code editor, or hide it if None.
+
+        Parameters
+        ----------
+        code_editor: Optional[CodeEditor]
+            Code editor to be shown.
+
+        Returns
+        -------
+        None
+        """
+        if self._code_editor is not None:
+            try:
+                self._code_editor.document().contentsChange.disconnect(self.handle_contents_change)
+                self._code_editor.verticalScrollBar().valueChanged.disconnect(self.update)
+            except RuntimeError:
+                pass  # Editor of a closed tab was already deleted
+
+        self._code_editor = code_editor
+        self._tiles.clear()
+        self._prefetch_timer.stop()
+
+        if code_editor is None:
+            self.hide()
+            return
+
+        self._block_count = code_editor.blockCount()
+        code_editor.document().contentsChange.connect(self.handle_contents_change)  # type: ignore
+        code_editor.verticalScrollBar().valueChanged.connect(self.update)  # type: ignore
+        self.show()
+        self.update()
+
+    def _block_prefix(self, block: QTextBlock) -> str:
+        """Text of the first WIDTH columns of a block, without copying very long blocks."""
+        if block.length() <= 4 * self.WIDTH:
+            return block.text()
+        cursor: QTextCursor = QTextCursor(block)
+        cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor, 4 * self.WIDTH)
+        return cursor.selectedText()
+
+    def _render_row(self, text: str) -> bytes:
+        """Pixel row of a line, with a run of color per token."""
+        text = text.expandtabs(self.TAB_WIDTH)[: self.WIDTH]
+        row: bytearray = bytearray(self._background * self.WIDTH)
+        for match in _TOKEN_PATTERN.finditer(text):
+            start, end = match.span()
+            first: str = match.group()[0]
+            if first.isdigit():
+                color = self._number_color
+            elif first.isalpha() or first == '_':
+                color = self._word_color
+            else:
+                color = self._symbol_color
+            row[start * 4 : end * 4] = color * (end - start)
+        return bytes(row)
+
+    def _render_rows(self, image: QImage, tile_start: int, first_row: int, last_row: int) -> None:
+        """Render rows first_row to last_row (inclusive) of a tile image starting at line tile_start."""
+        document = self._code_editor.document()  # type: ignore
+        bits = image.bits()
+        bytes_per_line: int = image.bytesPerLine()
+        row_bytes: int = self.WIDTH * 4
+
+        block: QTextBlock = document.findBlockByNumber(tile_start + first_row)
+        for row in range(first_row, last_row + 1):
+            offset: int = row * bytes_per_line
+            if block.isValid():
+                bits[offset : offset + row_bytes] = self._render_row(self._block_prefix(block))
+                block = block.next()
+            else:
+                bits[offset : offset + row_bytes] = self._background * self.WIDTH
+
+    def _tile_start(self, line: int) -> int:
+        """First line of the cached tile showing a line, else of a new tile for it.
+
+        A new tile starts at a multiple of TILE_LINES, or after the cached tile before the line
+        if that ends later, so that it shows as few lines already shown as possible.
+        """
+        new_start: int = line // self.TILE_LINES * self.TILE_LINES
+        for tile_start in self._tiles:
+            tile_end: int = tile_start + self.TILE_LINES
+            if tile_start <= line < tile_end:
+                return tile_start
+            if new_start < tile_end <= line:
+                new_start = tile_end
+        return new_start
+
+    def _tile(self, tile_start: int) -> QImage:
+        """Get the tile starting at a line from the cache, rendering it if needed."""
+        image: Optional[QImage] = self._tiles.get(tile_start)
+        if image is None:
+            image = QImage(self.WIDTH, self.TILE_LINES, QImage.Format.Format_RGB32)
+            self._render_rows(image, tile_start, 0, self.TILE_LINES - 1)
+            self._tiles[tile_start] = image
+            while len(self._tiles) > self.MAX_TILES:
+                self._tiles.popitem(last=False)
+        else:
+            self._tiles.move_to_end(tile_start)
+        return image
+
+    def _visible_lines(self) -> Tuple[int, int]:
+        """First line and number of lines shown in the code editor."""
+        code_editor: CodeEditor = self._code_editor  # type: ignore
+        first: int = code_editor.firstVisibleBlock().blockNumber()
+        line_height: int = max(1, code_editor.fontMetrics().height())
+        return first, max(1, code_editor.viewport().height() // line_height)
+
+    def _update_first_line(self) -> None:
+        """Scroll the minimap along with the editor, when it has more lines than pixel rows."""
+        editor_first, editor_lines = self._visible_lines()
+        hidden_lines: int = self._block_count - self.height()
+        if hidden_lines <= 0:
+            self._first_line = 0
+            return
+        editor_range: int = max(1, self._block_count - editor_lines)
+        self._first_line = min(hidden_lines, hidden_lines * editor_first // editor_range)
+
+    @Slot(int, int, int)
+    def handle_contents_change(self, position: int, removed: int, added: int) -> None:
+        """Redraw rows of changed lines, or drop the tiles holding them and move the tiles after them."""
+        document = self._code_editor.document()  # type: ignore
+        first: int = document.findBlock(position).blockNumber()
+        last: int = document.findBlock(min(position + added, document.characterCount() - 1)).blockNumber()
+        block_count: int = document.blockCount()
+        delta: int = block_count - self._block_count
+
+        if delta:
+            # Lines first to last - delta were replaced, the lines after them moved by delta
+            tiles: 'OrderedDict[int, QImage]' = OrderedDict()
+            for tile_start, image in self._tiles.items():
+                if tile_start + self.TILE_LINES <= first:
+                    tiles[tile_start] = image
+                elif tile_start > last - delta:
+                    tiles[tile_start + delta] = image
+            self._tiles = tiles
+            self._block_count = block_count
+        else:
+            for tile_start, image in self._tiles.items():
+                if tile_start <= last and first < tile_start + self.TILE_LINES:
+                    self._render_rows(
+                        image,
+                        tile_start,
+                        max(first, tile_start) - tile_start,
+                        min(last, tile_start + self.TILE_LINES - 1) - tile_start,
+                    )
+        self.update()
+
+    @Slot()
+    def prefetch_tiles(self) -> None:
+        """Render one missing tile around the shown ones, and schedule the next."""
+        if self._code_editor is None:
+            return
+        last_line: int = min(self._first_line + self.height(), self._block_count)
+        candidates: List[int] = []
+        for distance in range(self.PREFETCH_TILES):
+            candidates += [last_line + distance * self.TILE_LINES, self._first_line - 1 - distance * self.TILE_LINES]
+        for line in candidates:
+            if 0 <= line < self._block_count:
+                tile_start: int = self._tile_start(line)
+                if tile_start not in self._tiles:
+                    if len(self._tiles) >= self.MAX_TILES:
+                        return
+                    self._tile(tile_start)
+                    self._prefetch_timer.start(0)
+                    return
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        if self._code_editor is None:
+            return
+        self._update_first_line()
+
+        with QPainter(self) as painter:
+            painter.fillRect(event.rect(), QColor(get_color(BASE_COLOR.GREY, SHADE.EXTRA_LIGHT)))
+
+            last_line: int = min(self._first_line + self.height(), self._block_count)
+            line: int = self._first_line
+            while line < last_line:
+                tile_start: int = self._tile_start(line)
+                painter.drawImage(0, tile_start - self._first_line, self._tile(tile_start))
+                line = tile_start + self.TILE_LINES
+
+            editor_first, editor_lines = self._visible_lines()
+            painter.fillRect(
+                QRect(0, editor_first - self._first_line, self.WIDTH, editor_lines),
+                self._slider_color,
+            )
+
+        self._prefetch_timer.start(50)
+
+    def _scroll_editor_to(self, y: int) -> None:
+        """Center the code editor on the line shown at y."""
+        if self._code_editor is None:
+            return
+        _, editor_lines = self._visible_lines()
+        self._code_editor.verticalScrollBar().setValue(self._first_line + y - editor_lines // 2)
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        self._scroll_editor_to(int(event.position().y()))
+
+    def mouseMoveEvent(self, event: QMouseEvent) -> None:
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            self._scroll_editor_to(int(event.position().y()))
@@ -0,0 +1,288 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import codecs
+import os
+import re
+import signal
+import struct
+import subprocess
+import threading
+from typing import Dict, Optional, Pattern
+
+from PySide6.QtCore import Qt, QTimer, Signal, Slot
+from PySide6.QtGui import QFontDatabase, QHideEvent, QKeyEvent, QResizeEvent, QShowEvent, QTextCursor
+from PySide6.QtWidgets import QApplication, QPlainTextEdit
+
+from lightpad.utils.commons import DebugType, debug
+
+try:
+    import fcntl
+    import pty
+    import termios
+except ImportError:  # not available on Windows
+    pty = None  # type: ignore
+
+# Escape sequences are dropped, the terminal does not emulate a screen
+_ESCAPE_SEQUENCE_PATTERN: Pattern = re.compile(r'\x1b(\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(\x07|\x1b\\)?|[@-Z\\-_])')
+_CONTROL_PATTERN: Pattern = re.compile(r'(\r(?!\n)|\x08)')
+
+_KEY_SEQUENCES: Dict[int, bytes] = {
+    Qt.Key.Key_Return: b'\r',
+    Qt.Key.Key_Enter: b'\r',
+    Qt.Key.Key_Backspace: b'\x7f',
+    Qt.Key.Key_Tab: b'\t',
+    Qt.Key.Key_Escape: b'\x1b',
+    Qt.Key.Key_Up: b'\x1b[A',
+    Qt.Key.Key_Down: b'\x1b[B',
+    Qt.Key.Key_Right: b'\x1b[C',
+    Qt.Key.Key_Left: b'\x1b[D',
+    Qt.Key.Key_Home: b'\x1b[H',
+    Qt.Key.Key_End: b'\x1b[F',
+    Qt.Key.Key_Delete: b'\x1b[3~',
+}
+
+
+def _set_controlling_terminal() -> None:
+    """Make the pseudo terminal on stdin the controlling terminal of the new session.
+
+    Runs in the child between fork and exec, after setsid, so that Ctrl+C and job control
+    reach the shell's foreground process group.
+    """
+    fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+
+
+class TerminalWidget(QPlainTextEdit):
+    """Shell running on a pseudo terminal.
+
+    Output is read on a worker thread into a bounded buffer and shown in batches at most
+    FRAME_RATE times a second, and only while the terminal is visible. When output comes
+    faster than it can be shown, the oldest pending output is dropped, it would have
+    scrolled out of the bounded scrollback anyway.
+    """
+
+    FRAME_RATE: int = 30
+    SCROLLBACK_LINES: int = 10_000
+    MAX_PENDING_BYTES: int = 64 * 1024
+    READ_SIZE: int = 64 * 1024
+
+    _output_ended_signal: Signal = Signal(int)  # pseudo terminal the reader thread stopped reading
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(self.SCROLLBACK_LINES)
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.WidgetWidth)
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+
+        self.cwd: str = os.path.expanduser('~')
+        self._process: Optional[subprocess.Popen] = None
+        self._master_fd: Optional[int] = None
+        self._decoder: codecs.IncrementalDecoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        # Filled by the reader thread, emptied by the flush timer
+        self._pending: bytearray = bytearray()
+        self._pending_lock: threading.Lock = threading.Lock()
+        self._dropped_bytes: int = 0
+        self._exited: bool = False
+
+        self._flush_timer: QTimer = QTimer()
+        self._flush_timer.timeout.connect(self.flush_output)  # type: ignore
+        self._output_ended_signal.connect(self._close_terminal)  # type: ignore
+
+    def start(self) -> bool:
+        """Start the shell, if it is not running.
+
+        Returns
+        -------
+        status: bool
+            True if the shell is running, else False.
+        """
+        if self._process is not None:
+            return True
+        if pty is None:
+            self.setPlainText('Terminal is not supported on this platform')
+            return False
+
+        master_fd, slave_fd = pty.openpty()
+        environment: Dict[str, str] = dict(os.environ, TERM='dumb')
+        try:
+            self._process = subprocess.Popen(
+                [os.environ.get('SHELL', '/bin/sh')],
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                cwd=self.cwd if os.path.isdir(self.cwd) else None,
+                env=environment,
+                start_new_session=True,
+                preexec_fn=_set_controlling_terminal,
+            )
+        except OSError as error:
+            os.close(master_fd)
+            self.setPlainText('Could not start shell: %s' % (error))
+            return False
+        finally:
+            os.close(slave_fd)
+
+        self._master_fd = master_fd
+        self._exited = False
+        self._update_window_size()
+        threading.Thread(target=self._read_output, args=(master_fd,), daemon=True).start()
+        debug('Started terminal shell, pid %d' % (self._process.pid))
+        return True
+
+    def stop(self) -> None:
+        """Terminate the shell, the pseudo terminal is closed once the reader thread reaches its end."""
+        if self._process is not None:
+            try:
+                os.killpg(self._process.pid, signal.SIGHUP)
+            except OSError:
+                pass
+            self._process = None
+        self._master_fd = None
+
+    def _read_output(self, master_fd: int) -> None:
+        """Worker thread, reads output until the shell exits."""
+        while True:
+            try:
+                data: bytes = os.read(master_fd, self.READ_SIZE)
+            except OSError:
+                data = b''
+            with self._pending_lock:
+                if not data:
+                    self._exited = True
+                    break
+                self._pending += data
+                excess: int = len(self._pending) - self.MAX_PENDING_BYTES
+                if excess > 0:
+                    del self._pending[:excess]
+                    self._dropped_bytes += excess
+        # Closed on the GUI thread, where the descriptor is also written to
+        self._output_ended_signal.emit(master_fd)
+
+    @Slot(int)
+    def _close_terminal(self, master_fd: int) -> None:
+        """Close a pseudo terminal the reader thread is done with."""
+        if master_fd == self._master_fd:
+            # The shell exited by itself, show its last output and stop writing to it
+            self.flush_output()
+        os.close(master_fd)
+
+    def _write_text(self, cursor: QTextCursor, text: str) -> None:
+        """Insert output, handling carriage returns and backspaces."""
+        for part in _CONTROL_PATTERN.split(text):
+            if part == '\r':
+                # Overwrite the line, as progress bars do
+                cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock, QTextCursor.MoveMode.KeepAnchor)
+                cursor.removeSelectedText()
+            elif part == '\x08':
+                if not cursor.atBlockStart():
+                    cursor.deletePreviousChar()
+            elif part:
+                cursor.insertText(part)
+
+    @Slot()
+    def flush_output(self) -> None:
+        """Show the output read since the last flush, in one edit."""
+        with self._pending_lock:
+            data: bytes = bytes(self._pending)
+            self._pending.clear()
+            dropped, self._dropped_bytes = self._dropped_bytes, 0
+            exited: bool = self._exited
+        if dropped:
+            debug('Terminal output came too fast, skipped %d bytes' % (dropped), debug_type=DebugType.WARNING)
+
+        text: str = self._decoder.decode(data)
+        text = _ESCAPE_SEQUENCE_PATTERN.sub('', text).replace('\r\n', '\n')
+        if exited and self._process is not None:
+            self._process.wait()
+            text += '\n[Process exited with code %d]\n' % (self._process.returncode)
+            self.stop()
+        if not text:
+            return
+
+        scroll_bar = self.verticalScrollBar()
+        at_end: bool = scroll_bar.value() == scroll_bar.maximum()
+        cursor: QTextCursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        if dropped:
+            cursor.insertText('\n[%d bytes of output skipped]\n' % (dropped))
+        self._write_text(cursor, text)
+        cursor.endEditBlock()
+        if at_end:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def _send(self, data: bytes) -> None:
+        if self._master_fd is None and not self.start():
+            return
+        try:
+            os.write(self._master_fd, data)  # type: ignore
+        except OSError as error:
+            debug('Could not write to terminal: %s' % (error), debug_type=DebugType.WARNING)
+
+    def _update_window_size(self) -> None:
+        """Tell the shell how many rows and columns are shown."""
+        if self._master_fd is None:
+            return
+        columns: int = max(1, self.viewport().width() // max(1, self.fontMetrics().horizontalAdvance('0')))
+        rows: int = max(1, self.viewport().height() // max(1, self.fontMetrics().height()))
+        try:
+            fcntl.ioctl(self._master_fd, termios.TIOCSWINSZ, struct.pack('HHHH', rows, columns, 0, 0))
+        except OSError as error:
+            debug('Could not resize terminal: %s' % (error), debug_type=DebugType.WARNING)
+
+    def keyPressEvent(self, e: QKeyEvent) -> None:
+        modifiers: Qt.KeyboardModifier = e.modifiers()
+        control_shift = Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier
+        if modifiers & control_shift == control_shift and e.key() == Qt.Key.Key_C:
+            self.copy()
+        elif modifiers & control_shift == control_shift and e.key() == Qt.Key.Key_V:
+            self._send(QApplication.clipboard().text().encode('utf-8'))
+        elif e.key() in _KEY_SEQUENCES:
+            self._send(_KEY_SEQUENCES[e.key()])
+        elif modifiers & Qt.KeyboardModifier.ControlModifier and Qt.Key.Key_A <= e.key() <= Qt.Key.Key_Z:
+            self._send(bytes((e.key() - Qt.Key.Key_A + 1,)))
+        elif e.text():
+            self._send(e.text().encode('utf-8'))
+        else:
+            super().keyPressEvent(e)
+
+    def resizeEvent(self, e: QResizeEvent) -> None:
+        super().resizeEvent(e)
+        self._update_window_size()
+
+    def showEvent(self, event: QShowEvent) -> None:
+        super().showEvent(event)
+        self.start()
+        self.flush_output()
+        self._flush_timer.start(1000 // self.FRAME_RATE)
+
+    def hideEvent(self, event: QHideEvent) -> None:
+        # Output keeps being read, but it is not laid out while hidden
+        self._flush_timer.stop()
+        super().hideEvent(event)
@@ -22,12 +22,14 @@
 #
 
 import platform
+from typing import Optional
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Slot
 from PySide6.QtWidgets import QFrame, QHBoxLayout, QSplitter
 
 from lightpad.utils.commons import init_layout
 from lightpad.widgets.screens.code_area.code_area_frame import CodeAreaFrame
+from lightpad.widgets.screens.code_area.code_tabs.editor.code_editor import CodeEditor
 from lightpad.widgets.screens.side_bar.side_bar_widget import SideBarWidget
 from lightpad.widgets.screens.side_bar.stacked_widget import StackedWidget
 
@@ -61,3 +63,20 @@ class EditorScreen(QFrame):
 
         self.layout().addWidget(self.side_bar_widget)
         self.layout().addWidget(self._splitter_horizontal)
+
+        self.side_bar_widget.page_selected_signal.connect(self.stacked_widget.setCurrentIndex)  # type: ignore
+        self.code_area_frame.code_tabs_widget.currentChanged.connect(self.handle_current_tab_changed)  # type: ignore
+        self.stacked_widget.outline.symbol_activated_signal.connect(self.go_to_symbol)  # type: ignore
+
+    @Slot(int)
+    def handle_current_tab_changed(self, index: int) -> None:
+        """Outline the current code editor tab."""
+        self.stacked_widget.outline.set_editor(self.code_area_frame.code_tabs_widget.current_code_editor())
+
+    @Slot(int)
+    def go_to_symbol(self, line: int) -> None:
+        """Move the cursor of the current code editor to the line of a symbol."""
+        code_editor: Optional[CodeEditor] = self.code_area_frame.code_tabs_widget.current_code_editor()
+        if code_editor is not None:
+            code_editor.go_to_line(line)
+            code_editor.setFocus()
@@ -22,6 +22,7 @@
 #
 
 import os
+from typing import Dict, Optional, Tuple
 
 from PySide6.QtCore import QFileInfo, Qt
 from PySide6.QtGui import QIcon
@@ -29,6 +30,15 @@ from PySide6.QtWidgets import QFileIconProvider, QPushButton
 
 from lightpad.utils.colors import BASE_COLOR, SHADE, get_color
 from lightpad.utils.custom_typing import HexColor
+from lightpad.utils.git_status import CONFLICTED, IGNORED, MODIFIED, UNTRACKED
+
+_GIT_STATUS_COLORS: Dict[str, Tuple[BASE_COLOR, SHADE]] = {
+    MODIFIED: (BASE_COLOR.BLUE, SHADE.DARKER),
+    UNTRACKED: (BASE_COLOR.GREEN, SHADE.DARK),
+    IGNORED: (BASE_COLOR.GREY, SHADE.LIGHT),
+    CONFLICTED: (BASE_COLOR.RED, SHADE.NORMAL),
+}
+_GIT_STATUS_SUFFIXES: Dict[str, str] = {MODIFIED: 'M', UNTRACKED: 'U', CONFLICTED: 'C'}
 
 
 class ExplorerItem(QPushButton):
@@ -47,9 +57,28 @@ class ExplorerItem(QPushButton):
 
         self.setText(self.item_name)
         self.setIcon(self._icon)
-        item_color: HexColor = (
-            get_color(BASE_COLOR.BLUE, SHADE.NORMAL) if self.is_dir else get_color(BASE_COLOR.GREY, SHADE.EXTRA_DARK)
-        )
+        self.git_status: Optional[str] = None
+        self._update_style()
+
+    def set_git_status(self, git_status: Optional[str]) -> None:
+        """Show the git status of the item, one of those of lightpad.utils.git_status or None if unchanged."""
+        if git_status == self.git_status:
+            return
+        self.git_status = git_status
+        suffix: str = _GIT_STATUS_SUFFIXES.get(git_status or '', '')
+        if suffix and self.is_dir:
+            suffix = '\u2022'  # directories containing changes
+        self.setText('%s  %s' % (self.item_name, suffix) if suffix else self.item_name)
+        self._update_style()
+
+    def _update_style(self) -> None:
+        item_color: HexColor
+        if self.git_status is not None:
+            item_color = get_color(*_GIT_STATUS_COLORS[self.git_status])
+        elif self.is_dir:
+            item_color = get_color(BASE_COLOR.BLUE, SHADE.NORMAL)
+        else:
+            item_color = get_color(BASE_COLOR.GREY, SHADE.EXTRA_DARK)
         self.setStyleSheet(
             '''
             QPushButton {
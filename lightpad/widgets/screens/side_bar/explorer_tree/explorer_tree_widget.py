@@ -25,21 +25,41 @@ import os
 from configparser import ConfigParser
 from glob import glob
 from itertools import chain
-from typing import List
-
-from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QFileIconProvider, QFrame, QLayout, QLayoutItem, QScrollArea, QVBoxLayout, QWidget
-
-from lightpad.utils.commons import init_layout
+from typing import List, Optional
+
+from PySide6.QtCore import Qt, Signal, Slot
+from PySide6.QtGui import QContextMenuEvent
+from PySide6.QtWidgets import (
+    QFileIconProvider,
+    QFrame,
+    QInputDialog,
+    QLayout,
+    QLayoutItem,
+    QMenu,
+    QScrollArea,
+    QVBoxLayout,
+    QWidget,
+)
+
+from lightpad.utils.commons import DebugType, debug, init_layout
+from lightpad.utils.git_status import RepositoryStatus
 from lightpad.widgets.screens.side_bar.explorer_tree.explorer_item import ExplorerItem
+from lightpad.widgets.screens.side_bar.explorer_tree.git_status_watcher import GitStatusWatcher
 
 
 class ExplorerTreeWidget(QFrame):
     """File Explorer Tree"""
 
+    # Most files opened at once by open_matching_files
+    MAX_MATCHING_FILES: int = 200
+
+    open_files_signal: Signal = Signal(object)  # paths of the files to be opened
+
     def __init__(self) -> None:
         super().__init__()
 
+        self.dir_path: str = ''
+
         self._exclude_list: List[str] = []
         self._file_icon_provider: QFileIconProvider = QFileIconProvider()
 
@@ -59,6 +79,9 @@ class ExplorerTreeWidget(QFrame):
 
         self._items_list: List[ExplorerItem] = []
 
+        self.git_status_watcher: GitStatusWatcher = GitStatusWatcher()
+        self.git_status_watcher.status_changed_signal.connect(self.update_git_status)  # type: ignore
+
         init_layout(self, QVBoxLayout)
 
         self._scroll_area: QScrollArea = QScrollArea()
@@ -90,12 +113,12 @@ class ExplorerTreeWidget(QFrame):
         None
         """
         while layout.count():
-            item: QLayoutItem = layout.itemAt(0)
+            item: QLayoutItem = layout.takeAt(0)
             widget: QWidget = item.widget()
             if widget is not None:
-                item.widget().setParent(None)  # type: ignore
-                item.widget().deleteLater()
-            else:
+                widget.setParent(None)  # type: ignore
+                widget.deleteLater()
+            elif item.layout() is not None:
                 self.clear_layout_items(item.layout())  # type: ignore
 
     def load_items(self, dir_path: str) -> None:
@@ -110,7 +133,9 @@ class ExplorerTreeWidget(QFrame):
         -------
         None
         """
+        self.dir_path = dir_path
         self.clear_layout_items(self._scroll_widget.layout())
+        self._items_list.clear()
         for item_path in chain(
             glob(os.path.join(dir_path, '*')),
             glob(os.path.join(dir_path, '.*')),
@@ -120,3 +145,34 @@ class ExplorerTreeWidget(QFrame):
                 self._items_list.append(explorer_item)
                 self._scroll_widget.layout().addWidget(explorer_item, alignment=Qt.AlignmentFlag.AlignLeft)  # type: ignore
         self._scroll_widget.layout().addStretch()  # type: ignore
+        self.git_status_watcher.set_directory(dir_path)
+
+    @Slot()
+    def update_git_status(self) -> None:
+        """Decorate the items with the cached git status, a dictionary lookup per item."""
+        status: Optional[RepositoryStatus] = self.git_status_watcher.status
+        for explorer_item in self._items_list:
+            explorer_item.set_git_status(status.status(explorer_item.item_abs_path) if status is not None else None)
+
+    def contextMenuEvent(self, event: QContextMenuEvent) -> None:
+        menu: QMenu = QMenu(self)
+        menu.addAction('Open All Matching Files...', self.open_matching_files)  # type: ignore
+        menu.exec(event.globalPos())
+
+    @Slot()
+    def open_matching_files(self) -> None:
+        """Ask for a glob pattern, like **/*.py, and open the files under the explored directory matching it."""
+        pattern, accepted = QInputDialog.getText(self, 'Open All Matching Files', 'Pattern:', text='**/*')
+        if not accepted or not pattern:
+            return
+        file_paths: List[str] = sorted(
+            path for path in glob(os.path.join(self.dir_path, pattern), recursive=True) if os.path.isfile(path)
+        )
+        if len(file_paths) > self.MAX_MATCHING_FILES:
+            debug(
+                '%d files match %s, opening the first %d' % (len(file_paths), pattern, self.MAX_MATCHING_FILES),
+                debug_type=DebugType.WARNING,
+            )
+            del file_paths[self.MAX_MATCHING_FILES :]
+        if file_paths:
+            self.open_files_signal.emit(file_paths)
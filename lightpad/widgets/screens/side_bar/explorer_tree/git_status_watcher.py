@@ -0,0 +1,139 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import os
+import subprocess
+import threading
+from typing import List, Optional, Set, Tuple
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal, Slot
+
+from lightpad.utils.commons import DebugType, debug
+from lightpad.utils.git_status import RepositoryStatus, find_repository, read_status
+
+
+class GitStatusWatcher(QObject):
+    """Git status of the work tree containing a directory, read on a worker thread and cached.
+
+    It is read again only when the git index, the git directory or the directory changes,
+    or when refresh is called, for changes made to files in place.
+    """
+
+    REFRESH_DELAY: int = 500  # milliseconds
+
+    status_changed_signal: Signal = Signal()
+    _finished_signal: Signal = Signal(int, object)  # generation, Optional[RepositoryStatus]
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.status: Optional[RepositoryStatus] = None
+        self._repository: Optional[Tuple[str, str]] = None
+        self._dir_path: str = ''
+
+        # Incremented when another directory is watched, results for the previous one are dropped
+        self._generation: int = 0
+        self._is_reading: bool = False
+        self._is_refresh_pending: bool = False
+
+        self._file_system_watcher: QFileSystemWatcher = QFileSystemWatcher()
+        self._file_system_watcher.fileChanged.connect(self.schedule_refresh)  # type: ignore
+        self._file_system_watcher.directoryChanged.connect(self.schedule_refresh)  # type: ignore
+
+        self._refresh_timer: QTimer = QTimer()
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.timeout.connect(self.refresh)  # type: ignore
+
+        self._finished_signal.connect(self._handle_finished)  # type: ignore
+
+    def _watch(self) -> None:
+        """Watch the index, the git directory and the directory, the index is replaced on each change."""
+        if self._repository is None:
+            return
+        paths: List[str] = [os.path.join(self._repository[1], 'index'), self._repository[1], self._dir_path]
+        watched: Set[str] = set(self._file_system_watcher.files() + self._file_system_watcher.directories())
+        missing: List[str] = [path for path in paths if path not in watched and os.path.exists(path)]
+        if missing:
+            self._file_system_watcher.addPaths(missing)
+
+    def set_directory(self, dir_path: str) -> None:
+        """Watch the work tree containing a directory.
+
+        Parameters
+        ----------
+        dir_path: str
+            Directory shown in the explorer.
+
+        Returns
+        -------
+        None
+        """
+        self._generation += 1
+        self._refresh_timer.stop()
+        watched: List[str] = self._file_system_watcher.files() + self._file_system_watcher.directories()
+        if watched:
+            self._file_system_watcher.removePaths(watched)
+
+        self._dir_path = os.path.abspath(dir_path)
+        self._repository = find_repository(self._dir_path)
+        self.status = None
+        self.status_changed_signal.emit()
+        if self._repository is not None:
+            self._watch()
+            self.refresh()
+
+    @Slot()
+    def schedule_refresh(self) -> None:
+        """Read the status again, once changes settle."""
+        if self._repository is not None:
+            self._refresh_timer.start(self.REFRESH_DELAY)
+
+    @Slot()
+    def refresh(self) -> None:
+        """Read the status again on a worker thread."""
+        if self._repository is None:
+            return
+        if self._is_reading:
+            self._is_refresh_pending = True
+            return
+        self._is_reading = True
+        threading.Thread(target=self._read, args=(self._generation, self._repository[0]), daemon=True).start()
+
+    def _read(self, generation: int, root: str) -> None:
+        status: Optional[RepositoryStatus] = None
+        try:
+            status = read_status(root)
+        except (OSError, subprocess.CalledProcessError) as e:
+            debug('Could not read git status of %s: %s' % (root, e), debug_type=DebugType.WARNING)
+        self._finished_signal.emit(generation, status)
+
+    @Slot(int, object)
+    def _handle_finished(self, generation: int, status: Optional[RepositoryStatus]) -> None:
+        self._is_reading = False
+        if generation == self._generation:
+            self.status = status
+            self.status_changed_signal.emit()
+            self._watch()
+        if self._is_refresh_pending:
+            self._is_refresh_pending = False
+            self.refresh()
@@ -0,0 +1,197 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from PySide6.QtCore import Qt, QTimer, Signal, Slot
+from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem
+
+from lightpad.utils.commons import DebugType, debug
+from lightpad.utils.python_symbols import (
+    CLASS,
+    PYTHON_EXTENSIONS,
+    Symbol,
+    parse_chunks,
+    shutdown_symbol_pool,
+    split_top_level,
+    submit_symbol_job,
+)
+from lightpad.widgets.screens.code_area.code_tabs.editor.code_editor import CodeEditor
+
+
+class OutlineWidget(QTreeWidget):
+    """Classes and functions of the Python file of the current code editor.
+
+    The source is split into top level chunks, and only chunks whose text changed since the last
+    parse are parsed again, in the symbol process pool. Chunks which do not parse, while being
+    typed, keep the symbols they had.
+    """
+
+    PARSE_DELAY: int = 300  # milliseconds
+
+    symbol_activated_signal: Signal = Signal(int)  # line, starting at 1
+    _parsed_signal: Signal = Signal(int, object, object)  # generation, parsed chunks, symbols of each chunk
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.setHeaderHidden(True)
+        self.setStyleSheet('border: None;')
+
+        self._code_editor: Optional[CodeEditor] = None
+        self.symbols: List[Symbol] = []
+        # Symbols of chunks of the current source by their text, lines relative to the chunk
+        self._chunk_symbols: Dict[str, Optional[List[Symbol]]] = {}
+        self._generation: int = 0
+
+        self._parse_timer: QTimer = QTimer()
+        self._parse_timer.setSingleShot(True)
+        self._parse_timer.timeout.connect(self.parse)  # type: ignore
+
+        self._parsed_signal.connect(self._handle_parsed)  # type: ignore
+        self.itemActivated.connect(self._handle_item_activated)  # type: ignore
+        self.itemClicked.connect(self._handle_item_activated)  # type: ignore
+
+    def set_editor(self, code_editor: Optional[CodeEditor]) -> None:
+        """Show the outline of the given code editor, or nothing if None.
+
+        Parameters
+        ----------
+        code_editor: Optional[CodeEditor]
+            Code editor to be outlined.
+
+        Returns
+        -------
+        None
+        """
+        if code_editor is self._code_editor:
+            return
+        if self._code_editor is not None:
+            try:
+                self._code_editor.document().contentsChanged.disconnect(self.schedule_parse)
+            except RuntimeError:
+                pass  # Editor of a closed tab was already deleted
+
+        self._code_editor = code_editor
+        self._chunk_symbols.clear()
+        self._generation += 1
+        self._show([])
+        if code_editor is not None and code_editor.file_path.endswith(PYTHON_EXTENSIONS):
+            code_editor.document().contentsChanged.connect(self.schedule_parse)  # type: ignore
+            self.parse()
+
+    @Slot()
+    def schedule_parse(self) -> None:
+        """Parse again once typing pauses."""
+        self._parse_timer.start(self.PARSE_DELAY)
+
+    @Slot()
+    def parse(self) -> None:
+        """Parse the chunks of the source which changed, in the symbol pool."""
+        if self._code_editor is None:
+            return
+        if self._code_editor.is_loading():
+            self.schedule_parse()
+            return
+
+        lines: List[str] = self._code_editor.toPlainText().split('\n')
+        starts: List[int] = split_top_level(lines)
+        chunks: List[Tuple[int, str]] = [
+            (start, '\n'.join(lines[start:end])) for start, end in zip(starts, starts[1:] + [len(lines)])
+        ]
+        del lines
+
+        self._generation += 1
+        changed: List[str] = list({chunk for _, chunk in chunks if chunk not in self._chunk_symbols})
+        if not changed:
+            self._update_symbols(chunks)
+            return
+
+        generation: int = self._generation
+        try:
+            future: Future = submit_symbol_job(parse_chunks, changed)
+        except BrokenProcessPool:
+            # A worker died, start a new pool on the next parse
+            debug('Symbol pool is broken, restarting it', debug_type=DebugType.WARNING)
+            shutdown_symbol_pool()
+            self.schedule_parse()
+            return
+        # Called on a thread of the pool, the signal hands the result to the GUI thread
+        future.add_done_callback(
+            lambda future: self._parsed_signal.emit(
+                generation, (chunks, changed), None if future.cancelled() or future.exception() else future.result()
+            )
+        )
+
+    @Slot(int, object, object)
+    def _handle_parsed(
+        self, generation: int, parsed: Tuple[List[Tuple[int, str]], List[str]], results: Optional[List]
+    ) -> None:
+        if results is None:
+            debug('Could not parse the outline of a Python file', debug_type=DebugType.WARNING)
+            return
+        chunks, changed = parsed
+        # Symbols depend only on the text of a chunk, so they are kept even if edited meanwhile
+        self._chunk_symbols.update(zip(changed, results))
+        if generation == self._generation:
+            self._update_symbols(chunks)
+
+    def _update_symbols(self, chunks: List[Tuple[int, str]]) -> None:
+        """Put the symbols of the chunks together, keeping the previous symbols of chunks which do not parse."""
+        symbols: List[Symbol] = []
+        for index, (start, chunk) in enumerate(chunks):
+            chunk_symbols: Optional[List[Symbol]] = self._chunk_symbols[chunk]
+            if chunk_symbols is not None:
+                symbols.extend((name, kind, start + line, depth) for name, kind, line, depth in chunk_symbols)
+            else:
+                end: int = chunks[index + 1][0] if index + 1 < len(chunks) else start + chunk.count('\n') + 1
+                symbols.extend(symbol for symbol in self.symbols if start <= symbol[2] < end)
+        # Only chunks of the current source are kept
+        self._chunk_symbols = {chunk: self._chunk_symbols[chunk] for _, chunk in chunks}
+        if symbols != self.symbols:
+            self._show(symbols)
+
+    def _show(self, symbols: List[Symbol]) -> None:
+        """Fill the tree, nesting symbols by their depth."""
+        self.symbols = symbols
+        self.setUpdatesEnabled(False)
+        self.clear()
+        parents: List[QTreeWidgetItem] = []
+        for name, kind, line, depth in symbols:
+            del parents[depth:]
+            item: QTreeWidgetItem = QTreeWidgetItem(['%s %s' % ('\u25c6' if kind == CLASS else '\u0192', name)])
+            item.setData(0, Qt.ItemDataRole.UserRole, line)
+            item.setToolTip(0, 'Line %d' % (line + 1))
+            if parents:
+                parents[-1].addChild(item)
+            else:
+                self.addTopLevelItem(item)
+            parents.append(item)
+        self.expandAll()
+        self.setUpdatesEnabled(True)
+
+    @Slot(QTreeWidgetItem, int)
+    def _handle_item_activated(self, item: QTreeWidgetItem, column: int) -> None:
+        self.symbol_activated_signal.emit(item.data(0, Qt.ItemDataRole.UserRole) + 1)
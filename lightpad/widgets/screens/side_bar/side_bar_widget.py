@@ -21,18 +21,38 @@
 #  SOFTWARE.
 #
 
-from PySide6.QtWidgets import QFrame, QVBoxLayout
+from PySide6.QtCore import QSize, Qt, Signal
+from PySide6.QtWidgets import QButtonGroup, QFrame, QStyle, QToolButton, QVBoxLayout
 
 from lightpad.utils.commons import init_layout
+from lightpad.widgets.screens.side_bar.stacked_widget import EXPLORER_PAGE, OUTLINE_PAGE
 
 
 class SideBarWidget(QFrame):
     """A widget for selecting various editor accessories"""
 
+    page_selected_signal: Signal = Signal(int)  # page of the stacked widget
+
     def __init__(self) -> None:
         super().__init__()
 
         self.setFixedWidth(50)
-        init_layout(self, QVBoxLayout)
+        init_layout(self, QVBoxLayout, layout_spacing=4, contents_margins=(0, 4, 0, 4))
 
         self.setStyleSheet('background: gray;')
+
+        self._button_group: QButtonGroup = QButtonGroup(self)
+        for page, icon, tool_tip in (
+            (EXPLORER_PAGE, QStyle.StandardPixmap.SP_DirIcon, 'Explorer'),
+            (OUTLINE_PAGE, QStyle.StandardPixmap.SP_FileDialogDetailedView, 'Outline'),
+        ):
+            button: QToolButton = QToolButton()
+            button.setIcon(self.style().standardIcon(icon))
+            button.setIconSize(QSize(24, 24))
+            button.setToolTip(tool_tip)
+            button.setCheckable(True)
+            self._button_group.addButton(button, page)
+            self.layout().addWidget(button, alignment=Qt.AlignmentFlag.AlignHCenter)  # type: ignore
+        self.layout().addStretch()  # type: ignore
+        self._button_group.button(EXPLORER_PAGE).setChecked(True)
+        self._button_group.idClicked.connect(self.page_selected_signal)  # type: ignore
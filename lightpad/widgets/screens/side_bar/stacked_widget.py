@@ -24,6 +24,11 @@
 from PySide6.QtWidgets import QStackedWidget
 
 from lightpad.widgets.screens.side_bar.explorer_tree.explorer_tree_widget import ExplorerTreeWidget
+from lightpad.widgets.screens.side_bar.outline.outline_widget import OutlineWidget
+
+# Pages, in the order of the buttons of the side bar
+EXPLORER_PAGE: int = 0
+OUTLINE_PAGE: int = 1
 
 
 class StackedWidget(QStackedWidget):
@@ -33,7 +38,9 @@ class StackedWidget(QStackedWidget):
         super().__init__()
 
         self.explorer_tree: ExplorerTreeWidget = ExplorerTreeWidget()
+        self.outline: OutlineWidget = OutlineWidget()
 
-        self.addWidget(self.explorer_tree)
+        self.insertWidget(EXPLORER_PAGE, self.explorer_tree)
+        self.insertWidget(OUTLINE_PAGE, self.outline)
 
         self.setCurrentWidget(self.explorer_tree)
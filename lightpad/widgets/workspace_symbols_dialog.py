@@ -0,0 +1,101 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Tom George Ampiath
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+import os
+from typing import List, Optional, Tuple
+
+from PySide6.QtCore import Qt, Slot
+from PySide6.QtGui import QKeyEvent
+from PySide6.QtWidgets import QDialog, QLabel, QLineEdit, QListWidget, QListWidgetItem, QVBoxLayout, QWidget
+
+from lightpad.utils.python_symbols import CLASS
+from lightpad.utils.symbol_index import SymbolIndex, WorkspaceSymbol
+
+
+class WorkspaceSymbolsDialog(QDialog):
+    """Find a class or function in the Python files of the working directory by name."""
+
+    MAX_SHOWN_SYMBOLS: int = 200
+
+    def __init__(self, symbol_index: SymbolIndex, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+
+        self.setWindowTitle('Go to Symbol in Workspace')
+        self.resize(600, 400)
+
+        self.symbol_index: SymbolIndex = symbol_index
+        # Path and line, starting at 1, of the chosen symbol
+        self.location: Optional[Tuple[str, int]] = None
+
+        self.search_line_edit: QLineEdit = QLineEdit()
+        self.search_line_edit.setPlaceholderText('Name of a class or function')
+        self.symbols_list_widget: QListWidget = QListWidget()
+        self.status_label: QLabel = QLabel()
+
+        layout: QVBoxLayout = QVBoxLayout()
+        layout.addWidget(self.search_line_edit)
+        layout.addWidget(self.symbols_list_widget)
+        layout.addWidget(self.status_label)
+        self.setLayout(layout)
+
+        self.search_line_edit.textChanged.connect(self.search)  # type: ignore
+        self.search_line_edit.returnPressed.connect(self.accept)  # type: ignore
+        self.symbols_list_widget.itemActivated.connect(self.accept)  # type: ignore
+
+        self.search('')
+
+    @Slot(str)
+    def search(self, text: str) -> None:
+        """List the symbols matching text."""
+        symbols: List[WorkspaceSymbol] = self.symbol_index.search(text, self.MAX_SHOWN_SYMBOLS)
+
+        self.symbols_list_widget.clear()
+        for name, kind, path, line, container in symbols:
+            qualified_name: str = '%s.%s' % (container, name) if container else name
+            relative_path: str = os.path.relpath(path, self.symbol_index.root)
+            item: QListWidgetItem = QListWidgetItem(
+                '%s %s    %s:%d' % ('class' if kind == CLASS else 'def', qualified_name, relative_path, line + 1)
+            )
+            item.setData(Qt.ItemDataRole.UserRole, (path, line + 1))
+            self.symbols_list_widget.addItem(item)
+        if symbols:
+            self.symbols_list_widget.setCurrentRow(0)
+
+        status: str = 'Indexing files…' if self.symbol_index.is_updating() else ''
+        if text.strip() and not symbols:
+            status = status or 'No symbols found'
+        self.status_label.setText(status)
+
+    def keyPressEvent(self, e: QKeyEvent) -> None:
+        """Move through the list while typing in the search field."""
+        if e.key() in (Qt.Key.Key_Up, Qt.Key.Key_Down, Qt.Key.Key_PageUp, Qt.Key.Key_PageDown):
+            self.symbols_list_widget.keyPressEvent(e)
+            return
+        super().keyPressEvent(e)
+
+    def accept(self) -> None:
+        item: Optional[QListWidgetItem] = self.symbols_list_widget.currentItem()
+        if item is None:
+            return
+        self.location = item.data(Qt.ItemDataRole.UserRole)
+        super().accept()